@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+from benchmarks.common import print_table, run_meta, summarize, write_results  # noqa: E402
+from benchmarks.datagen import DataGen, add_scale_args, scale_from_args  # noqa: E402
+
+API_KEY = "bench-key"
+DEFAULT_MIX = "recall=4,list=2,profile=2,append=2,write=1"
+
+Request = tuple[str, str, dict]
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def build_ops(gen: DataGen) -> dict[str, Callable[[int], Request]]:
+    personas = gen.persona_ids()
+    queries = gen.queries(1000)
+    messages = gen.messages(personas[0], 200)
+
+    def persona(i: int) -> str:
+        return personas[i % len(personas)]
+
+    def message(i: int) -> dict:
+        return {**messages[i % len(messages)], "persona_id": persona(i), "ts": None}
+
+    return {
+        "recall": lambda i: ("POST", "/memory/recall", {"json": {"persona_id": persona(i), "query": queries[i % len(queries)], "limit": 10}}),
+        "list": lambda i: ("GET", "/memory/list", {"params": {"persona_id": persona(i)}}),
+        "profile": lambda i: ("GET", "/persona/profile", {"params": {"persona_id": persona(i)}}),
+        "slots": lambda i: ("GET", "/persona/slots/get", {"params": {"persona_id": persona(i)}}),
+        "goals": lambda i: ("GET", "/goals/list", {"params": {"persona_id": persona(i)}}),
+        "recent": lambda i: ("GET", "/messages/recent", {"params": {"persona_id": persona(i)}}),
+        "append": lambda i: ("POST", "/messages/append", {"json": message(i)}),
+        "append_batch": lambda i: ("POST", "/messages/append_batch", {"json": {"messages": [message(i + j) for j in range(20)]}}),
+        "write": lambda i: ("POST", "/memory/write", {"json": {"persona_id": persona(i), "type": "rule", "key": f"load{i}", "content": messages[i % len(messages)]["content"]}}),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_server(args) -> Iterator[str]:
+    workdir = tempfile.TemporaryDirectory(prefix="pm-bench-http-")
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PLASTIC_MEMORIES_DB_PATH": str(Path(workdir.name) / "bench.db"),
+        "PLASTIC_MEMORIES_LOG_DIR": str(Path(workdir.name) / "logs"),
+        "PLASTIC_MEMORIES_API_KEYS": f"{API_KEY}:bench",
+        "PLASTIC_MEMORIES_LOG_LEVEL": args.log_level,
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "plastic_memories.api:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(args.workers),
+        "--log-level", "warning", "--no-access-log",
+    ]
+    proc = subprocess.Popen(command, cwd=ROOT, env=env)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.2)
+        yield url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        workdir.cleanup()
+
+
+async def seed(client: httpx.AsyncClient, gen: DataGen, parallel: int = 16) -> dict:
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(parallel)
+
+    async def post(path: str, body: dict) -> None:
+        async with semaphore:
+            resp = await client.post(path, json=body)
+            resp.raise_for_status()
+
+    for persona in gen.personas():
+        persona_id = persona["persona_id"]
+        await post("/persona/create", persona)
+        messages = gen.messages(persona_id)
+        for start in range(0, len(messages), 1000):
+            await post("/messages/append_batch", {"messages": messages[start:start + 1000]})
+        writes = [post("/memory/write", memory) for memory in gen.memories(persona_id)]
+        writes.append(post("/persona/slots/set", {"persona_id": persona_id, "slot_name": "tone", "value_json": {"text": gen.text(8)}}))
+        writes.extend(post("/goals/create", {"persona_id": persona_id, "title": gen.text(4)}) for _ in range(3))
+        await asyncio.gather(*writes)
+    scale = gen.scale
+    return {
+        "personas": scale.personas,
+        "messages": scale.personas * scale.messages,
+        "memories": scale.personas * scale.memories,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def run_level(client: httpx.AsyncClient, ops: dict[str, Callable[[int], Request]], mix: dict[str, int], concurrency: int, args) -> list[dict]:
+    rng = random.Random(args.seed + concurrency)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: Counter[str] = Counter()
+    counter = itertools.count()
+    offset = concurrency * 1_000_000
+    total = args.requests + args.warmup
+    stop_at: float | None = None
+
+    async def worker() -> None:
+        while True:
+            i = next(counter)
+            if (stop_at is None and i >= total) or (stop_at is not None and time.perf_counter() >= stop_at):
+                return
+            name = rng.choices(names, weights)[0]
+            method, path, kwargs = ops[name](offset + i)
+            start = time.perf_counter()
+            try:
+                failed = (await client.request(method, path, **kwargs)).status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if i < args.warmup:
+                continue
+            latencies[name].append(time.perf_counter() - start)
+            errors[name] += failed
+
+    if args.duration:
+        stop_at = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    merged = [value for values in latencies.values() for value in values]
+    results = [summarize(f"c{concurrency}/all", merged, elapsed, sum(errors.values()), concurrency=concurrency, op="all")]
+    for name in names:
+        if latencies[name]:
+            results.append(summarize(f"c{concurrency}/{name}", latencies[name], elapsed, errors[name], concurrency=concurrency, op=name))
+    return results
+
+
+async def drive(url: str, api_key: str, gen: DataGen, args) -> tuple[dict | None, list[dict]]:
+    mix = parse_mix(args.mix)
+    ops = build_ops(gen)
+    unknown = set(mix) - set(ops)
+    if unknown:
+        raise SystemExit(f"unknown ops in --mix: {', '.join(sorted(unknown))} (available: {', '.join(ops)})")
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=url, headers={"X-API-Key": api_key}, limits=limits, timeout=args.timeout) as client:
+        seeded = None if args.no_seed else await seed(client, gen)
+        if seeded:
+            print(f"seeded {seeded['personas']} personas, {seeded['messages']} messages, {seeded['memories']} memories in {seeded['seconds']}s")
+        results = []
+        for concurrency in args.concurrency:
+            level = await run_level(client, ops, mix, concurrency, args)
+            print_table(level)
+            print()
+            results.extend(level)
+    return seeded, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end HTTP load driver reporting p50/p95/p99 per concurrency level")
+    add_scale_args(parser)
+    parser.add_argument("--url", default=None, help="target an already running server instead of starting uvicorn")
+    parser.add_argument("--api-key", default=os.getenv("PLASTIC_MEMORIES_API_KEY", API_KEY))
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per concurrency level")
+    parser.add_argument("--duration", type=float, default=0, help="run each level for N seconds instead of --requests")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests at the start of each level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted ops, e.g. recall=4,list=2,append=1")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--no-seed", action="store_true", help="skip seeding (data already present on --url)")
+    parser.add_argument("--log-level", default="WARNING", help="log level for the local server")
+    parser.add_argument("--json", default=None, help="write results to this JSON file")
+    args = parser.parse_args()
+
+    gen = DataGen(scale_from_args(args))
+    if args.url:
+        seeded, results = asyncio.run(drive(args.url, args.api_key, gen, args))
+    else:
+        with local_server(args) as url:
+            seeded, results = asyncio.run(drive(url, API_KEY, gen, args))
+    meta = run_meta("http", args)
+    meta["args"].pop("api_key", None)
+    write_results(args.json, meta, results, seeded=seeded)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from plastic_memories import jsonlib  # noqa: E402
+from plastic_memories.encoding import to_columnar  # noqa: E402
+from plastic_memories.utils import dumps_json  # noqa: E402
+
+_WORDS = ["我喜欢", "咖啡", "周末", "爬山", "memory", "persona", "likes", "tea", "today", "会议", "提醒", "project"]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def make_memory_rows(count: int, rng: random.Random) -> list[dict]:
+    now = int(time.time())
+    return [
+        {
+            "id": i, "user_id": "userA", "persona_id": "default", "type": "preferences", "mkey": f"k{i}",
+            "content": _text(rng, 24), "tags_json": "[]", "ttl_seconds": None, "status": "active",
+            "scope": "persona", "source_type": "user_explicit", "source_ref": None, "confidence": None,
+            "expires_at": None, "supersedes_id": None, "created_at": now, "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def make_messages(count: int, rng: random.Random) -> list[dict]:
+    now = int(time.time())
+    return [
+        {"id": i, "user_id": "userA", "persona_id": "default", "session_id": "s1", "source_app": "bench", "role": rng.choice(["user", "assistant"]), "content": _text(rng, 40), "created_at": now - i}
+        for i in range(count)
+    ]
+
+
+def envelope(data: dict) -> dict:
+    return {"ok": True, "request_id": "0" * 32, "data": data}
+
+
+def legacy(payload: dict) -> bytes:
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def make_stored_fields(count: int, rng: random.Random) -> list[object]:
+    # What storage writes serialise per row: tags, slot values and provenance.
+    fields: list[object] = []
+    for i in range(count):
+        fields.append([_text(rng, 1) for _ in range(3)])
+        fields.append({"text": _text(rng, 12), "weight": i / 10})
+        fields.append({"source": "template", "path": f"personas/p{i}", "keys": ["persona_md", "rules_md"]})
+    return fields
+
+
+def legacy_dumps_json(value: object) -> str:
+    return json.dumps(value, ensure_ascii=True, separators=(",", ":"))
+
+
+def run_each(fn, values: list[object], rounds: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        size = sum(len(fn(value)) for value in values)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, size
+
+
+def run(fn, payload: dict, rounds: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        size = len(fn(payload))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response serialization microbenchmark")
+    parser.add_argument("--rows", type=int, nargs="*", default=[100, 1000, 5000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    encoders = {"legacy": legacy, "stdlib": jsonlib.StdlibJson().dumps_bytes}
+    if jsonlib.orjson is not None:
+        encoders["orjson"] = jsonlib.OrjsonJson().dumps_bytes
+    best_name = list(encoders)[-1]
+    encoders[f"{best_name}+columnar"] = lambda payload: encoders[best_name](to_columnar(payload))
+
+    print(f"{'payload':>14} {'rows':>6} " + " ".join(f"{name:>16}" for name in encoders) + f" {'speedup':>8}")
+    for rows in args.rows:
+        payloads = {
+            "memory/list": envelope({"items": make_memory_rows(rows, rng)}),
+            "memory/recall": envelope({"PERSONA_PROFILE": _text(rng, 200), "PERSONA_MEMORY": make_memory_rows(rows, rng), "CHAT_SNIPPETS": make_messages(rows, rng)}),
+        }
+        for label, payload in payloads.items():
+            results = {name: run(fn, payload, args.rounds) for name, fn in encoders.items()}
+            cells = " ".join(f"{ms:>8.2f}ms/{size // 1024:>4}K" for ms, size in results.values())
+            print(f"{label:>14} {rows:>6} {cells} {results['legacy'][0] / results[best_name][0]:>7.1f}x")
+
+    backends = ["stdlib", "orjson"] if jsonlib.orjson is not None else ["stdlib"]
+    print()
+    print(f"{'dumps_json':>14} {'rows':>6} " + " ".join(f"{name:>16}" for name in ["legacy", *backends]) + f" {'speedup':>8}")
+    for rows in args.rows:
+        values = make_stored_fields(rows, rng)
+        results = {"legacy": run_each(legacy_dumps_json, values, args.rounds)}
+        for name in backends:
+            jsonlib.set_json_backend(name)
+            results[name] = run_each(dumps_json, values, args.rounds)
+        cells = " ".join(f"{ms:>8.2f}ms/{size // 1024:>4}K" for ms, size in results.values())
+        print(f"{'stored fields':>14} {rows:>6} {cells} {results['legacy'][0] / results[backends[-1]][0]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from plastic_memories.ext.sensitive.strict import StrictDenyPolicy  # noqa: E402
+
+
+class LegacyStrictDenyPolicy:
+    _patterns = [
+        re.compile(r"\bpassword\b", re.I),
+        re.compile(r"\bssn\b", re.I),
+        re.compile(r"\bcredit\s*card\b", re.I),
+        re.compile(r"\bsecret\b", re.I),
+        re.compile(r"\bapi[_-]?key\b", re.I),
+        re.compile(r"\btoken\b", re.I),
+        re.compile(r"\b[0-9]{16}\b"),
+    ]
+
+    def check(self, text: str) -> tuple[bool, str | None]:
+        for pat in self._patterns:
+            if pat.search(text):
+                return True, f"sensitive:{pat.pattern}"
+        return False, None
+
+
+class LegacyTermPolicy(LegacyStrictDenyPolicy):
+    def __init__(self, terms: list[str]) -> None:
+        self._terms = [re.compile(re.escape(term), re.I) for term in terms]
+
+    def check(self, text: str) -> tuple[bool, str | None]:
+        hit, reason = super().check(text)
+        if hit:
+            return hit, reason
+        for pat in self._terms:
+            if pat.search(text):
+                return True, f"sensitive:term:{pat.pattern}"
+        return False, None
+
+
+_WORDS = ["我喜欢", "咖啡", "周末", "爬山", "memory", "persona", "likes", "tea", "today", "会议", "提醒", "project"]
+
+
+def make_texts(count: int, length: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts: list[str] = []
+        while sum(len(part) + 1 for part in parts) < length:
+            parts.append(rng.choice(_WORDS))
+        texts.append(" ".join(parts))
+    return texts
+
+
+def make_terms(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12))) for _ in range(count)]
+
+
+def run(policy, texts: list[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            policy.check(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sensitive policy scan microbenchmark")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--length", type=int, default=400)
+    parser.add_argument("--terms", type=int, nargs="*", default=[0, 100, 1000, 5000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts, args.length, args.seed)
+    print(f"{'terms':>6} {'legacy_us':>10} {'current_us':>11} {'speedup':>8}")
+    for term_count in args.terms:
+        terms = make_terms(term_count, args.seed)
+        legacy = LegacyTermPolicy(terms) if terms else LegacyStrictDenyPolicy()
+        current = StrictDenyPolicy(terms)
+        for text in texts[:50]:
+            assert legacy.check(text)[0] == current.check(text)[0]
+        legacy_us = run(legacy, texts, args.rounds)
+        current_us = run(current, texts, args.rounds)
+        print(f"{term_count:>6} {legacy_us:>10.2f} {current_us:>11.2f} {legacy_us / current_us:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.common import print_table, run_meta, summarize, write_results  # noqa: E402
+from benchmarks.datagen import DataGen, add_scale_args, scale_from_args, seed_storage  # noqa: E402
+
+USER_ID = "bench"
+
+
+def bench(name: str, fn: Callable[[int], object], iterations: int, warmup: int) -> dict:
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    return summarize(name, latencies, time.perf_counter() - started)
+
+
+def build_cases(storage, recall, gen: DataGen, args) -> dict[str, Callable[[int], object]]:
+    from plastic_memories.config import get_settings
+
+    settings = get_settings()
+    personas = gen.persona_ids()
+    queries = gen.queries(max(args.iterations, 1))
+    messages = gen.messages(personas[0], 100)
+    slot_value = json.dumps({"text": gen.text(8)}, ensure_ascii=False)
+
+    def persona(i: int) -> str:
+        return personas[i % len(personas)]
+
+    def message(i: int) -> dict:
+        return {**messages[i % len(messages)], "persona_id": persona(i), "user_id": USER_ID, "created_at": int(time.time())}
+
+    return {
+        "storage.get_persona": lambda i: storage.get_persona(USER_ID, persona(i)),
+        "storage.list_memory": lambda i: storage.list_memory(USER_ID, persona(i)),
+        "storage.recall_memory": lambda i: storage.recall_memory(USER_ID, persona(i), queries[i % len(queries)], 10),
+        "storage.recent_messages": lambda i: storage.recent_messages(USER_ID, persona(i), settings.max_snippets, settings.message_snippet_days),
+        "storage.get_slots": lambda i: storage.get_slots(USER_ID, persona(i)),
+        "storage.list_goals": lambda i: storage.list_goals(USER_ID, persona(i)),
+        "storage.persona_versions": lambda i: storage.persona_versions(USER_ID, persona(i)),
+        "recall.keyword": lambda i: recall.recall(USER_ID, persona(i), queries[i % len(queries)], 10),
+        "storage.append_message": lambda i: storage.append_message(message(i)),
+        "storage.append_messages[100]": lambda i: storage.append_messages([message(i + j) for j in range(100)]),
+        "storage.write_memory.insert": lambda i: storage.write_memory({"persona_id": persona(i), "user_id": USER_ID, "type": "rule", "key": f"w{i}", "content": gen.text(20), "status": "active"}),
+        "storage.write_memory.update": lambda i: storage.write_memory({"persona_id": persona(i), "user_id": USER_ID, "type": "persona", "key": f"k{(i * 5) % max(gen.scale.memories, 1)}", "content": gen.text(20), "status": "active"}),
+        "storage.set_slot": lambda i: storage.set_slot(USER_ID, persona(i), "tone", slot_value, None),
+        "storage.create_goal": lambda i: storage.create_goal(USER_ID, persona(i), gen.text(4), None),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLiteStorage and KeywordRecallEngine microbenchmarks")
+    add_scale_args(parser)
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per method")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", nargs="*", default=None, help="run cases whose name contains any of these substrings")
+    parser.add_argument("--compression", choices=["none", "zlib"], default="none")
+    parser.add_argument("--db", default=None, help="database path (default: a fresh temporary file)")
+    parser.add_argument("--log-level", default="WARNING", help="plastic_memories log level while benchmarking")
+    parser.add_argument("--json", default=None, help="write results to this JSON file")
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory(prefix="pm-bench-")
+    os.environ["PLASTIC_MEMORIES_DB_PATH"] = args.db or str(Path(workdir.name) / "bench.db")
+    os.environ["PLASTIC_MEMORIES_LOG_DIR"] = str(Path(workdir.name) / "logs")
+    os.environ["PLASTIC_MEMORIES_COMPRESSION"] = args.compression
+    os.environ["PLASTIC_MEMORIES_LOG_LEVEL"] = args.log_level
+
+    from plastic_memories.ext.backends.sqlite import SQLiteStorage
+    from plastic_memories.ext.profile.markdown import MarkdownProfileBuilder
+    from plastic_memories.ext.recall.keyword import KeywordRecallEngine
+
+    storage = SQLiteStorage()
+    storage.init()
+    recall = KeywordRecallEngine(storage, MarkdownProfileBuilder())
+    gen = DataGen(scale_from_args(args))
+    seeded = seed_storage(storage, gen, USER_ID)
+    for persona_id in gen.persona_ids():
+        for i in range(5):
+            storage.create_goal(USER_ID, persona_id, gen.text(4), None)
+    print(f"seeded {seeded['personas']} personas, {seeded['messages']} messages, {seeded['memories']} memories in {seeded['seconds']}s (fts={storage.fts_enabled()})")
+
+    results = []
+    for name, fn in build_cases(storage, recall, gen, args).items():
+        if args.only and not any(part in name for part in args.only):
+            continue
+        results.append(bench(name, fn, args.iterations, args.warmup))
+    print_table(results)
+    write_results(args.json, run_meta("storage", args), results, seeded=seeded, fts=storage.fts_enabled())
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
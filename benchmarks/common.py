@@ -0,0 +1,68 @@
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name: str, latencies_s: list[float], elapsed_s: float | None = None, errors: int = 0, **extra) -> dict:
+    values = sorted(latencies_s)
+    elapsed_s = elapsed_s if elapsed_s is not None else sum(values)
+    return {
+        "name": name,
+        "count": len(values),
+        "errors": errors,
+        "ops_per_s": round(len(values) / elapsed_s, 1) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+        **extra,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_meta(kind: str, args) -> dict:
+    return {
+        "kind": kind,
+        "created_at": int(time.time()),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key != "json"},
+    }
+
+
+def print_table(results: list[dict]) -> None:
+    width = max([len(item["name"]) for item in results] + [4])
+    print(f"{'name':<{width}} {'count':>7} {'ops/s':>10} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'errors':>6}")
+    for item in results:
+        print(f"{item['name']:<{width}} {item['count']:>7} {item['ops_per_s']:>10.1f} {item['p50_ms']:>9.3f} {item['p95_ms']:>9.3f} {item['p99_ms']:>9.3f} {item['errors']:>6}")
+
+
+def write_results(path: str | None, meta: dict, results: list[dict], **extra) -> None:
+    if not path:
+        return
+    payload = {**meta, **extra, "results": results}
+    Path(path).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"wrote {path}")
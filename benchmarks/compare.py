@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "ops_per_s")
+
+
+def load(path: str) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def delta_pct(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def compare(baseline: dict, current: dict, metric: str, threshold: float) -> tuple[list[tuple], list[str]]:
+    before = {item["name"]: item for item in baseline["results"]}
+    rows = []
+    regressions = []
+    for item in current["results"]:
+        old = before.get(item["name"])
+        if old is None:
+            continue
+        change = delta_pct(old[metric], item[metric])
+        # Throughput regresses when it drops; latencies regress when they grow.
+        worse = -change if metric == "ops_per_s" else change
+        if worse > threshold:
+            regressions.append(item["name"])
+        rows.append((item["name"], old[metric], item[metric], change, worse > threshold))
+    return rows, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", choices=METRICS, default="p95_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    parser.add_argument("--fail", action="store_true", help="exit with status 1 when any case regresses")
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    if baseline.get("kind") != current.get("kind"):
+        raise SystemExit(f"cannot compare {baseline.get('kind')} results with {current.get('kind')} results")
+    rows, regressions = compare(baseline, current, args.metric, args.threshold)
+    print(f"{args.metric}: {baseline.get('git_commit')} -> {current.get('git_commit')}")
+    width = max([len(row[0]) for row in rows] + [4])
+    print(f"{'name':<{width}} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, old, new, change, regressed in rows:
+        print(f"{name:<{width}} {old:>10.3f} {new:>10.3f} {change:>+7.1f}%{'  REGRESSION' if regressed else ''}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0f}%")
+        if args.fail:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+
+ZH_WORDS = [
+    "我喜欢", "咖啡", "周末", "爬山", "会议", "提醒", "项目", "晚饭", "早起", "跑步", "读书", "电影",
+    "工作", "周报", "猫咪", "旅行", "音乐", "简洁", "中文", "回答", "工程化", "天气", "朋友", "生日",
+]
+EN_WORDS = [
+    "memory", "persona", "likes", "tea", "today", "project", "meeting", "weekend", "coffee", "hiking",
+    "reminder", "music", "travel", "concise", "answer", "release", "review", "dinner", "morning", "friend",
+]
+MEMORY_TYPES = ("persona", "preferences", "rule", "glossary", "stable_fact")
+ROLES = ("user", "assistant")
+
+
+@dataclass(frozen=True)
+class Scale:
+    personas: int = 10
+    messages: int = 200
+    memories: int = 100
+    zh_ratio: float = 0.5
+    seed: int = 7
+
+
+def add_scale_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--personas", type=int, default=Scale.personas)
+    parser.add_argument("--messages", type=int, default=Scale.messages, help="messages per persona")
+    parser.add_argument("--memories", type=int, default=Scale.memories, help="memory items per persona")
+    parser.add_argument("--zh-ratio", type=float, default=Scale.zh_ratio, help="share of Chinese texts (0-1)")
+    parser.add_argument("--seed", type=int, default=Scale.seed)
+
+
+def scale_from_args(args: argparse.Namespace) -> Scale:
+    return Scale(args.personas, args.messages, args.memories, args.zh_ratio, args.seed)
+
+
+class DataGen:
+    def __init__(self, scale: Scale) -> None:
+        self.scale = scale
+        self.rng = random.Random(scale.seed)
+
+    def text(self, words: int, zh: bool | None = None) -> str:
+        if zh is None:
+            zh = self.rng.random() < self.scale.zh_ratio
+        if zh:
+            return "，".join("".join(self.rng.choice(ZH_WORDS) for _ in range(3)) for _ in range(max(1, words // 3)))
+        return " ".join(self.rng.choice(EN_WORDS) for _ in range(words))
+
+    def persona_ids(self) -> list[str]:
+        return [f"bench_{i}" for i in range(self.scale.personas)]
+
+    def personas(self) -> list[dict]:
+        return [
+            {"persona_id": persona_id, "display_name": f"Bench {i}", "description": self.text(12)}
+            for i, persona_id in enumerate(self.persona_ids())
+        ]
+
+    def messages(self, persona_id: str, count: int | None = None) -> list[dict]:
+        count = self.scale.messages if count is None else count
+        now = int(time.time())
+        return [
+            {
+                "persona_id": persona_id,
+                "session_id": f"s{i // 50}",
+                "source_app": "bench",
+                "role": ROLES[i % 2],
+                "content": self.text(self.rng.randint(8, 60)),
+                "ts": now - (count - i),
+            }
+            for i in range(count)
+        ]
+
+    def memories(self, persona_id: str, count: int | None = None) -> list[dict]:
+        count = self.scale.memories if count is None else count
+        return [
+            {
+                "persona_id": persona_id,
+                "type": MEMORY_TYPES[i % len(MEMORY_TYPES)],
+                "key": f"k{i}",
+                "content": self.text(self.rng.randint(6, 40)),
+            }
+            for i in range(count)
+        ]
+
+    def queries(self, count: int) -> list[str]:
+        return [self.rng.choice(ZH_WORDS if self.rng.random() < self.scale.zh_ratio else EN_WORDS) for _ in range(count)]
+
+
+def seed_storage(storage, gen: DataGen, user_id: str = "bench") -> dict:
+    started = time.perf_counter()
+    rows = {"personas": 0, "messages": 0, "memories": 0}
+    for persona in gen.personas():
+        persona_id = persona["persona_id"]
+        storage.create_persona(user_id, persona_id, persona["display_name"], persona["description"])
+        messages = gen.messages(persona_id)
+        storage.append_messages([{**message, "user_id": user_id, "created_at": message["ts"]} for message in messages])
+        memories = gen.memories(persona_id)
+        for memory in memories:
+            storage.write_memory({**memory, "user_id": user_id, "status": "active"})
+        storage.set_slot(user_id, persona_id, "tone", json.dumps({"text": gen.text(8)}, ensure_ascii=False), None)
+        rows["personas"] += 1
+        rows["messages"] += len(messages)
+        rows["memories"] += len(memories)
+    rows["seconds"] = round(time.perf_counter() - started, 3)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print a sample of the synthetic benchmark data")
+    add_scale_args(parser)
+    parser.add_argument("--sample", type=int, default=3)
+    args = parser.parse_args()
+
+    gen = DataGen(scale_from_args(args))
+    persona_id = gen.persona_ids()[0]
+    sample = {
+        "scale": asdict(gen.scale),
+        "personas": gen.personas()[: args.sample],
+        "messages": gen.messages(persona_id)[: args.sample],
+        "memories": gen.memories(persona_id)[: args.sample],
+        "queries": gen.queries(args.sample),
+    }
+    print(json.dumps(sample, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-﻿__all__ = ["PlasticMemoriesClient", "Message", "RecallResult"]
+﻿__all__ = ["PlasticMemoriesClient", "AsyncPlasticMemoriesClient", "Message", "RecallResult"]
 
+from .async_client import AsyncPlasticMemoriesClient
 from .client import PlasticMemoriesClient
 from .models import Message, RecallResult
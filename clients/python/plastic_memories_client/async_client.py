@@ -0,0 +1,291 @@
+﻿from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from .base import APPEND_BATCH_LIMIT, ClientBase
+from .cache import STALE, RecallCache
+from .errors import PlasticMemoriesCircuitOpenError, PlasticMemoriesTransportError
+from .models import Message, RecallResult
+from .resilience import CircuitBreaker, HedgePolicy
+from .retry import NO_RETRY, RetryBudget, RetryPolicy
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+
+
+class AsyncPlasticMemoriesClient(ClientBase):
+    def __init__(
+        self,
+        base_url: str,
+        user_id: str = "local",
+        persona_id: str = "default",
+        source_app: str = "python_sdk",
+        timeout_s: float = 10,
+        default_headers: Optional[dict] = None,
+        verify: bool | str | None = None,
+        session_id: Optional[str] = None,
+        api_key: Optional[str] = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        limits: httpx.Limits | None = None,
+        retry_policy: RetryPolicy | None = None,
+        retry_budget: RetryBudget | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge: HedgePolicy | None = None,
+        recall_cache: RecallCache | None = None,
+        compact: bool = True,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            user_id=user_id,
+            persona_id=persona_id,
+            source_app=source_app,
+            timeout_s=timeout_s,
+            default_headers=default_headers,
+            verify=verify,
+            session_id=session_id,
+            api_key=api_key,
+            limits=limits or DEFAULT_LIMITS,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            breaker=breaker,
+            hedge=hedge,
+            recall_cache=recall_cache,
+            compact=compact,
+        )
+        self._owns_client = http_client is None
+        self._client = http_client or httpx.AsyncClient(**self._client_kwargs(transport))
+        self._refreshing: dict[tuple, asyncio.Future] = {}
+
+    async def __aenter__(self) -> "AsyncPlasticMemoriesClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        if self._owns_client:
+            await self._client.aclose()
+
+    def for_persona(self, persona_id: str, session_id: Optional[str] = None) -> "AsyncPlasticMemoriesClient":
+        return AsyncPlasticMemoriesClient(
+            self.base_url,
+            user_id=self.user_id,
+            persona_id=persona_id,
+            source_app=self.source_app,
+            timeout_s=self.timeout_s,
+            default_headers=dict(self.default_headers),
+            verify=self.verify,
+            session_id=session_id,
+            api_key=self.api_key,
+            limits=self.limits,
+            retry_policy=self.retry_policy,
+            retry_budget=self.retry_budget,
+            breaker=self.breaker,
+            hedge=self.hedge,
+            recall_cache=self.recall_cache,
+            compact=self.compact,
+            http_client=self._client,
+        )
+
+    async def _request(self, method: str, path: str, *, json_body: dict | None = None, params: dict | None = None, headers: dict | None = None, retry: bool = False, disable_retry: bool = False, conditional: bool = False) -> tuple[dict, Optional[str]]:
+        etag_key = self._etag_key(path, params) if conditional else None
+
+        async def do_call():
+            self._before_attempt()
+            try:
+                resp = await self._client.request(
+                    method,
+                    path,
+                    json=json_body,
+                    params=params,
+                    headers=self._make_headers(self._conditional_headers(etag_key, headers)),
+                )
+            except Exception as exc:
+                self._record_attempt(exc)
+                raise PlasticMemoriesTransportError(exc, request_id=None) from exc
+            self._record_attempt(resp)
+            return resp
+
+        policy = NO_RETRY if disable_retry else self.retry_policy
+        response = await policy.acall(do_call, idempotent=retry, budget=self.retry_budget)
+        return self._parse_conditional(etag_key, response)
+
+    async def _cached(self, key: tuple, fetch: Callable[[], Awaitable[tuple[dict, Optional[str]]]]) -> tuple[dict, Optional[str]]:
+        assert self.recall_cache is not None
+        value, state = self.recall_cache.lookup(key, allow_stale=True)
+        if state == STALE and key not in self._refreshing:
+            task = asyncio.ensure_future(self._refresh(key, fetch))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        if value is None:
+            generation = self.recall_cache.generation(key[0])
+            value = await fetch()
+            self.recall_cache.put(key, value, generation)
+        return value
+
+    async def _refresh(self, key: tuple, fetch: Callable[[], Awaitable[tuple[dict, Optional[str]]]]) -> None:
+        assert self.recall_cache is not None
+        generation = self.recall_cache.generation(key[0])
+        try:
+            value = await fetch()
+        except Exception:
+            return
+        self.recall_cache.put(key, value, generation)
+
+    async def _timed(self, fn: Callable[[], Awaitable[tuple[dict, Optional[str]]]]) -> tuple[dict, Optional[str]]:
+        started = time.perf_counter()
+        result = await fn()
+        assert self.hedge is not None
+        self.hedge.observe(time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[tuple[dict, Optional[str]]]]) -> tuple[dict, Optional[str]]:
+        assert self.hedge is not None
+        primary = asyncio.ensure_future(self._timed(fn))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge.delay())
+        if done:
+            self.hedge.record(hedged=False, hedge_won=False)
+            return primary.result()
+        backup = asyncio.ensure_future(self._timed(fn))
+        pending = {primary, backup}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is None and pending:
+                    continue
+                winner = winner or next(iter(done))
+                self.hedge.record(hedged=True, hedge_won=winner is backup)
+                return winner.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def health(self, disable_retry: bool = False) -> dict:
+        data, _ = await self._request("GET", "/health", retry=True, disable_retry=disable_retry)
+        return data
+
+    async def capabilities(self, disable_retry: bool = False) -> dict:
+        data, _ = await self._request("GET", "/capabilities", retry=True, disable_retry=disable_retry)
+        return data
+
+    async def persona_create(self, meta: dict | None = None, seed: dict | None = None) -> dict:
+        data, _ = await self._request("POST", "/persona/create", json_body=self._persona_create_payload(meta, seed))
+        return data
+
+    async def create_from_template(self, template_path: str, allow_overwrite: bool = False) -> dict:
+        data, _ = await self._request("POST", "/persona/create_from_template", json_body=self._template_payload(template_path, allow_overwrite))
+        return data
+
+    async def create_from_template_batch(self, template_path: str, persona_ids: list[str], allow_overwrite: bool = False) -> dict:
+        payload = self._template_batch_payload(template_path, persona_ids, allow_overwrite)
+        data, _ = await self._request("POST", "/persona/create_from_template_batch", json_body=payload)
+        return data
+
+    async def persona_profile(self, disable_retry: bool = False) -> dict:
+        data, _ = await self._request(
+            "GET",
+            "/persona/profile",
+            params={"persona_id": self.persona_id},
+            retry=True,
+            disable_retry=disable_retry,
+            conditional=True,
+        )
+        return data
+
+    async def get_slots(self) -> dict:
+        data, _ = await self._request("GET", "/persona/slots/get", params={"persona_id": self.persona_id}, retry=True, conditional=True)
+        return data
+
+    async def list_goals(self) -> dict:
+        data, _ = await self._request("GET", "/goals/list", params={"persona_id": self.persona_id}, retry=True, conditional=True)
+        return data
+
+    async def recall(
+        self,
+        query: str,
+        *,
+        top_k: int | None = None,
+        include_profile: bool = True,
+        include_snippets: bool = True,
+        snippets_days: int | None = None,
+        top_k_snippets: int | None = None,
+        filters: dict | None = None,
+        disable_retry: bool = False,
+        use_cache: bool = True,
+    ) -> RecallResult:
+        payload = self._recall_payload(query, top_k)
+
+        def call() -> Awaitable[tuple[dict, Optional[str]]]:
+            return self._request("POST", "/memory/recall", json_body=payload, retry=True, disable_retry=disable_retry)
+
+        def fetch() -> Awaitable[tuple[dict, Optional[str]]]:
+            return self._hedged(call) if self.hedge is not None else call()
+
+        try:
+            if self.recall_cache is not None and use_cache:
+                data, request_id = await self._cached((self.persona_id, query, top_k), fetch)
+            else:
+                data, request_id = await fetch()
+        except PlasticMemoriesCircuitOpenError:
+            return self._fallback_recall()
+        return self._recall_result(data, request_id, include_profile, include_snippets)
+
+    async def append_messages(self, messages: list[Message], *, session_id: str | None = None) -> dict:
+        session = session_id or self.session_id
+        message_ids = await self._append_payloads([self._message_payload(msg, session) for msg in messages])
+        return {"message_ids": message_ids}
+
+    async def _append_payloads(self, payloads: list[dict]) -> list:
+        message_ids: list = []
+        try:
+            for start in range(0, len(payloads), APPEND_BATCH_LIMIT):
+                chunk = payloads[start:start + APPEND_BATCH_LIMIT]
+                data, _ = await self._request("POST", "/messages/append_batch", json_body={"messages": chunk})
+                message_ids.extend(data.get("message_ids", []))
+        finally:
+            self._invalidate_recall()
+        return message_ids
+
+    async def write(self, messages: list[Message], *, bypass_judge: bool = False, session_id: str | None = None) -> dict:
+        try:
+            written = 0
+            for msg in messages:
+                await self._request("POST", "/memory/write", json_body=self._write_payload(msg))
+                written += 1
+            return {"written": written}
+        finally:
+            self._invalidate_recall()
+
+    async def list_memory(self, type: str | None = None) -> dict:
+        data, _ = await self._request(
+            "GET",
+            "/memory/list",
+            params={"persona_id": self.persona_id},
+            retry=True,
+            conditional=True,
+        )
+        items = data.get("items", [])
+        if type:
+            items = [item for item in items if item.get("type") == type]
+        return {"items": items}
+
+    async def forget_memory(self, memory_id: str | None = None, match: dict | None = None) -> dict:
+        try:
+            data, _ = await self._request("POST", "/memory/forget", json_body=self._forget_payload(match))
+            return data
+        finally:
+            self._invalidate_recall()
+
+    async def purge_messages(self, older_than_days: int) -> dict:
+        try:
+            data, _ = await self._request("POST", "/messages/purge", json_body=self._purge_payload(older_than_days))
+            return data
+        finally:
+            self._invalidate_recall()
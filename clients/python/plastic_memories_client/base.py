@@ -0,0 +1,247 @@
+﻿from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import uuid
+from typing import Any, Optional
+
+import httpx
+
+from .cache import RecallCache
+from .encoding import accept_header, decode_body
+from .errors import PlasticMemoriesError, PlasticMemoriesProtocolError
+from .models import Message, RecallResult, build_injection_block
+from .resilience import CircuitBreaker, HedgePolicy
+from .retry import RetryBudget, RetryPolicy
+
+
+APPEND_BATCH_LIMIT = 1000
+
+
+def _stable_key(content: str) -> str:
+    digest = hashlib.sha1(content.encode("utf-8")).hexdigest()[:8]
+    return f"msg_{digest}"
+
+
+class ClientBase:
+    def __init__(
+        self,
+        base_url: str,
+        user_id: str = "local",
+        persona_id: str = "default",
+        source_app: str = "python_sdk",
+        timeout_s: float = 10,
+        default_headers: Optional[dict] = None,
+        verify: bool | str | None = None,
+        session_id: Optional[str] = None,
+        api_key: Optional[str] = None,
+        limits: httpx.Limits | None = None,
+        retry_policy: RetryPolicy | None = None,
+        retry_budget: RetryBudget | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge: HedgePolicy | None = None,
+        recall_cache: RecallCache | None = None,
+        compact: bool = True,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.user_id = user_id
+        self.persona_id = persona_id
+        self.source_app = source_app
+        self.timeout_s = timeout_s
+        self.api_key = api_key or os.getenv("PLASTIC_MEMORIES_API_KEY")
+        self.default_headers = default_headers or {}
+        if self.api_key and "X-API-Key" not in self.default_headers:
+            self.default_headers["X-API-Key"] = self.api_key
+        self.verify = verify
+        self.limits = limits
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = retry_budget or RetryBudget()
+        self.breaker = breaker
+        self.hedge = hedge
+        self.recall_cache = recall_cache
+        self.compact = compact
+        self.session_id = session_id or self.new_session_id()
+        self._etags: dict[tuple, tuple[str, dict]] = {}
+        self._not_modified = 0
+
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    def _client_kwargs(self, transport: Any) -> dict:
+        kwargs: dict[str, Any] = {
+            "base_url": self.base_url,
+            "timeout": self.timeout_s,
+            "headers": self.default_headers,
+            "verify": self.verify,
+            "transport": transport,
+        }
+        if self.limits is not None:
+            kwargs["limits"] = self.limits
+        return kwargs
+
+    def stats(self) -> dict:
+        return {
+            "breaker": self.breaker.stats() if self.breaker else None,
+            "hedge": self.hedge.stats() if self.hedge else None,
+            "retry_budget": self.retry_budget.tokens,
+            "recall_cache": self.recall_cache.stats() if self.recall_cache else None,
+            "not_modified": self._not_modified,
+        }
+
+    def _invalidate_recall(self) -> None:
+        if self.recall_cache is not None:
+            self.recall_cache.invalidate(self.persona_id)
+
+    def _before_attempt(self) -> None:
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def _record_attempt(self, outcome: httpx.Response | Exception) -> None:
+        if self.breaker is not None:
+            self.breaker.record(outcome)
+
+    def _make_headers(self, headers: Optional[dict] = None) -> dict:
+        merged = {}
+        merged.update(self.default_headers)
+        if headers:
+            merged.update(headers)
+        if self.api_key and "X-API-Key" not in merged:
+            merged["X-API-Key"] = self.api_key
+        if self.compact and "Accept" not in merged:
+            merged["Accept"] = accept_header()
+        if "X-Request-Id" not in merged:
+            merged["X-Request-Id"] = uuid.uuid4().hex
+        return merged
+
+    @staticmethod
+    def _etag_key(path: str, params: dict | None) -> tuple:
+        return (path, tuple(sorted((params or {}).items())))
+
+    def _conditional_headers(self, key: tuple | None, headers: Optional[dict]) -> Optional[dict]:
+        cached = self._etags.get(key) if key is not None else None
+        if cached is None:
+            return headers
+        return {**(headers or {}), "If-None-Match": cached[0]}
+
+    def _parse_conditional(self, key: tuple | None, response: httpx.Response) -> tuple[dict, Optional[str]]:
+        cached = self._etags.get(key) if key is not None else None
+        if cached is not None and response.status_code == 304:
+            self._not_modified += 1
+            return copy.deepcopy(cached[1]), response.headers.get("X-Request-Id")
+        data, request_id = self._parse_envelope(response)
+        etag = response.headers.get("ETag")
+        if key is not None and etag:
+            self._etags[key] = (etag, copy.deepcopy(data))
+        return data, request_id
+
+    def _parse_envelope(self, response: httpx.Response) -> tuple[dict, Optional[str]]:
+        request_id = response.headers.get("X-Request-Id")
+        try:
+            payload = decode_body(response)
+        except Exception as exc:
+            raise PlasticMemoriesProtocolError("响应不是有效 JSON", request_id=request_id) from exc
+        if not isinstance(payload, dict) or "ok" not in payload:
+            raise PlasticMemoriesProtocolError("响应不符合 Envelope 契约", request_id=request_id)
+        if payload.get("ok") is True:
+            if "data" not in payload:
+                raise PlasticMemoriesProtocolError("响应缺少 data 字段", request_id=request_id)
+            return payload["data"], request_id
+        error = payload.get("error") or {}
+        raise PlasticMemoriesError(
+            code=error.get("code", "http_error"),
+            message=error.get("message", "请求失败"),
+            details=error.get("detail"),
+            request_id=payload.get("request_id") or request_id,
+            status_code=response.status_code,
+        )
+
+    def _persona_create_payload(self, meta: dict | None, seed: dict | None) -> dict:
+        payload = {"persona_id": self.persona_id}
+        if meta:
+            payload.update(meta)
+        if seed:
+            payload.update(seed)
+        return payload
+
+    def _template_payload(self, template_path: str, allow_overwrite: bool) -> dict:
+        return {
+            "persona_id": self.persona_id,
+            "template_path": template_path,
+            "allow_overwrite": allow_overwrite,
+        }
+
+    def _template_batch_payload(self, template_path: str, persona_ids: list[str], allow_overwrite: bool) -> dict:
+        return {
+            "persona_ids": persona_ids,
+            "template_path": template_path,
+            "allow_overwrite": allow_overwrite,
+        }
+
+    def _recall_payload(self, query: str, top_k: int | None) -> dict:
+        return {
+            "persona_id": self.persona_id,
+            "query": query,
+            "limit": top_k or 10,
+        }
+
+    def _recall_result(self, data: dict, request_id: Optional[str], include_profile: bool, include_snippets: bool) -> RecallResult:
+        persona_profile = data.get("PERSONA_PROFILE") if include_profile else None
+        memory_items = data.get("PERSONA_MEMORY", []) if include_profile else []
+        chat_snippets = data.get("CHAT_SNIPPETS", []) if include_snippets else []
+        injection_block = build_injection_block(data)
+        return RecallResult(
+            raw=data,
+            injection_block=injection_block,
+            persona_profile=persona_profile,
+            memory_items=memory_items,
+            chat_snippets=chat_snippets,
+            request_id=request_id,
+        )
+
+    def _fallback_recall(self) -> RecallResult:
+        return RecallResult(
+            raw={},
+            injection_block=build_injection_block({}),
+            persona_profile=None,
+            memory_items=[],
+            chat_snippets=[],
+            degraded=True,
+        )
+
+    def _message_payload(self, msg: Message, session: str) -> dict:
+        payload = {
+            "persona_id": self.persona_id,
+            "session_id": session,
+            "source_app": self.source_app,
+            "role": msg.role,
+            "content": msg.content,
+        }
+        if msg.created_at:
+            payload["ts"] = msg.created_at
+        return payload
+
+    def _write_payload(self, msg: Message) -> dict:
+        return {
+            "persona_id": self.persona_id,
+            "type": "preferences",
+            "key": _stable_key(msg.content),
+            "content": msg.content,
+            "source_app": self.source_app,
+        }
+
+    def _forget_payload(self, match: dict | None) -> dict:
+        if match is None:
+            raise ValueError("forget_memory 需要 match 参数（含 type/key）")
+        return {
+            "persona_id": self.persona_id,
+            "type": match.get("type"),
+            "key": match.get("key"),
+        }
+
+    def _purge_payload(self, older_than_days: int) -> dict:
+        return {
+            "persona_id": self.persona_id,
+            "days": older_than_days,
+        }
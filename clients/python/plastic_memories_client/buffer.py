@@ -0,0 +1,166 @@
+﻿from __future__ import annotations
+
+import atexit
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from .base import APPEND_BATCH_LIMIT
+from .models import Message
+
+if TYPE_CHECKING:
+    from .client import PlasticMemoriesClient
+
+OVERFLOW_POLICIES = ("drop", "drop_oldest", "block")
+
+
+class MessageBuffer:
+    def __init__(
+        self,
+        client: "PlasticMemoriesClient",
+        max_batch: int = 100,
+        flush_interval_s: float = 1.0,
+        max_pending: int = 10000,
+        overflow: str = "drop_oldest",
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.client = client
+        self.max_batch = min(max_batch, APPEND_BATCH_LIMIT)
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self._pending: deque[dict] = deque()
+        self._inflight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name="pm-message-buffer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "MessageBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, messages: list[Message] | Message, *, session_id: str | None = None) -> int:
+        if isinstance(messages, Message):
+            messages = [messages]
+        session = session_id or self.client.session_id
+        now = int(time.time())
+        accepted = 0
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MessageBuffer 已关闭")
+            for msg in messages:
+                payload = self.client._message_payload(msg, session)
+                # Stamp at enqueue time so a delayed flush does not shift message timestamps.
+                payload.setdefault("ts", now)
+                if not self._make_room():
+                    self.dropped += 1
+                    continue
+                self._pending.append(payload)
+                self.enqueued += 1
+                accepted += 1
+            self._cond.notify_all()
+        return accepted
+
+    def _make_room(self) -> bool:
+        if len(self._pending) < self.max_pending:
+            return True
+        if self.overflow == "drop":
+            return False
+        if self.overflow == "drop_oldest":
+            self._pending.popleft()
+            self.dropped += 1
+            return True
+        while len(self._pending) >= self.max_pending and not self._closed:
+            self._cond.wait()
+        return not self._closed
+
+    def flush(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = 5.0) -> bool:
+        with self._cond:
+            if self._closed:
+                return not self._pending
+            self._closed = True
+            self._cond.notify_all()
+        atexit.unregister(self.close)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._pending) + self._inflight,
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+
+    def _next_batch(self) -> list[dict] | None:
+        with self._cond:
+            deadline = None
+            while True:
+                if not self._pending:
+                    if self._closed:
+                        return None
+                    self._flush_requested = False
+                    deadline = None
+                    self._cond.wait()
+                    continue
+                if len(self._pending) >= self.max_batch or self._flush_requested or self._closed:
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_s
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(self.max_batch, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(count)]
+            self._inflight = count
+            self._cond.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            error = None
+            try:
+                self.client._append_payloads(batch)
+            except Exception as exc:
+                error = exc
+            with self._cond:
+                self._inflight = 0
+                self.batches += 1
+                if error is None:
+                    self.flushed += len(batch)
+                else:
+                    self.failed += len(batch)
+                    self.last_error = error
+                self._cond.notify_all()
@@ -0,0 +1,77 @@
+﻿from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+class RecallCache:
+    def __init__(self, ttl_s: float = 30.0, max_entries: int = 256, stale_ttl_s: float = 300.0) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.stale_ttl_s = stale_ttl_s
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def generation(self, persona_id: str) -> int:
+        return self._epoch + self._generations.get(persona_id, 0)
+
+    def lookup(self, key: tuple, allow_stale: bool = False) -> tuple[Any, Optional[str]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, FRESH
+                if allow_stale and age < self.ttl_s + self.stale_ttl_s:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    return value, STALE
+                if age >= self.ttl_s + self.stale_ttl_s:
+                    del self._entries[key]
+            self.misses += 1
+            return None, None
+
+    def put(self, key: tuple, value: Any, generation: int) -> None:
+        with self._lock:
+            # A write landed while this value was in flight; keep it out of the cache.
+            if self.generation(key[0]) != generation:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, persona_id: str | None = None) -> None:
+        with self._lock:
+            if persona_id is None:
+                self._epoch += 1
+                self._entries.clear()
+                return
+            self._generations[persona_id] = self._generations.get(persona_id, 0) + 1
+            for key in [key for key in self._entries if key[0] == persona_id]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
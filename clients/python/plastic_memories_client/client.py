@@ -1,28 +1,25 @@
 ﻿from __future__ import annotations
 
-import hashlib
-import os
-import uuid
-from typing import Any, Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
 
 import httpx
 import anyio
 
-from .errors import PlasticMemoriesError, PlasticMemoriesTransportError, PlasticMemoriesProtocolError
-from .models import Message, RecallResult, build_injection_block
-from .retry import retry_call
+from .base import APPEND_BATCH_LIMIT, ClientBase
+from .cache import RecallCache
+from .errors import PlasticMemoriesCircuitOpenError, PlasticMemoriesTransportError
+from .models import Message, RecallResult
+from .resilience import CircuitBreaker, HedgePolicy
+from .retry import NO_RETRY, RetryBudget, RetryPolicy
 
 
 def _is_async_transport(transport: httpx.BaseTransport | None) -> bool:
     return transport is not None and not hasattr(transport, "handle_request") and hasattr(transport, "handle_async_request")
 
 
-def _stable_key(content: str) -> str:
-    digest = hashlib.sha1(content.encode("utf-8")).hexdigest()[:8]
-    return f"msg_{digest}"
-
-
-class PlasticMemoriesClient:
+class PlasticMemoriesClient(ClientBase):
     def __init__(
         self,
         base_url: str,
@@ -35,80 +32,49 @@ class PlasticMemoriesClient:
         session_id: Optional[str] = None,
         api_key: Optional[str] = None,
         transport: httpx.BaseTransport | None = None,
+        limits: httpx.Limits | None = None,
+        retry_policy: RetryPolicy | None = None,
+        retry_budget: RetryBudget | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge: HedgePolicy | None = None,
+        recall_cache: RecallCache | None = None,
+        compact: bool = True,
     ) -> None:
-        self.base_url = base_url.rstrip("/")
-        self.user_id = user_id
-        self.persona_id = persona_id
-        self.source_app = source_app
-        self.timeout_s = timeout_s
-        self.api_key = api_key or os.getenv("PLASTIC_MEMORIES_API_KEY")
-        self.default_headers = default_headers or {}
-        if self.api_key and "X-API-Key" not in self.default_headers:
-            self.default_headers["X-API-Key"] = self.api_key
-        self.verify = verify
-        self.session_id = session_id or self.new_session_id()
+        super().__init__(
+            base_url,
+            user_id=user_id,
+            persona_id=persona_id,
+            source_app=source_app,
+            timeout_s=timeout_s,
+            default_headers=default_headers,
+            verify=verify,
+            session_id=session_id,
+            api_key=api_key,
+            limits=limits,
+            retry_policy=retry_policy,
+            retry_budget=retry_budget,
+            breaker=breaker,
+            hedge=hedge,
+            recall_cache=recall_cache,
+            compact=compact,
+        )
         self._async_transport = _is_async_transport(transport)
         if self._async_transport:
-            self._client_async = httpx.AsyncClient(
-                base_url=self.base_url,
-                timeout=self.timeout_s,
-                headers=self.default_headers,
-                verify=self.verify,
-                transport=transport,
-            )
+            self._client_async = httpx.AsyncClient(**self._client_kwargs(transport))
             self._client = None
         else:
-            self._client = httpx.Client(
-                base_url=self.base_url,
-                timeout=self.timeout_s,
-                headers=self.default_headers,
-                verify=self.verify,
-                transport=transport,
-            )
+            self._client = httpx.Client(**self._client_kwargs(transport))
             self._client_async = None
+        self._hedge_pool: ThreadPoolExecutor | None = None
 
     def close(self) -> None:
+        if self._hedge_pool:
+            self._hedge_pool.shutdown(wait=False)
         if self._client:
             self._client.close()
         if self._client_async:
             anyio.run(self._client_async.aclose)
 
-    @staticmethod
-    def new_session_id() -> str:
-        return uuid.uuid4().hex
-
-    def _make_headers(self, headers: Optional[dict] = None) -> dict:
-        merged = {}
-        merged.update(self.default_headers)
-        if headers:
-            merged.update(headers)
-        if self.api_key and "X-API-Key" not in merged:
-            merged["X-API-Key"] = self.api_key
-        if "X-Request-Id" not in merged:
-            merged["X-Request-Id"] = uuid.uuid4().hex
-        return merged
-
-    def _parse_envelope(self, response: httpx.Response) -> tuple[dict, Optional[str]]:
-        request_id = response.headers.get("X-Request-Id")
-        try:
-            payload = response.json()
-        except Exception as exc:
-            raise PlasticMemoriesProtocolError("响应不是有效 JSON", request_id=request_id) from exc
-        if not isinstance(payload, dict) or "ok" not in payload:
-            raise PlasticMemoriesProtocolError("响应不符合 Envelope 契约", request_id=request_id)
-        if payload.get("ok") is True:
-            if "data" not in payload:
-                raise PlasticMemoriesProtocolError("响应缺少 data 字段", request_id=request_id)
-            return payload["data"], request_id
-        error = payload.get("error") or {}
-        raise PlasticMemoriesError(
-            code=error.get("code", "http_error"),
-            message=error.get("message", "请求失败"),
-            details=error.get("detail"),
-            request_id=payload.get("request_id") or request_id,
-            status_code=response.status_code,
-        )
-
     async def _arequest(self, method: str, path: str, json_body: dict | None, params: dict | None, headers: dict | None) -> httpx.Response:
         assert self._client_async is not None
         return await self._client_async.request(
@@ -119,11 +85,14 @@ class PlasticMemoriesClient:
             headers=self._make_headers(headers),
         )
 
-    def _request(self, method: str, path: str, *, json_body: dict | None = None, params: dict | None = None, headers: dict | None = None, retry: bool = False, disable_retry: bool = False) -> tuple[dict, Optional[str]]:
+    def _request(self, method: str, path: str, *, json_body: dict | None = None, params: dict | None = None, headers: dict | None = None, retry: bool = False, disable_retry: bool = False, conditional: bool = False) -> tuple[dict, Optional[str]]:
+        etag_key = self._etag_key(path, params) if conditional else None
+
         def do_call():
+            self._before_attempt()
             try:
                 if self._async_transport:
-                    resp = anyio.run(self._arequest, method, path, json_body, params, headers)
+                    resp = anyio.run(self._arequest, method, path, json_body, params, self._conditional_headers(etag_key, headers))
                 else:
                     assert self._client is not None
                     resp = self._client.request(
@@ -131,20 +100,53 @@ class PlasticMemoriesClient:
                         path,
                         json=json_body,
                         params=params,
-                        headers=self._make_headers(headers),
+                        headers=self._make_headers(self._conditional_headers(etag_key, headers)),
                     )
             except Exception as exc:
+                self._record_attempt(exc)
                 raise PlasticMemoriesTransportError(exc, request_id=None) from exc
+            self._record_attempt(resp)
             return resp
 
-        try:
-            if retry and not disable_retry:
-                response = retry_call(do_call)
-            else:
-                response = do_call()
-        except PlasticMemoriesTransportError:
-            raise
-        return self._parse_envelope(response)
+        policy = NO_RETRY if disable_retry else self.retry_policy
+        response = policy.call(do_call, idempotent=retry, budget=self.retry_budget)
+        return self._parse_conditional(etag_key, response)
+
+    def _cached(self, key: tuple, fetch: Callable[[], tuple[dict, Optional[str]]]) -> tuple[dict, Optional[str]]:
+        assert self.recall_cache is not None
+        value, _ = self.recall_cache.lookup(key)
+        if value is None:
+            generation = self.recall_cache.generation(key[0])
+            value = fetch()
+            self.recall_cache.put(key, value, generation)
+        return value
+
+    def _timed(self, fn: Callable[[], tuple[dict, Optional[str]]]) -> tuple[dict, Optional[str]]:
+        started = time.perf_counter()
+        result = fn()
+        assert self.hedge is not None
+        self.hedge.observe(time.perf_counter() - started)
+        return result
+
+    def _hedged(self, fn: Callable[[], tuple[dict, Optional[str]]]) -> tuple[dict, Optional[str]]:
+        assert self.hedge is not None
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pm-hedge")
+        primary = self._hedge_pool.submit(self._timed, fn)
+        done, _ = wait([primary], timeout=self.hedge.delay())
+        if done:
+            self.hedge.record(hedged=False, hedge_won=False)
+            return primary.result()
+        backup = self._hedge_pool.submit(self._timed, fn)
+        pending = {primary, backup}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+            if winner is None and pending:
+                continue
+            winner = winner or next(iter(done))
+            self.hedge.record(hedged=True, hedge_won=winner is backup)
+            return winner.result()
 
     def health(self, disable_retry: bool = False) -> dict:
         data, _ = self._request("GET", "/health", retry=True, disable_retry=disable_retry)
@@ -155,21 +157,16 @@ class PlasticMemoriesClient:
         return data
 
     def persona_create(self, meta: dict | None = None, seed: dict | None = None) -> dict:
-        payload = {"persona_id": self.persona_id}
-        if meta:
-            payload.update(meta)
-        if seed:
-            payload.update(seed)
-        data, _ = self._request("POST", "/persona/create", json_body=payload)
+        data, _ = self._request("POST", "/persona/create", json_body=self._persona_create_payload(meta, seed))
         return data
 
     def create_from_template(self, template_path: str, allow_overwrite: bool = False) -> dict:
-        payload = {
-            "persona_id": self.persona_id,
-            "template_path": template_path,
-            "allow_overwrite": allow_overwrite,
-        }
-        data, _ = self._request("POST", "/persona/create_from_template", json_body=payload)
+        data, _ = self._request("POST", "/persona/create_from_template", json_body=self._template_payload(template_path, allow_overwrite))
+        return data
+
+    def create_from_template_batch(self, template_path: str, persona_ids: list[str], allow_overwrite: bool = False) -> dict:
+        payload = self._template_batch_payload(template_path, persona_ids, allow_overwrite)
+        data, _ = self._request("POST", "/persona/create_from_template_batch", json_body=payload)
         return data
 
     def persona_profile(self, disable_retry: bool = False) -> dict:
@@ -179,9 +176,18 @@ class PlasticMemoriesClient:
             params={"persona_id": self.persona_id},
             retry=True,
             disable_retry=disable_retry,
+            conditional=True,
         )
         return data
 
+    def get_slots(self) -> dict:
+        data, _ = self._request("GET", "/persona/slots/get", params={"persona_id": self.persona_id}, retry=True, conditional=True)
+        return data
+
+    def list_goals(self) -> dict:
+        data, _ = self._request("GET", "/goals/list", params={"persona_id": self.persona_id}, retry=True, conditional=True)
+        return data
+
     def recall(
         self,
         query: str,
@@ -193,57 +199,50 @@ class PlasticMemoriesClient:
         top_k_snippets: int | None = None,
         filters: dict | None = None,
         disable_retry: bool = False,
+        use_cache: bool = True,
     ) -> RecallResult:
-        payload = {
-            "persona_id": self.persona_id,
-            "query": query,
-            "limit": top_k or 10,
-        }
-        data, request_id = self._request("POST", "/memory/recall", json_body=payload, retry=True, disable_retry=disable_retry)
-        persona_profile = data.get("PERSONA_PROFILE") if include_profile else None
-        memory_items = data.get("PERSONA_MEMORY", []) if include_profile else []
-        chat_snippets = data.get("CHAT_SNIPPETS", []) if include_snippets else []
-        injection_block = build_injection_block(data)
-        return RecallResult(
-            raw=data,
-            injection_block=injection_block,
-            persona_profile=persona_profile,
-            memory_items=memory_items,
-            chat_snippets=chat_snippets,
-            request_id=request_id,
-        )
+        payload = self._recall_payload(query, top_k)
+
+        def call() -> tuple[dict, Optional[str]]:
+            return self._request("POST", "/memory/recall", json_body=payload, retry=True, disable_retry=disable_retry)
+
+        def fetch() -> tuple[dict, Optional[str]]:
+            return self._hedged(call) if self.hedge is not None else call()
+
+        try:
+            if self.recall_cache is not None and use_cache:
+                data, request_id = self._cached((self.persona_id, query, top_k), fetch)
+            else:
+                data, request_id = fetch()
+        except PlasticMemoriesCircuitOpenError:
+            return self._fallback_recall()
+        return self._recall_result(data, request_id, include_profile, include_snippets)
 
     def append_messages(self, messages: list[Message], *, session_id: str | None = None) -> dict:
         session = session_id or self.session_id
-        message_ids = []
-        for msg in messages:
-            payload = {
-                "persona_id": self.persona_id,
-                "session_id": session,
-                "source_app": self.source_app,
-                "role": msg.role,
-                "content": msg.content,
-            }
-            if msg.created_at:
-                payload["ts"] = msg.created_at
-            data, _ = self._request("POST", "/messages/append", json_body=payload)
-            message_ids.append(data.get("message_id"))
+        message_ids = self._append_payloads([self._message_payload(msg, session) for msg in messages])
         return {"message_ids": message_ids}
 
+    def _append_payloads(self, payloads: list[dict]) -> list:
+        message_ids: list = []
+        try:
+            for start in range(0, len(payloads), APPEND_BATCH_LIMIT):
+                chunk = payloads[start:start + APPEND_BATCH_LIMIT]
+                data, _ = self._request("POST", "/messages/append_batch", json_body={"messages": chunk})
+                message_ids.extend(data.get("message_ids", []))
+        finally:
+            self._invalidate_recall()
+        return message_ids
+
     def write(self, messages: list[Message], *, bypass_judge: bool = False, session_id: str | None = None) -> dict:
-        written = 0
-        for msg in messages:
-            key = _stable_key(msg.content)
-            payload = {
-                "persona_id": self.persona_id,
-                "type": "preferences",
-                "key": key,
-                "content": msg.content,
-                "source_app": self.source_app,
-            }
-            self._request("POST", "/memory/write", json_body=payload)
-            written += 1
-        return {"written": written}
+        try:
+            written = 0
+            for msg in messages:
+                self._request("POST", "/memory/write", json_body=self._write_payload(msg))
+                written += 1
+            return {"written": written}
+        finally:
+            self._invalidate_recall()
 
     def list_memory(self, type: str | None = None) -> dict:
         data, _ = self._request(
@@ -251,6 +250,7 @@ class PlasticMemoriesClient:
             "/memory/list",
             params={"persona_id": self.persona_id},
             retry=True,
+            conditional=True,
         )
         items = data.get("items", [])
         if type:
@@ -258,20 +258,15 @@ class PlasticMemoriesClient:
         return {"items": items}
 
     def forget_memory(self, memory_id: str | None = None, match: dict | None = None) -> dict:
-        if match is None:
-            raise ValueError("forget_memory 需要 match 参数（含 type/key）")
-        payload = {
-            "persona_id": self.persona_id,
-            "type": match.get("type"),
-            "key": match.get("key"),
-        }
-        data, _ = self._request("POST", "/memory/forget", json_body=payload)
-        return data
+        try:
+            data, _ = self._request("POST", "/memory/forget", json_body=self._forget_payload(match))
+            return data
+        finally:
+            self._invalidate_recall()
 
     def purge_messages(self, older_than_days: int) -> dict:
-        payload = {
-            "persona_id": self.persona_id,
-            "days": older_than_days,
-        }
-        data, _ = self._request("POST", "/messages/purge", json_body=payload)
-        return data
+        try:
+            data, _ = self._request("POST", "/messages/purge", json_body=self._purge_payload(older_than_days))
+            return data
+        finally:
+            self._invalidate_recall()
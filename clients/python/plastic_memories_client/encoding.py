@@ -0,0 +1,43 @@
+﻿from __future__ import annotations
+
+import json
+from typing import Any
+
+import httpx
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MEDIA_JSON = "application/json"
+MEDIA_COLUMNAR = "application/vnd.plastic-memories.columnar+json"
+MEDIA_MSGPACK = "application/msgpack"
+COLUMNS_KEY = "$columns"
+ROWS_KEY = "$rows"
+
+
+def accept_header() -> str:
+    if msgpack is not None:
+        return f"{MEDIA_MSGPACK}, {MEDIA_COLUMNAR};q=0.9, {MEDIA_JSON};q=0.5"
+    return f"{MEDIA_COLUMNAR}, {MEDIA_JSON};q=0.5"
+
+
+def from_columnar(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 2 and COLUMNS_KEY in value and ROWS_KEY in value:
+            columns = value[COLUMNS_KEY]
+            return [{column: from_columnar(item) for column, item in zip(columns, row)} for row in value[ROWS_KEY]]
+        return {key: from_columnar(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [from_columnar(item) for item in value]
+    return value
+
+
+def decode_body(response: httpx.Response) -> Any:
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type == MEDIA_MSGPACK and msgpack is not None:
+        return msgpack.unpackb(response.content)
+    if content_type == MEDIA_COLUMNAR:
+        return from_columnar(json.loads(response.content))
+    return response.json()
@@ -24,3 +24,9 @@ class PlasticMemoriesProtocolError(Exception):
     def __init__(self, message: str, request_id: Optional[str] = None):
         super().__init__(message)
         self.request_id = request_id
+
+
+class PlasticMemoriesCircuitOpenError(Exception):
+    def __init__(self, message: str = "熔断器已打开，请求被快速失败"):
+        super().__init__(message)
+        self.message = message
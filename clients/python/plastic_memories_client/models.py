@@ -19,6 +19,7 @@ class RecallResult:
     memory_items: list[dict]
     chat_snippets: list[dict]
     request_id: Optional[str] = None
+    degraded: bool = False
 
 
 def _truncate(text: str, limit: int) -> str:
@@ -0,0 +1,126 @@
+﻿from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from .errors import PlasticMemoriesCircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_failure(outcome: httpx.Response | Exception | None) -> bool:
+    if outcome is None or isinstance(outcome, Exception):
+        return True
+    return outcome.status_code >= 500 or outcome.status_code == 429
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0, half_open_max_calls: int = 1) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_s:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return
+            self.rejected += 1
+        raise PlasticMemoriesCircuitOpenError()
+
+    def record(self, outcome: httpx.Response | Exception | None) -> None:
+        with self._lock:
+            if not is_failure(outcome):
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        if self._state != OPEN:
+            self.opened += 1
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._trials = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class HedgePolicy:
+    def __init__(self, initial_delay_s: float = 0.2, quantile: float = 0.95, window: int = 200, min_samples: int = 20, min_delay_s: float = 0.01) -> None:
+        self.initial_delay_s = initial_delay_s
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay_s = min_delay_s
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> float:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.initial_delay_s
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)
+        return max(self.min_delay_s, ordered[index])
+
+    def observe(self, elapsed_s: float) -> None:
+        with self._lock:
+            self._samples.append(elapsed_s)
+
+    def record(self, hedged: bool, hedge_won: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if hedged:
+                self.hedged += 1
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        delay = self.delay()
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "delay_s": delay,
+            }
@@ -1,5 +1,19 @@
-﻿import time
-from typing import Callable
+﻿from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from .errors import PlasticMemoriesTransportError
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Failures where the request never reached the server are safe to resend even for writes.
+SAFE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
 
 
 def retry_call(fn: Callable[[], object], retries: int = 2, delays: tuple[float, float] = (0.2, 0.5)):
@@ -13,3 +27,141 @@ def retry_call(fn: Callable[[], object], retries: int = 2, delays: tuple[float,
             delay = delays[min(attempts, len(delays) - 1)]
             time.sleep(delay)
             attempts += 1
+
+
+async def aretry_call(fn: Callable[[], Awaitable[object]], retries: int = 2, delays: tuple[float, float] = (0.2, 0.5)):
+    attempts = 0
+    while True:
+        try:
+            return await fn()
+        except Exception:
+            if attempts >= retries:
+                raise
+            delay = delays[min(attempts, len(delays) - 1)]
+            await asyncio.sleep(delay)
+            attempts += 1
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    def __init__(self, capacity: float = 10.0, deposit: float = 0.1) -> None:
+        self.capacity = capacity
+        self.deposit_amount = deposit
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.deposit_amount)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay_s: float = 0.2,
+        max_delay_s: float = 5.0,
+        max_elapsed_s: float = 15.0,
+        retry_statuses: frozenset[int] = RETRY_STATUSES,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.max_elapsed_s = max_elapsed_s
+        self.retry_statuses = retry_statuses
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        return self._rng.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+    def _retryable(self, outcome: httpx.Response | PlasticMemoriesTransportError, idempotent: bool) -> bool:
+        if isinstance(outcome, PlasticMemoriesTransportError):
+            return idempotent or isinstance(outcome.original, SAFE_TRANSPORT_ERRORS)
+        if outcome.status_code not in self.retry_statuses:
+            return False
+        return idempotent or outcome.status_code in (429, 503)
+
+    def next_delay(
+        self,
+        attempt: int,
+        started: float,
+        outcome: httpx.Response | PlasticMemoriesTransportError,
+        idempotent: bool = True,
+        budget: RetryBudget | None = None,
+    ) -> Optional[float]:
+        if attempt + 1 >= self.max_attempts or not self._retryable(outcome, idempotent):
+            return None
+        delay = self.backoff(attempt)
+        if isinstance(outcome, httpx.Response):
+            retry_after = retry_after_seconds(outcome)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        if time.monotonic() - started + delay > self.max_elapsed_s:
+            return None
+        if budget is not None and not budget.withdraw():
+            return None
+        return delay
+
+    def call(self, fn: Callable[[], httpx.Response], idempotent: bool = True, budget: RetryBudget | None = None) -> httpx.Response:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                outcome = fn()
+            except PlasticMemoriesTransportError as exc:
+                outcome = exc
+            delay = self.next_delay(attempt, started, outcome, idempotent, budget)
+            if delay is None:
+                return self._finish(outcome, budget, attempt)
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[httpx.Response]], idempotent: bool = True, budget: RetryBudget | None = None) -> httpx.Response:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                outcome = await fn()
+            except PlasticMemoriesTransportError as exc:
+                outcome = exc
+            delay = self.next_delay(attempt, started, outcome, idempotent, budget)
+            if delay is None:
+                return self._finish(outcome, budget, attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _finish(outcome: httpx.Response | PlasticMemoriesTransportError, budget: RetryBudget | None, attempt: int) -> httpx.Response:
+        if isinstance(outcome, PlasticMemoriesTransportError):
+            raise outcome
+        if budget is not None and attempt == 0 and outcome.status_code < 500:
+            budget.deposit()
+        return outcome
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
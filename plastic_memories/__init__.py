@@ -3,8 +3,12 @@ __all__ = [
     "config",
     "context",
     "db",
+    "compression",
     "migrations",
     "schemas",
     "logging",
+    "metrics",
+    "middleware",
+    "tracing",
     "utils",
 ]
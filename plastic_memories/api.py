@@ -1,20 +1,29 @@
-﻿import json
-import time
+﻿import asyncio
+import functools
+import json
 
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, WebSocket
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse, StreamingResponse
 
-from .config import get_settings
-from .context import set_request_context
-from .auth import AuthedUser, require_user
+from .config import changed_settings, get_settings, install_reload_signal, reload_settings
+from .context import bind_persona
+from .auth import AuthedUser, get_key_store, require_admin, require_user
+from .changes import change_payload, get_change_notifier, stream_changes
+from .conditional import etag_matches, make_etag, not_modified, with_etag
 from .http import ok, fail
-from .logging import configure_logging, log_event
-from .templates import resolve_template_path, load_persona_template
+from .logging import configure_logging, dropped_log_records, log_event
+from .metrics import get_metrics_registry
+from .encoding import EnvelopeResponse
+from .middleware import RequestContextMiddleware, ResponseEncodingMiddleware
+from .tracing import span
+from .templates import TemplateSeed, get_persona_template, get_template_cache
 from .schemas import (
     PersonaCreateRequest,
     PersonaCreateFromTemplateRequest,
+    PersonaCreateFromTemplateBatchRequest,
     MessageAppendRequest,
+    MessageAppendBatchRequest,
     MessagePurgeRequest,
     MemoryWriteRequest,
     MemoryRecallRequest,
@@ -29,48 +38,22 @@ from .schemas import (
     GoalLinkRequest,
 )
 
-from .utils import gen_request_id, now_ts, dumps_json
-from .ext.registry import get_storage, get_recall_engine, get_judge, get_event_sink
+from .utils import now_ts, dumps_json
+from .ext.registry import get_storage, get_recall_engine, get_judge, get_event_sink, get_db_gauges
 from .ext.recall.keyword import build_profile_from_slots
 
-app = FastAPI(title="Plastic Memories", version="0.1.0")
+app = FastAPI(title="Plastic Memories", version="0.1.0", default_response_class=EnvelopeResponse)
+app.add_middleware(ResponseEncodingMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 
 @app.on_event("startup")
 def _startup() -> None:
     configure_logging()
     get_storage()
-
-
-def _extract_persona_from_body(request: Request) -> str | None:
-    return request.query_params.get("persona_id")
-
-
-@app.middleware("http")
-async def request_id_middleware(request: Request, call_next):
-    request_id = request.headers.get("X-Request-Id") or gen_request_id()
-    persona_id = _extract_persona_from_body(request)
-    if not persona_id:
-        try:
-            body = await request.body()
-            if body:
-                payload = json.loads(body.decode("utf-8"))
-                if isinstance(payload, dict):
-                    persona_id = payload.get("persona_id")
-        except Exception:
-            pass
-    set_request_context(request_id, user_id=None, persona_id=persona_id)
-    start = time.time()
-    try:
-        response = await call_next(request)
-    except Exception:
-        duration_ms = int((time.time() - start) * 1000)
-        log_event("api.request", path=request.url.path, status=500, duration_ms=duration_ms, request_id=request_id)
-        raise
-    duration_ms = int((time.time() - start) * 1000)
-    log_event("api.request", path=request.url.path, status=response.status_code, duration_ms=duration_ms, request_id=request_id)
-    response.headers["X-Request-Id"] = request_id
-    return response
+    get_key_store().lookup("")
+    get_template_cache().preload()
+    install_reload_signal()
 
 
 @app.exception_handler(HTTPException)
@@ -135,6 +118,7 @@ def index():
             <li><code>GET /health</code> 健康检查</li>
             <li><code>GET /capabilities</code> 当前能力与实现</li>
             <li><code>GET /metrics</code> 统计信息</li>
+            <li><code>GET /metrics/prometheus</code> Prometheus 指标</li>
           </ul>
         </div>
         <div class="card">
@@ -170,23 +154,66 @@ def capabilities():
 
 @app.get("/metrics", response_model=None)
 def metrics():
-    storage = get_storage()
-    return ok(storage.metrics())
+    data = get_db_gauges().get()
+    data["auth"] = get_key_store().stats()
+    data["templates"] = get_template_cache().stats()
+    data["changes"] = get_change_notifier().stats()
+    sink = get_event_sink()
+    if hasattr(sink, "stats"):
+        data["events"] = sink.stats()
+    data["metrics"] = get_metrics_registry().snapshot()
+    return ok(data)
+
+
+@app.get("/metrics/prometheus", response_class=PlainTextResponse)
+def metrics_prometheus():
+    rows = get_db_gauges().get()
+    auth_stats = get_key_store().stats()
+    gauges = {
+        "plastic_memories_db_rows": {f'{{table="{table}"}}': value for table, value in rows.items()},
+        "plastic_memories_log_records_dropped": {"": dropped_log_records()},
+        "plastic_memories_auth_keys": {"": auth_stats["keys"]},
+        "plastic_memories_auth_key_reloads": {"": auth_stats["reload_count"]},
+        "plastic_memories_auth_key_reloaded_at_seconds": {"": auth_stats["reloaded_at"] or 0},
+    }
+    return PlainTextResponse(get_metrics_registry().render_prometheus(gauges), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/admin/reload", response_model=None)
+def admin_reload(_: None = Depends(require_admin)):
+    old = get_settings()
+    try:
+        new = reload_settings()
+    except (OSError, ValueError) as exc:
+        return JSONResponse(status_code=400, content=fail("config_error", "配置加载失败", detail=str(exc)))
+    changed = changed_settings(old, new)
+    log_event("admin.reload", changed=changed)
+    return ok({"changed": changed})
 
 
 @app.post("/persona/create", response_model=None)
 def persona_create(payload: PersonaCreateRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     storage.create_persona(user.user_id, payload.persona_id, payload.display_name, payload.description)
     return ok({"status": "ok"})
 
 
+def _template_items(seed: TemplateSeed, allow_overwrite: bool) -> list[dict]:
+    items = [{"type": "persona", "key": "persona_md", "content": seed.persona_md or ""}]
+    if allow_overwrite or seed.rules_md:
+        items.append({"type": "rule", "key": "rules_md", "content": seed.rules_md or ""})
+    if allow_overwrite or seed.preferences_json:
+        items.append({"type": "preferences", "key": "preferences_json", "content": json.dumps(seed.preferences_json or {}, ensure_ascii=False)})
+    return items
+
+
 @app.post("/persona/create_from_template", response_model=None)
 def persona_create_from_template(payload: PersonaCreateFromTemplateRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     try:
-        template_dir = resolve_template_path(payload.template_path)
-        seed = load_persona_template(template_dir)
+        _, seed = get_persona_template(payload.template_path)
         log_event(
             "persona.template.load",
             user_id=user.user_id,
@@ -214,39 +241,32 @@ def persona_create_from_template(payload: PersonaCreateFromTemplateRequest, user
         raise HTTPException(status_code=400, detail={"reason": str(exc)})
 
     storage.create_persona(user.user_id, payload.persona_id, None, None)
-    existing = storage.list_memory(user.user_id, payload.persona_id)
-    existing_keys = {(item.get("type"), item.get("mkey")) for item in existing}
-
-    to_write: list[dict] = []
     persona_md = seed.persona_md or ""
     rules_md = seed.rules_md or ""
     preferences_json = seed.preferences_json or {}
-
-    def should_write(mtype: str, key: str) -> bool:
-        if payload.allow_overwrite:
-            return True
-        return (mtype, key) not in existing_keys
-
-    if should_write("persona", "persona_md"):
-        to_write.append({"type": "persona", "key": "persona_md", "content": persona_md})
-    if should_write("rule", "rules_md") and (payload.allow_overwrite or rules_md):
-        to_write.append({"type": "rule", "key": "rules_md", "content": rules_md})
-    if should_write("preferences", "preferences_json") and (payload.allow_overwrite or preferences_json):
-        to_write.append({"type": "preferences", "key": "preferences_json", "content": json.dumps(preferences_json, ensure_ascii=False)})
+    to_write = _template_items(seed, payload.allow_overwrite)
+    if not payload.allow_overwrite:
+        existing_keys = storage.existing_memory_keys(user.user_id, payload.persona_id, [(item["type"], item["key"]) for item in to_write])
+        to_write = [item for item in to_write if (item["type"], item["key"]) not in existing_keys]
 
     applied = bool(to_write)
     skipped = not applied and not payload.allow_overwrite
     overwritten = payload.allow_overwrite and applied
 
-    for item in to_write:
-        decision = get_judge().judge({
+    decisions = get_judge().judge_many([
+        {
             "user_id": user.user_id,
             "persona_id": payload.persona_id,
             "content": item["content"],
             "source_type": "user_explicit",
-        })
+        }
+        for item in to_write
+    ])
+    for decision in decisions:
         if decision["decision"] == "deny":
             raise HTTPException(status_code=400, detail=fail("judge_deny", "Rejected", detail=decision.get("reason")))
+
+    for item, decision in zip(to_write, decisions):
         status = "active"
         if decision["decision"] in ("allow_candidate", "require_confirmation"):
             status = "candidate"
@@ -287,24 +307,133 @@ def persona_create_from_template(payload: PersonaCreateFromTemplateRequest, user
     })
 
 
+@app.post("/persona/create_from_template_batch", response_model=None)
+def persona_create_from_template_batch(payload: PersonaCreateFromTemplateBatchRequest, user: AuthedUser = Depends(require_user)):
+    try:
+        _, seed = get_persona_template(payload.template_path)
+    except json.JSONDecodeError as exc:
+        log_event("persona.template.error", user_id=user.user_id, template_path=payload.template_path)
+        return JSONResponse(
+            status_code=422,
+            content=fail("validation_error", "preferences.json 解析失败", detail=str(exc)),
+        )
+    except Exception as exc:
+        log_event("persona.template.error", user_id=user.user_id, template_path=payload.template_path)
+        raise HTTPException(status_code=400, detail={"reason": str(exc)})
+
+    items = _template_items(seed, payload.allow_overwrite)
+    decisions = get_judge().judge_many([
+        {"user_id": user.user_id, "content": item["content"], "source_type": "user_explicit"}
+        for item in items
+    ])
+    for item, decision in zip(items, decisions):
+        if decision["decision"] == "deny":
+            raise HTTPException(status_code=400, detail=fail("judge_deny", "Rejected", detail=decision.get("reason")))
+        item["status"] = "candidate" if decision["decision"] in ("allow_candidate", "require_confirmation") else "active"
+        item["source_type"] = "user_explicit"
+
+    written = get_storage().apply_template_batch(user.user_id, payload.persona_ids, items, payload.allow_overwrite)
+    applied = [persona_id for persona_id, count in written.items() if count]
+    skipped = [persona_id for persona_id, count in written.items() if not count]
+    for persona_id, count in written.items():
+        bind_persona(persona_id)
+        log_event(
+            "persona.template.apply" if count else "persona.template.skip",
+            user_id=user.user_id,
+            persona_id=persona_id,
+            template_path=payload.template_path,
+        )
+    bind_persona(payload.persona_ids[0] if len(written) == 1 else None)
+    log_event(
+        "persona.template.batch",
+        user_id=user.user_id,
+        template_path=payload.template_path,
+        personas=len(written),
+        applied=len(applied),
+    )
+    return ok({
+        "user_id": user.user_id,
+        "template_path": payload.template_path,
+        "applied": applied,
+        "skipped": skipped,
+        "overwritten": payload.allow_overwrite and bool(applied),
+        "memories_written": sum(written.values()),
+    })
+
+
+def _persona_etag(user_id: str, persona_id: str, scopes: tuple[str, ...], *extra: object) -> str:
+    storage = get_storage()
+    return make_etag(storage.version_epoch(), storage.persona_versions(user_id, persona_id), scopes, *extra)
+
+
 @app.get("/persona/profile", response_model=None)
-def persona_profile(persona_id: str, user: AuthedUser = Depends(require_user)):
+def persona_profile(persona_id: str, user: AuthedUser = Depends(require_user), if_none_match: str | None = Header(default=None, alias="If-None-Match")):
+    settings = get_settings()
+    etag = _persona_etag(user.user_id, persona_id, ("persona", "slots"), settings.profile_max_chars)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     storage = get_storage()
     persona = storage.get_persona(user.user_id, persona_id)
-    settings = get_settings()
     slots = storage.get_slots(user.user_id, persona_id)
-    profile = build_profile_from_slots(persona, slots, settings.profile_max_chars)
-    return ok({"user_id": user.user_id, "persona_id": persona_id, "profile_markdown": profile})
+    with span("profile.build"):
+        profile = build_profile_from_slots(persona, slots, settings.profile_max_chars)
+    return with_etag(ok({"user_id": user.user_id, "persona_id": persona_id, "profile_markdown": profile}), etag)
+
+
+@app.get("/persona/changes", response_model=None)
+async def persona_changes(
+    request: Request,
+    persona_id: str,
+    since: str = "0",
+    timeout: float = 25,
+    user: AuthedUser = Depends(require_user),
+):
+    storage = get_storage()
+    epoch = storage.version_epoch()
+    since = request.headers.get("last-event-id") or since
+    try:
+        offset, same_epoch = _parse_since(since, epoch)
+    except ValueError:
+        return JSONResponse(status_code=422, content=fail("validation_error", "since 格式错误", detail=since))
+    notifier = get_change_notifier()
+    load = functools.partial(storage.persona_versions, user.user_id, persona_id)
+    if "text/event-stream" in request.headers.get("accept", ""):
+        events = stream_changes(notifier, user.user_id, persona_id, epoch, offset if same_epoch else None, load)
+        return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0.0, min(timeout, get_settings().changes_max_wait_s))
+    with notifier.watch(user.user_id, persona_id) as watch:
+        while True:
+            versions = await notifier.versions(user.user_id, persona_id, load)
+            changed = not same_epoch or sum(versions.values()) != offset
+            remaining = deadline - loop.time()
+            if changed or remaining <= 0:
+                return ok(change_payload(epoch, versions, changed))
+            await watch.wait(remaining)
 
 
 @app.post("/messages/append", response_model=None)
 def messages_append(payload: MessageAppendRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     created_at = payload.ts or now_ts()
     msg_id = storage.append_message({**payload.model_dump(), "user_id": user.user_id, "created_at": created_at})
+    _emit("messages.append", user.user_id, payload.persona_id, message_id=msg_id, session_id=payload.session_id, role=payload.role, content=payload.content, created_at=created_at)
     return ok({"status": "ok", "message_id": msg_id})
 
 
+@app.post("/messages/append_batch", response_model=None)
+def messages_append_batch(payload: MessageAppendBatchRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.messages[0].persona_id)
+    storage = get_storage()
+    now = now_ts()
+    items = [{**message.model_dump(), "user_id": user.user_id, "created_at": message.ts or now} for message in payload.messages]
+    msg_ids = storage.append_messages(items)
+    for msg_id, item in zip(msg_ids, items):
+        _emit("messages.append", user.user_id, item["persona_id"], message_id=msg_id, session_id=item["session_id"], role=item["role"], content=item["content"], created_at=item["created_at"])
+    return ok({"status": "ok", "message_ids": msg_ids})
+
+
 @app.get("/messages/recent", response_model=None)
 def messages_recent(persona_id: str, limit: int = 20, days: int | None = None, user: AuthedUser = Depends(require_user)):
     storage = get_storage()
@@ -314,16 +443,20 @@ def messages_recent(persona_id: str, limit: int = 20, days: int | None = None, u
 
 @app.post("/messages/purge", response_model=None)
 def messages_purge(payload: MessagePurgeRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     before_ts = payload.before_ts
     if before_ts is None and payload.days is not None:
         before_ts = now_ts() - payload.days * 86400
     deleted = storage.purge_messages(user.user_id, payload.persona_id, before_ts)
+    if deleted:
+        _emit("messages.purge", user.user_id, payload.persona_id, before_ts=before_ts, deleted=deleted)
     return ok({"status": "ok", "deleted": deleted})
 
 
 @app.post("/memory/write", response_model=None)
 def memory_write(payload: MemoryWriteRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     if payload.temporary:
         return ok({"status": "skipped", "updated": False})
     judge = get_judge()
@@ -345,28 +478,129 @@ def memory_write(payload: MemoryWriteRequest, user: AuthedUser = Depends(require
     return ok({"status": "ok", "updated": updated, "memory_id": mem_id, "memory_status": status})
 
 
+def _parse_since(value: str, epoch: str) -> tuple[int, bool]:
+    since_epoch, _, offset = value.rpartition(":")
+    return int(offset), not since_epoch or since_epoch == epoch
+
+
+def _split_events(value: str | None) -> list[str] | None:
+    events = [item.strip() for item in (value or "").split(",") if item.strip()]
+    return events or None
+
+
+def _emit(event: str, user_id: str, persona_id: str, **fields) -> None:
+    get_event_sink().emit(event, {"user_id": user_id, "persona_id": persona_id, **fields})
+
+
+@app.get("/events", response_model=None)
+def events_list(
+    since: str = "0",
+    persona_id: str | None = None,
+    events: str | None = None,
+    limit: int = 100,
+    user: AuthedUser = Depends(require_user),
+):
+    sink = get_event_sink()
+    if not hasattr(sink, "replay"):
+        raise HTTPException(status_code=404, detail="Events disabled")
+    epoch = sink.log.epoch
+    try:
+        offset, same_epoch = _parse_since(since, epoch)
+    except ValueError:
+        return JSONResponse(status_code=422, content=fail("validation_error", "since 格式错误", detail=since))
+    records, complete, upto = sink.replay(user.user_id, offset if same_epoch else 0, persona_id, _split_events(events), max(1, min(limit, 1000)))
+    resync = not (same_epoch and complete)
+    if resync:
+        records, upto = [], sink.log.last_offset
+    return ok({
+        "epoch": epoch,
+        "items": [record.to_dict(epoch) for record in records],
+        "next": f"{epoch}:{upto}",
+        "resync": resync,
+    })
+
+
+@app.websocket("/ws/events")
+async def events_ws(websocket: WebSocket):
+    api_key = websocket.headers.get("x-api-key") or websocket.query_params.get("api_key")
+    user_id = get_key_store().lookup(api_key) if api_key else None
+    if not user_id:
+        await websocket.close(code=1008, reason="Unauthorized")
+        return
+    sink = get_event_sink()
+    if not hasattr(sink, "subscribe"):
+        await websocket.close(code=1008, reason="Events disabled")
+        return
+    epoch = sink.log.epoch
+    since = websocket.query_params.get("since")
+    try:
+        resume = _parse_since(since, epoch) if since else None
+    except ValueError:
+        await websocket.close(code=1008, reason="Invalid since")
+        return
+    persona_id = websocket.query_params.get("persona_id")
+    events = _split_events(websocket.query_params.get("events"))
+    subscription = sink.subscribe(user_id, persona_id=persona_id, events=events)
+    await websocket.accept()
+
+    async def pump() -> None:
+        last_sent = 0
+        if resume is not None:
+            offset, same_epoch = resume
+            records, complete, _ = sink.replay(user_id, offset, persona_id, events) if same_epoch else ([], False, 0)
+            if not (same_epoch and complete):
+                reason = "truncated" if same_epoch else "epoch_changed"
+                await websocket.send_json({"event": "resync", "data": {"reason": reason}, "offset": sink.log.last_offset, "epoch": epoch})
+                records = []
+            for record in records:
+                await websocket.send_json(record.to_dict(epoch))
+                last_sent = record.offset
+        while True:
+            record = await subscription.get()
+            if record.offset > last_sent:
+                await websocket.send_json(record.to_dict(epoch))
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        pump_task.cancel()
+        sink.unsubscribe(subscription)
+
+
 @app.post("/memory/recall", response_model=None)
 def memory_recall(payload: MemoryRecallRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     recall_engine = get_recall_engine()
     result = recall_engine.recall(user.user_id, payload.persona_id, payload.query, payload.limit)
     return ok(result)
 
 
 @app.get("/memory/list", response_model=None)
-def memory_list(persona_id: str, user: AuthedUser = Depends(require_user)):
+def memory_list(persona_id: str, user: AuthedUser = Depends(require_user), if_none_match: str | None = Header(default=None, alias="If-None-Match")):
+    etag = _persona_etag(user.user_id, persona_id, ("memory",))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     storage = get_storage()
-    return ok({"items": storage.list_memory(user.user_id, persona_id)})
+    return with_etag(ok({"items": storage.list_memory(user.user_id, persona_id)}), etag)
 
 
 @app.post("/memory/forget", response_model=None)
 def memory_forget(payload: MemoryForgetRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     deleted = storage.forget_memory(user.user_id, payload.persona_id, payload.type, payload.key)
+    if deleted:
+        _emit("memory.forget", user.user_id, payload.persona_id, type=payload.type, key=payload.key, deleted=deleted)
     return ok({"status": "ok", "deleted": deleted})
 
 
 @app.post("/memory/rebuild", response_model=None)
 def memory_rebuild(payload: MemoryRebuildRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     storage.rebuild_fts(user.user_id, payload.persona_id)
     return ok({"status": "ok"})
@@ -374,6 +608,7 @@ def memory_rebuild(payload: MemoryRebuildRequest, user: AuthedUser = Depends(req
 
 @app.post("/memory/confirm", response_model=None)
 def memory_confirm(payload: MemoryConfirmRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     result = storage.confirm_memory(user.user_id, payload.persona_id, payload.memory_id, payload.supersedes_id)
     if not result:
@@ -394,50 +629,76 @@ def memory_confirm(payload: MemoryConfirmRequest, user: AuthedUser = Depends(req
                 "superseded": superseded,
             })
             storage.set_slot(user.user_id, payload.persona_id, memory["type"], value_json, provenance_json)
+            _emit("slots.set", user.user_id, payload.persona_id, slot_name=memory["type"], source="memory_confirm")
+    if result["updated"]:
+        _emit("memory.confirm", user.user_id, payload.persona_id, memory_id=payload.memory_id, status=result["status"], supersedes_id=payload.supersedes_id)
     return ok({"status": "ok", "updated": result["updated"], "memory_status": result["status"]})
 
 
 @app.post("/memory/revoke", response_model=None)
 def memory_revoke(payload: MemoryRevokeRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     result = storage.revoke_memory(user.user_id, payload.persona_id, payload.memory_id)
     if not result:
         raise HTTPException(status_code=404, detail="Memory not found")
+    if result["updated"]:
+        _emit("memory.revoke", user.user_id, payload.persona_id, memory_id=payload.memory_id, status=result["status"])
     return ok({"status": "ok", "updated": result["updated"], "memory_status": result["status"]})
 
 
+def _slots_response(user_id: str, persona_id: str, if_none_match: str | None):
+    etag = _persona_etag(user_id, persona_id, ("slots",))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    storage = get_storage()
+    slots = storage.get_slots(user_id, persona_id)
+    return with_etag(ok({"items": slots}), etag)
+
+
+@app.get("/persona/slots/get", response_model=None)
+def persona_slots_get_conditional(persona_id: str, user: AuthedUser = Depends(require_user), if_none_match: str | None = Header(default=None, alias="If-None-Match")):
+    return _slots_response(user.user_id, persona_id, if_none_match)
+
+
 @app.post("/persona/slots/get", response_model=None)
 def persona_slots_get(payload: PersonaSlotsGetRequest, user: AuthedUser = Depends(require_user)):
-    storage = get_storage()
-    slots = storage.get_slots(user.user_id, payload.persona_id)
-    return ok({"items": slots})
+    bind_persona(payload.persona_id)
+    return _slots_response(user.user_id, payload.persona_id, None)
 
 
 @app.post("/persona/slots/set", response_model=None)
 def persona_slots_set(payload: PersonaSlotsSetRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     value_json = dumps_json(payload.value_json)
     provenance_json = dumps_json(payload.provenance_json) if payload.provenance_json is not None else None
     storage.set_slot(user.user_id, payload.persona_id, payload.slot_name, value_json, provenance_json)
+    _emit("slots.set", user.user_id, payload.persona_id, slot_name=payload.slot_name, value=payload.value_json, source="slots_set")
     return ok({"status": "ok"})
 
 
 @app.post("/goals/create", response_model=None)
 def goals_create(payload: GoalCreateRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     goal_id = storage.create_goal(user.user_id, payload.persona_id, payload.title, payload.details)
     return ok({"status": "ok", "goal_id": goal_id})
 
 
 @app.get("/goals/list", response_model=None)
-def goals_list(persona_id: str, user: AuthedUser = Depends(require_user)):
+def goals_list(persona_id: str, user: AuthedUser = Depends(require_user), if_none_match: str | None = Header(default=None, alias="If-None-Match")):
+    etag = _persona_etag(user.user_id, persona_id, ("goals",))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     storage = get_storage()
     items = storage.list_goals(user.user_id, persona_id)
-    return ok({"items": items})
+    return with_etag(ok({"items": items}), etag)
 
 
 @app.post("/goals/update_status", response_model=None)
 def goals_update_status(payload: GoalUpdateStatusRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     updated = storage.update_goal_status(user.user_id, payload.persona_id, payload.goal_id, payload.status)
     if updated == 0:
@@ -447,6 +708,7 @@ def goals_update_status(payload: GoalUpdateStatusRequest, user: AuthedUser = Dep
 
 @app.post("/goals/link", response_model=None)
 def goals_link(payload: GoalLinkRequest, user: AuthedUser = Depends(require_user)):
+    bind_persona(payload.persona_id)
     storage = get_storage()
     link_id = storage.link_goal(user.user_id, payload.persona_id, payload.goal_id, payload.memory_id, payload.note)
     if link_id is None:
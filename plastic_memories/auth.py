@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import hmac
 import os
+import threading
+import time
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict
 
 from fastapi import Header, HTTPException
 
+from .config import Settings, on_settings_reload
 from .context import get_persona_id, get_request_id, set_request_context
 from .http import fail
+from .logging import log_event
 
 
 @dataclass(frozen=True)
@@ -34,10 +41,119 @@ def parse_api_keys(env_str: str | None) -> Dict[str, str]:
     return items
 
 
+def hash_api_key(api_key: str) -> bytes:
+    return hashlib.sha256(api_key.encode("utf-8")).digest()
+
+
+def _hashed_entries(text: str | None) -> Dict[bytes, str]:
+    if not text:
+        return {}
+    items: Dict[bytes, str] = {}
+    for line in text.splitlines():
+        if line.strip().startswith("#"):
+            continue
+        for part in line.split(","):
+            part = part.strip()
+            if part.startswith("sha256:"):
+                digest, _, user_id = part[len("sha256:"):].partition(":")
+                try:
+                    if user_id.strip():
+                        items[bytes.fromhex(digest.strip())] = user_id.strip()
+                except ValueError:
+                    continue
+                continue
+            for key, user_id in parse_api_keys(part).items():
+                items[hash_api_key(key)] = user_id
+    return items
+
+
+class ApiKeyStore:
+    def __init__(self, check_interval_s: float | None = None) -> None:
+        self.check_interval_s = check_interval_s if check_interval_s is not None else float(os.getenv("PLASTIC_MEMORIES_API_KEYS_CHECK_S", "5"))
+        self._keys: Dict[bytes, str] = {}
+        self._file_path: Path | None = None
+        self._file_sig: tuple[int, int] | None = None
+        self._checked_at = 0.0
+        self._reload_requested = True
+        self._lock = threading.Lock()
+        self.reload_count = 0
+        self.reloaded_at: float | None = None
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        if self._file_path is None:
+            return None
+        try:
+            stat = self._file_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> None:
+        with self._lock:
+            file_env = os.getenv("PLASTIC_MEMORIES_API_KEYS_FILE")
+            self._file_path = Path(file_env).expanduser() if file_env else None
+            keys = _hashed_entries(os.getenv("PLASTIC_MEMORIES_API_KEYS"))
+            self._file_sig = self._file_signature()
+            if self._file_sig is not None:
+                keys.update(_hashed_entries(self._file_path.read_text(encoding="utf-8")))
+            self._keys = keys
+            self._reload_requested = False
+            self._checked_at = time.monotonic()
+            self.reload_count += 1
+            self.reloaded_at = time.time()
+        log_event("auth.keys.reload", keys=len(keys), reload_count=self.reload_count)
+
+    def request_reload(self) -> None:
+        self._reload_requested = True
+
+    def _maybe_reload(self) -> None:
+        if self._reload_requested:
+            self.reload()
+            return
+        if self._file_path is None:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval_s:
+            return
+        self._checked_at = now
+        if self._file_signature() != self._file_sig:
+            self.reload()
+
+    def lookup(self, api_key: str) -> str | None:
+        self._maybe_reload()
+        return self._keys.get(hash_api_key(api_key))
+
+    def stats(self) -> dict:
+        return {"keys": len(self._keys), "reload_count": self.reload_count, "reloaded_at": self.reloaded_at}
+
+
+_key_store: ApiKeyStore | None = None
+
+
+def get_key_store() -> ApiKeyStore:
+    global _key_store
+    if _key_store is None:
+        _key_store = ApiKeyStore()
+    return _key_store
+
+
+@on_settings_reload
+def _on_settings_reload(old: Settings, new: Settings) -> None:
+    if _key_store is not None:
+        _key_store.request_reload()
+
+
+def require_admin(x_admin_key: str | None = Header(default=None, alias="X-Admin-Key")) -> None:
+    admin_key = os.getenv("PLASTIC_MEMORIES_ADMIN_KEY")
+    if not admin_key:
+        raise HTTPException(status_code=403, detail="Admin disabled")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode("utf-8"), admin_key.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
 def require_user(x_api_key: str | None = Header(default=None, alias="X-API-Key")) -> AuthedUser:
-    mapping = parse_api_keys(os.getenv("PLASTIC_MEMORIES_API_KEYS"))
-    if not x_api_key or x_api_key not in mapping:
+    user_id = get_key_store().lookup(x_api_key) if x_api_key else None
+    if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
-    user_id = mapping[x_api_key]
     set_request_context(get_request_id(), user_id=user_id, persona_id=get_persona_id())
     return AuthedUser(user_id=user_id)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+import anyio
+
+from .config import get_settings
+from .utils import dumps_json
+
+PersonaKey = tuple[str, str]
+
+
+class _Channel:
+    __slots__ = ("seq", "versions", "loaded_seq", "loaded_at", "watches", "load_lock")
+
+    def __init__(self) -> None:
+        self.seq = 0
+        self.versions: dict[str, int] | None = None
+        self.loaded_seq = -1
+        self.loaded_at = 0.0
+        self.watches: set[ChangeWatch] = set()
+        self.load_lock = threading.Lock()
+
+
+class ChangeWatch:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.event.clear()
+        return True
+
+
+class ChangeNotifier:
+    def __init__(self) -> None:
+        self._channels: dict[PersonaKey, _Channel] = {}
+        self._lock = threading.Lock()
+        self.notifications = 0
+        self.loads = 0
+
+    def notify(self, keys: Iterable[PersonaKey]) -> None:
+        for key in keys:
+            channel = self._channels.get(key)
+            if channel is None:
+                continue
+            with self._lock:
+                channel.seq += 1
+                watches = tuple(channel.watches)
+            self.notifications += 1
+            for watch in watches:
+                try:
+                    watch.loop.call_soon_threadsafe(watch.event.set)
+                except RuntimeError:
+                    continue
+
+    @contextmanager
+    def watch(self, user_id: str, persona_id: str) -> Iterator[ChangeWatch]:
+        key = (user_id, persona_id)
+        watch = ChangeWatch(asyncio.get_running_loop())
+        with self._lock:
+            channel = self._channels.setdefault(key, _Channel())
+            channel.watches.add(watch)
+        try:
+            yield watch
+        finally:
+            with self._lock:
+                channel.watches.discard(watch)
+                if not channel.watches and self._channels.get(key) is channel:
+                    del self._channels[key]
+
+    def _fresh(self, channel: _Channel) -> dict[str, int] | None:
+        if channel.versions is None or channel.loaded_seq != channel.seq:
+            return None
+        if time.monotonic() - channel.loaded_at >= get_settings().changes_refresh_s:
+            return None
+        return channel.versions
+
+    def _load(self, channel: _Channel, load: Callable[[], dict[str, int]]) -> dict[str, int]:
+        with channel.load_lock:
+            versions = self._fresh(channel)
+            if versions is not None:
+                return versions
+            seq = channel.seq
+            versions = load()
+            self.loads += 1
+            channel.versions, channel.loaded_seq, channel.loaded_at = versions, seq, time.monotonic()
+            return versions
+
+    async def versions(self, user_id: str, persona_id: str, load: Callable[[], dict[str, int]]) -> dict[str, int]:
+        channel = self._channels.get((user_id, persona_id))
+        if channel is None:
+            return await anyio.to_thread.run_sync(load)
+        # Watchers of one persona share a single cached read; only a notify or the refresh interval reloads it.
+        versions = self._fresh(channel)
+        if versions is not None:
+            return versions
+        return await anyio.to_thread.run_sync(self._load, channel, load)
+
+    def stats(self) -> dict:
+        return {
+            "personas": len(self._channels),
+            "watchers": sum(len(channel.watches) for channel in list(self._channels.values())),
+            "notifications": self.notifications,
+            "loads": self.loads,
+        }
+
+
+def change_payload(epoch: str, versions: dict[str, int], changed: bool) -> dict:
+    return {"version": f"{epoch}:{sum(versions.values())}", "versions": versions, "changed": changed}
+
+
+async def stream_changes(
+    notifier: ChangeNotifier,
+    user_id: str,
+    persona_id: str,
+    epoch: str,
+    since: int | None,
+    load: Callable[[], dict[str, int]],
+) -> AsyncIterator[str]:
+    heartbeat_s = get_settings().changes_heartbeat_s
+    with notifier.watch(user_id, persona_id) as watch:
+        last = since
+        while True:
+            versions = await notifier.versions(user_id, persona_id, load)
+            total = sum(versions.values())
+            if total != last:
+                last = total
+                yield f"id: {epoch}:{total}\nevent: change\ndata: {dumps_json(change_payload(epoch, versions, True))}\n\n"
+            if not await watch.wait(heartbeat_s):
+                yield ": ping\n\n"
+
+
+_notifier: ChangeNotifier | None = None
+
+
+def get_change_notifier() -> ChangeNotifier:
+    global _notifier
+    if _notifier is None:
+        _notifier = ChangeNotifier()
+    return _notifier
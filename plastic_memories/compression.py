@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import re
+import zlib
+from collections import Counter
+from typing import Iterable
+
+CODEC_ZLIB = "zlib"
+ZDICT_MAX_BYTES = 32 * 1024
+ZDICT_MIN_SAMPLE_BYTES = 1024
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]+")
+
+
+def compress_text(text: str, zdict: bytes | None = None) -> bytes:
+    if zdict:
+        compressor = zlib.compressobj(level=6, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level=6)
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def decompress_text(data: bytes, zdict: bytes | None = None) -> str:
+    if zdict:
+        decompressor = zlib.decompressobj(zdict=zdict)
+    else:
+        decompressor = zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+
+def format_codec(dict_id: int | None) -> str:
+    if dict_id is None:
+        return CODEC_ZLIB
+    return f"{CODEC_ZLIB}:{dict_id}"
+
+
+def parse_codec(codec: str) -> tuple[str, int | None]:
+    name, _, dict_id = codec.partition(":")
+    if name != CODEC_ZLIB:
+        raise ValueError(f"Unknown content codec: {codec}")
+    return name, int(dict_id) if dict_id else None
+
+
+def train_dictionary(samples: Iterable[str], max_bytes: int = ZDICT_MAX_BYTES) -> bytes | None:
+    # zlib preset dictionaries favour the strings placed last, so the most
+    # valuable tokens (frequency * size) go at the end of the buffer.
+    counts: Counter[str] = Counter()
+    total = 0
+    for sample in samples:
+        total += len(sample.encode("utf-8"))
+        counts.update(tok for tok in _TOKEN_RE.findall(sample) if len(tok) > 1)
+    if total < ZDICT_MIN_SAMPLE_BYTES:
+        return None
+    ranked = sorted(
+        (tok for tok, n in counts.items() if n > 1),
+        key=lambda tok: counts[tok] * len(tok.encode("utf-8")),
+        reverse=True,
+    )
+    chunks: list[bytes] = []
+    size = 0
+    for tok in ranked:
+        encoded = tok.encode("utf-8") + b" "
+        if size + len(encoded) > max_bytes:
+            break
+        chunks.append(encoded)
+        size += len(encoded)
+    if not chunks:
+        return None
+    return b"".join(reversed(chunks))
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from starlette.responses import Response
+
+from .encoding import MEDIA_COLUMNAR, MEDIA_MSGPACK, response_format_var
+
+FORMAT_TAGS = {MEDIA_COLUMNAR: "c", MEDIA_MSGPACK: "m"}
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(epoch: str, versions: dict[str, int], scopes: Iterable[str], *extra: object) -> str:
+    parts = [f"{scope}{versions.get(scope, 0)}" for scope in scopes]
+    parts.extend(str(item) for item in extra)
+    fmt = FORMAT_TAGS.get(response_format_var.get())
+    if fmt:
+        parts.append(fmt)
+    return f'"{epoch}-{".".join(parts)}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -1,6 +1,11 @@
+import json
+import logging
 import os
-from dataclasses import dataclass, field
+import signal
+import threading
+from dataclasses import dataclass, field, fields, replace
 from pathlib import Path
+from typing import Any, Callable
 
 
 def _default_db_path() -> Path:
@@ -41,18 +46,108 @@ class Settings:
     judge: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_JUDGE", "rules"))
     profile: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_PROFILE", "markdown"))
     sensitive: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_SENSITIVE", "strict"))
+    sensitive_terms_file: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_SENSITIVE_TERMS_FILE", ""))
     events: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_EVENTS", "none"))
+    events_queue_size: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_EVENTS_QUEUE_SIZE", "1000")))
+    events_overflow: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_EVENTS_OVERFLOW", "drop_oldest"))
+    events_retention: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_EVENTS_RETENTION", "10000")))
+    events_retention_s: float = field(default_factory=lambda: float(os.getenv("PLASTIC_MEMORIES_EVENTS_RETENTION_S", "3600")))
     message_snippet_days: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_SNIPPET_DAYS", "7")))
     max_snippets: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_SNIPPET_LIMIT", "20")))
     busy_timeout_ms: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_BUSY_TIMEOUT_MS", "5000")))
+    judge_cache_size: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_JUDGE_CACHE_SIZE", "4096")))
     profile_max_chars: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_PROFILE_MAX_CHARS", "2000")))
+    compression: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_COMPRESSION", "none"))
+    compress_min_bytes: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_COMPRESS_MIN_BYTES", "512")))
+    compress_dict_samples: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_COMPRESS_DICT_SAMPLES", "200")))
+    compress_dict_cache_size: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_COMPRESS_DICT_CACHE_SIZE", "256")))
+    http_compression: bool = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_HTTP_COMPRESSION", "1") == "1")
+    http_compress_min_bytes: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_HTTP_COMPRESS_MIN_BYTES", "1024")))
+    changes_max_wait_s: float = field(default_factory=lambda: float(os.getenv("PLASTIC_MEMORIES_CHANGES_MAX_WAIT_S", "30")))
+    changes_heartbeat_s: float = field(default_factory=lambda: float(os.getenv("PLASTIC_MEMORIES_CHANGES_HEARTBEAT_S", "15")))
+    changes_refresh_s: float = field(default_factory=lambda: float(os.getenv("PLASTIC_MEMORIES_CHANGES_REFRESH_S", "30")))
+    tracing: bool = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_TRACING", "0") == "1")
+    metrics_refresh_s: float = field(default_factory=lambda: float(os.getenv("PLASTIC_MEMORIES_METRICS_REFRESH_S", "30")))
+    log_level: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_LOG_LEVEL", "INFO").upper())
+    log_sampling: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_LOG_SAMPLING", ""))
+    log_event_levels: str = field(default_factory=lambda: os.getenv("PLASTIC_MEMORIES_LOG_EVENT_LEVELS", ""))
+    slow_request_ms: int = field(default_factory=lambda: int(os.getenv("PLASTIC_MEMORIES_SLOW_REQUEST_MS", "1000")))
 
 
+SettingsListener = Callable[[Settings, Settings], None]
+
 _settings = None
+_reload_lock = threading.Lock()
+_listeners: list[SettingsListener] = []
+_FIELD_TYPES = {item.name: item.type for item in fields(Settings)}
+
+
+def _coerce(name: str, value: Any) -> Any:
+    kind = _FIELD_TYPES[name]
+    if kind is Path:
+        return Path(str(value)).expanduser()
+    if kind is bool:
+        return value if isinstance(value, bool) else str(value).strip().lower() in ("1", "true", "yes", "on")
+    return kind(value)
+
+
+def _load_overrides() -> dict[str, Any]:
+    path = os.getenv("PLASTIC_MEMORIES_CONFIG_FILE")
+    if not path:
+        return {}
+    data = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("配置文件必须是 JSON 对象")
+    unknown = sorted(set(data) - set(_FIELD_TYPES))
+    if unknown:
+        raise ValueError(f"未知配置项: {', '.join(unknown)}")
+    return {name: _coerce(name, value) for name, value in data.items()}
+
+
+def load_settings() -> Settings:
+    return replace(Settings(), **_load_overrides())
 
 
 def get_settings() -> Settings:
     global _settings
     if _settings is None:
-        _settings = Settings()
+        _settings = load_settings()
     return _settings
+
+
+def on_settings_reload(listener: SettingsListener) -> SettingsListener:
+    if listener not in _listeners:
+        _listeners.append(listener)
+    return listener
+
+
+def changed_settings(old: Settings, new: Settings) -> list[str]:
+    return [name for name in _FIELD_TYPES if getattr(old, name) != getattr(new, name)]
+
+
+def reload_settings() -> Settings:
+    global _settings
+    with _reload_lock:
+        new = load_settings()
+        old = _settings if _settings is not None else new
+        _settings = new
+        for listener in list(_listeners):
+            try:
+                listener(old, new)
+            except Exception:
+                logging.getLogger("plastic_memories").exception("settings reload listener failed")
+    return new
+
+
+def install_reload_signal() -> bool:
+    if not hasattr(signal, "SIGHUP"):
+        return False
+
+    def _handle(signum, frame) -> None:
+        threading.Thread(target=reload_settings, name="plastic-memories-reload", daemon=True).start()
+
+    try:
+        signal.signal(signal.SIGHUP, _handle)
+    except ValueError:
+        return False
+    return True
@@ -3,12 +3,33 @@ import contextvars
 request_id_var = contextvars.ContextVar("request_id", default=None)
 user_id_var = contextvars.ContextVar("user_id", default=None)
 persona_id_var = contextvars.ContextVar("persona_id", default=None)
+log_context_var = contextvars.ContextVar("log_context", default=None)
+
+
+def begin_request_context(request_id: str, persona_id: str | None = None) -> dict:
+    log_context = {"user_id": None, "persona_id": persona_id}
+    log_context_var.set(log_context)
+    request_id_var.set(request_id)
+    user_id_var.set(None)
+    persona_id_var.set(persona_id)
+    return log_context
 
 
 def set_request_context(request_id: str | None, user_id: str | None = None, persona_id: str | None = None):
     request_id_var.set(request_id)
     user_id_var.set(user_id)
     persona_id_var.set(persona_id)
+    log_context = log_context_var.get()
+    if log_context is not None:
+        log_context["user_id"] = user_id
+        log_context["persona_id"] = persona_id
+
+
+def bind_persona(persona_id: str | None) -> None:
+    persona_id_var.set(persona_id)
+    log_context = log_context_var.get()
+    if log_context is not None:
+        log_context["persona_id"] = persona_id
 
 
 def get_request_id() -> str | None:
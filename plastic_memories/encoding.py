@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import contextvars
+import gzip
+from typing import Any, Mapping
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
+
+from . import jsonlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MEDIA_JSON = "application/json"
+MEDIA_COLUMNAR = "application/vnd.plastic-memories.columnar+json"
+MEDIA_MSGPACK = "application/msgpack"
+COLUMNS_KEY = "$columns"
+ROWS_KEY = "$rows"
+COMPRESSIBLE_TYPES = ("application/json", "application/vnd.plastic-memories", "application/msgpack", "text/")
+
+response_format_var: contextvars.ContextVar[str] = contextvars.ContextVar("response_format", default=MEDIA_JSON)
+
+
+def _compress_gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=5)
+
+
+def _encoders() -> dict:
+    encoders = {}
+    if zstandard is not None:
+        encoders["zstd"] = zstandard.ZstdCompressor(level=3).compress
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=4)
+    encoders["gzip"] = _compress_gzip
+    return encoders
+
+
+ENCODERS = _encoders()
+
+
+def response_formats() -> tuple[str, ...]:
+    if msgpack is not None:
+        return (MEDIA_MSGPACK, MEDIA_COLUMNAR, MEDIA_JSON)
+    return (MEDIA_COLUMNAR, MEDIA_JSON)
+
+
+def parse_qualities(header: str | None) -> dict[str, float]:
+    result: dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        result[name] = quality
+    return result
+
+
+def _best(offers: tuple[str, ...], qualities: dict[str, float]) -> str | None:
+    ranked = [(qualities[offer], -index, offer) for index, offer in enumerate(offers) if qualities.get(offer, 0) > 0]
+    return max(ranked)[2] if ranked else None
+
+
+def negotiate_format(accept: str | None) -> str:
+    qualities = parse_qualities(accept)
+    return _best(response_formats(), qualities) or MEDIA_JSON
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    return _best(tuple(ENCODERS), parse_qualities(accept_encoding))
+
+
+def is_compressible(content_type: str | None) -> bool:
+    # Event streams are flushed per event, so they never go through the buffering encoder.
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+
+def to_columnar(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: to_columnar(item) if isinstance(item, (dict, list)) else item for key, item in value.items()}
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            keys = value[0].keys()
+            if all(item.keys() == keys for item in value):
+                columns = list(keys)
+                rows = [[item[key] for key in columns] for item in value]
+                if any(isinstance(cell, (dict, list)) for row in rows for cell in row):
+                    rows = [[to_columnar(cell) for cell in row] for row in rows]
+                return {COLUMNS_KEY: columns, ROWS_KEY: rows}
+        return [to_columnar(item) if isinstance(item, (dict, list)) else item for item in value]
+    return value
+
+
+def encode_default(value: Any) -> Any:
+    # Only reached for values the fast path cannot encode natively (pydantic models, sets, ...).
+    return jsonable_encoder(value)
+
+
+class EnvelopeResponse(JSONResponse):
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+    ) -> None:
+        self.media_type = response_format_var.get()
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type == MEDIA_MSGPACK:
+            return msgpack.packb(content, default=encode_default)
+        if self.media_type == MEDIA_COLUMNAR:
+            content = to_columnar(content)
+        return jsonlib.dumps_bytes(content, default=encode_default)
@@ -1,32 +1,64 @@
 import sqlite3
+import threading
+import uuid
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Sequence
 
+from ...compression import CODEC_ZLIB, compress_text, decompress_text, format_codec, parse_codec, train_dictionary
 from ...config import get_settings
 from ...db import ensure_db_dir
 from ...logging import log_event
 from ...migrations import FTS_MESSAGES_SQL, FTS_MEMORY_SQL, migrate
 from ...utils import now_ts, dumps_json
 
+EXPIRY_SQL = "MIN(COALESCE(expires_at, created_at + ttl_seconds), COALESCE(created_at + ttl_seconds, expires_at))"
+
+ChangeListener = Callable[[Iterable[tuple[str, str]]], None]
+
+
+class _Connection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.changed: set[tuple[str, str]] = set()
+        self.listeners: Sequence[ChangeListener] = ()
+
+    def __exit__(self, exc_type, exc, tb):
+        result = super().__exit__(exc_type, exc, tb)
+        # Listeners run after COMMIT so anything they wake reads the new versions.
+        if exc_type is None and self.changed:
+            changed, self.changed = self.changed, set()
+            for listener in self.listeners:
+                listener(changed)
+        return result
+
 
 class SQLiteStorage:
     def __init__(self) -> None:
-        self._settings = get_settings()
-        self._db_path = Path(self._settings.db_path)
+        self._db_path = Path(get_settings().db_path)
         self._fts_enabled = False
+        self._zdicts: OrderedDict[int, bytes] = OrderedDict()
+        self._persona_dicts: OrderedDict[tuple[str, str], tuple[int | None, int]] = OrderedDict()
+        self._dict_cache_size = get_settings().compress_dict_cache_size
+        self._dict_lock = threading.Lock()
+        self._version_epoch = ""
+        self._change_listeners: list[ChangeListener] = []
 
     def _connect(self) -> sqlite3.Connection:
         ensure_db_dir()
-        conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        conn = sqlite3.connect(self._db_path, check_same_thread=False, factory=_Connection)
         conn.row_factory = sqlite3.Row
+        conn.listeners = self._change_listeners
         conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute(f"PRAGMA busy_timeout={self._settings.busy_timeout_ms};")
+        conn.execute(f"PRAGMA busy_timeout={get_settings().busy_timeout_ms};")
         return conn
 
     def init(self) -> None:
         with self._connect() as conn:
             migrate(conn)
             log_event("db.migrate")
+            conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES('version_epoch', ?)", (uuid.uuid4().hex[:8],))
+            self._version_epoch = conn.execute("SELECT value FROM meta WHERE key='version_epoch'").fetchone()["value"]
             self._try_enable_fts(conn)
         log_event("db.init")
 
@@ -43,13 +75,141 @@ class SQLiteStorage:
     def fts_enabled(self) -> bool:
         return self._fts_enabled
 
+    def version_epoch(self) -> str:
+        return self._version_epoch
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        self._change_listeners.append(listener)
+
+    def _bump(self, conn: _Connection, user_id: str, persona_id: str, scopes: Iterable[str], expires_at: int | None = None) -> None:
+        conn.executemany(
+            "INSERT INTO persona_versions(user_id, persona_id, scope, version, expires_at) VALUES(?, ?, ?, 1, ?) "
+            "ON CONFLICT(user_id, persona_id, scope) DO UPDATE SET version=version+1, expires_at=CASE "
+            "WHEN excluded.expires_at IS NULL THEN expires_at WHEN expires_at IS NULL THEN excluded.expires_at "
+            "ELSE MIN(expires_at, excluded.expires_at) END",
+            [(user_id, persona_id, scope, expires_at if scope == "memory" else None) for scope in scopes],
+        )
+        conn.changed.add((user_id, persona_id))
+
+    def persona_versions(self, user_id: str, persona_id: str) -> dict[str, int]:
+        now = now_ts()
+        query = "SELECT scope, version, expires_at FROM persona_versions WHERE user_id=? AND persona_id=?"
+        with self._connect() as conn:
+            rows = conn.execute(query, (user_id, persona_id)).fetchall()
+            # Items leaving the TTL window change list output without a write, so the first read past expiry bumps.
+            if any(row["expires_at"] is not None and row["expires_at"] <= now for row in rows):
+                conn.execute(
+                    f"UPDATE persona_versions SET version=version+1, expires_at=(SELECT MIN({EXPIRY_SQL}) FROM memory_items "
+                    f"WHERE user_id=? AND persona_id=? AND {EXPIRY_SQL} > ?) WHERE user_id=? AND persona_id=? AND scope='memory'",
+                    (user_id, persona_id, now, user_id, persona_id),
+                )
+                conn.changed.add((user_id, persona_id))
+                rows = conn.execute(query, (user_id, persona_id)).fetchall()
+        return {row["scope"]: int(row["version"]) for row in rows}
+
+    def _cache_get(self, cache: OrderedDict, key: Any) -> Any:
+        with self._dict_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any) -> None:
+        with self._dict_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            if len(cache) > self._dict_cache_size:
+                cache.popitem(last=False)
+
+    def _load_zdict(self, conn: sqlite3.Connection, dict_id: int) -> bytes:
+        zdict = self._cache_get(self._zdicts, dict_id)
+        if zdict is None:
+            row = conn.execute("SELECT data FROM content_dicts WHERE id=?", (dict_id,)).fetchone()
+            if not row:
+                raise ValueError(f"Missing content dictionary: {dict_id}")
+            zdict = bytes(row["data"])
+            self._cache_put(self._zdicts, dict_id, zdict)
+        return zdict
+
+    def _train_content_dict(self, conn: sqlite3.Connection, user_id: str, persona_id: str) -> int | None:
+        limit = get_settings().compress_dict_samples
+        rows = conn.execute(
+            "SELECT content FROM memory_items WHERE user_id=? AND persona_id=? AND content_codec IS NULL ORDER BY updated_at DESC LIMIT ?",
+            (user_id, persona_id, limit),
+        ).fetchall()
+        rows += conn.execute(
+            "SELECT content FROM messages WHERE user_id=? AND persona_id=? AND content_codec IS NULL ORDER BY created_at DESC LIMIT ?",
+            (user_id, persona_id, limit),
+        ).fetchall()
+        zdict = train_dictionary(row["content"] for row in rows)
+        if zdict is None:
+            return None
+        cursor = conn.execute(
+            "INSERT INTO content_dicts(user_id, persona_id, data, created_at) VALUES(?, ?, ?, ?)",
+            (user_id, persona_id, zdict, now_ts()),
+        )
+        dict_id = int(cursor.lastrowid)
+        self._cache_put(self._zdicts, dict_id, zdict)
+        log_event("compression.dict.train", user_id=user_id, persona_id=persona_id)
+        return dict_id
+
+    def _persona_dict_id(self, conn: sqlite3.Connection, user_id: str, persona_id: str) -> int | None:
+        key = (user_id, persona_id)
+        now = now_ts()
+        cached = self._cache_get(self._persona_dicts, key)
+        if cached and (cached[0] is not None or now - cached[1] < 600):
+            return cached[0]
+        row = conn.execute(
+            "SELECT id FROM content_dicts WHERE user_id=? AND persona_id=? ORDER BY id DESC LIMIT 1",
+            (user_id, persona_id),
+        ).fetchone()
+        dict_id = int(row["id"]) if row else self._train_content_dict(conn, user_id, persona_id)
+        self._cache_put(self._persona_dicts, key, (dict_id, now))
+        return dict_id
+
+    def _compressible(self, content: str, searchable: bool) -> bool:
+        if get_settings().compression != CODEC_ZLIB:
+            return False
+        # Without FTS, memory recall runs LIKE over the content column, so it has to stay plaintext.
+        if searchable and not self._fts_enabled:
+            return False
+        return len(content.encode("utf-8")) >= get_settings().compress_min_bytes
+
+    def _compress_with(self, conn: sqlite3.Connection, content: str, dict_id: int | None) -> tuple[str | bytes, str | None]:
+        zdict = self._load_zdict(conn, dict_id) if dict_id is not None else None
+        packed = compress_text(content, zdict)
+        if len(packed) >= len(content.encode("utf-8")):
+            return content, None
+        return packed, format_codec(dict_id)
+
+    def _encode_content(self, conn: sqlite3.Connection, user_id: str, persona_id: str, content: str, searchable: bool = False) -> tuple[str | bytes, str | None]:
+        if not self._compressible(content, searchable):
+            return content, None
+        return self._compress_with(conn, content, self._persona_dict_id(conn, user_id, persona_id))
+
+    def _decode_content(self, conn: sqlite3.Connection, content: Any, codec: str | None) -> str:
+        if not codec:
+            return content
+        _, dict_id = parse_codec(codec)
+        zdict = self._load_zdict(conn, dict_id) if dict_id is not None else None
+        return decompress_text(bytes(content), zdict)
+
+    def _decode_row(self, conn: sqlite3.Connection, row: sqlite3.Row) -> dict:
+        item = dict(row)
+        codec = item.pop("content_codec", None)
+        if codec:
+            item["content"] = self._decode_content(conn, item["content"], codec)
+        return item
+
     def create_persona(self, user_id: str, persona_id: str, display_name: str | None, description: str | None) -> None:
         now = now_ts()
         with self._connect() as conn:
-            conn.execute(
+            cursor = conn.execute(
                 "INSERT OR IGNORE INTO personas(user_id, persona_id, display_name, description, created_at, updated_at) VALUES(?, ?, ?, ?, ?, ?)",
                 (user_id, persona_id, display_name, description, now, now),
             )
+            if cursor.rowcount:
+                self._bump(conn, user_id, persona_id, ("persona",))
 
     def get_persona(self, user_id: str, persona_id: str) -> dict | None:
         with self._connect() as conn:
@@ -58,9 +218,10 @@ class SQLiteStorage:
 
     def append_message(self, data: dict) -> int:
         with self._connect() as conn:
+            content, codec = self._encode_content(conn, data["user_id"], data["persona_id"], data["content"])
             cursor = conn.execute(
-                "INSERT INTO messages(user_id, persona_id, session_id, source_app, role, content, created_at) VALUES(?, ?, ?, ?, ?, ?, ?)",
-                (data["user_id"], data["persona_id"], data.get("session_id"), data.get("source_app"), data["role"], data["content"], data["created_at"]),
+                "INSERT INTO messages(user_id, persona_id, session_id, source_app, role, content, content_codec, created_at) VALUES(?, ?, ?, ?, ?, ?, ?, ?)",
+                (data["user_id"], data["persona_id"], data.get("session_id"), data.get("source_app"), data["role"], content, codec, data["created_at"]),
             )
             msg_id = int(cursor.lastrowid)
             if self._fts_enabled:
@@ -68,6 +229,25 @@ class SQLiteStorage:
         log_event("messages.append", user_id=data["user_id"], persona_id=data["persona_id"])
         return msg_id
 
+    def append_messages(self, items: Sequence[dict]) -> list[int]:
+        msg_ids: list[int] = []
+        with self._connect() as conn:
+            for data in items:
+                content, codec = self._encode_content(conn, data["user_id"], data["persona_id"], data["content"])
+                cursor = conn.execute(
+                    "INSERT INTO messages(user_id, persona_id, session_id, source_app, role, content, content_codec, created_at) VALUES(?, ?, ?, ?, ?, ?, ?, ?)",
+                    (data["user_id"], data["persona_id"], data.get("session_id"), data.get("source_app"), data["role"], content, codec, data["created_at"]),
+                )
+                msg_ids.append(int(cursor.lastrowid))
+            if self._fts_enabled:
+                conn.executemany(
+                    "INSERT INTO fts_messages(rowid, content, user_id, persona_id) VALUES(?, ?, ?, ?)",
+                    [(msg_id, data["content"], data["user_id"], data["persona_id"]) for msg_id, data in zip(msg_ids, items)],
+                )
+        for (user_id, persona_id), count in Counter((data["user_id"], data["persona_id"]) for data in items).items():
+            log_event("messages.append.batch", user_id=user_id, persona_id=persona_id, messages=count)
+        return msg_ids
+
     def recent_messages(self, user_id: str, persona_id: str, limit: int, days: int | None) -> list[dict]:
         with self._connect() as conn:
             params: list[Any] = [user_id, persona_id]
@@ -79,7 +259,7 @@ class SQLiteStorage:
             sql += " ORDER BY created_at DESC LIMIT ?"
             params.append(limit)
             rows = conn.execute(sql, params).fetchall()
-            return [dict(row) for row in rows]
+            return [self._decode_row(conn, row) for row in rows]
 
     def purge_messages(self, user_id: str, persona_id: str, before_ts: int | None) -> int:
         with self._connect() as conn:
@@ -103,15 +283,17 @@ class SQLiteStorage:
         expires_at = data.get("expires_at")
         supersedes_id = data.get("supersedes_id")
         with self._connect() as conn:
+            content, codec = self._encode_content(conn, data["user_id"], data["persona_id"], data["content"], searchable=True)
             existing = conn.execute(
                 "SELECT id FROM memory_items WHERE user_id=? AND persona_id=? AND type=? AND mkey=?",
                 (data["user_id"], data["persona_id"], data["type"], data["key"]),
             ).fetchone()
             if existing:
                 conn.execute(
-                    "UPDATE memory_items SET content=?, tags_json=?, ttl_seconds=?, status=?, scope=?, source_type=?, source_ref=?, confidence=?, expires_at=?, supersedes_id=?, updated_at=? WHERE id=?",
+                    "UPDATE memory_items SET content=?, content_codec=?, tags_json=?, ttl_seconds=?, status=?, scope=?, source_type=?, source_ref=?, confidence=?, expires_at=?, supersedes_id=?, updated_at=? WHERE id=?",
                     (
-                        data["content"],
+                        content,
+                        codec,
                         dumps_json(data.get("tags") or []),
                         data.get("ttl_seconds"),
                         status,
@@ -129,13 +311,14 @@ class SQLiteStorage:
                 updated = True
             else:
                 cursor = conn.execute(
-                    "INSERT INTO memory_items(user_id, persona_id, type, mkey, content, tags_json, ttl_seconds, status, scope, source_type, source_ref, confidence, expires_at, supersedes_id, created_at, updated_at) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    "INSERT INTO memory_items(user_id, persona_id, type, mkey, content, content_codec, tags_json, ttl_seconds, status, scope, source_type, source_ref, confidence, expires_at, supersedes_id, created_at, updated_at) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                     (
                         data["user_id"],
                         data["persona_id"],
                         data["type"],
                         data["key"],
-                        data["content"],
+                        content,
+                        codec,
                         dumps_json(data.get("tags") or []),
                         data.get("ttl_seconds"),
                         status,
@@ -151,12 +334,106 @@ class SQLiteStorage:
                 )
                 mem_id = int(cursor.lastrowid)
                 updated = False
+            expiry = None
+            if data.get("ttl_seconds") is not None or expires_at is not None:
+                expiry = conn.execute(f"SELECT {EXPIRY_SQL} AS expiry FROM memory_items WHERE id=?", (mem_id,)).fetchone()["expiry"]
+            self._bump(conn, data["user_id"], data["persona_id"], ("memory",), expiry)
             if self._fts_enabled:
                 conn.execute("DELETE FROM fts_memory WHERE rowid=?", (mem_id,))
                 conn.execute("INSERT INTO fts_memory(rowid, content, user_id, persona_id) VALUES(?, ?, ?, ?)", (mem_id, data["content"], data["user_id"], data["persona_id"]))
         log_event("memory.write", user_id=data["user_id"], persona_id=data["persona_id"])
         return updated, mem_id
 
+    def existing_memory_keys(self, user_id: str, persona_id: str, keys: Iterable[tuple[str, str]]) -> set[tuple[str, str]]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return set()
+        values = ", ".join("(?, ?)" for _ in keys)
+        params = [part for key in keys for part in key]
+        now = now_ts()
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT m.type, m.mkey FROM (VALUES {values}) AS k JOIN memory_items AS m "
+                f"ON m.user_id=? AND m.persona_id=? AND m.type=k.column1 AND m.mkey=k.column2 WHERE {self._valid_memory_clause()}",
+                (*params, user_id, persona_id, now, now),
+            ).fetchall()
+        return {(row["type"], row["mkey"]) for row in rows}
+
+    def apply_template_batch(self, user_id: str, persona_ids: Sequence[str], items: Sequence[dict], allow_overwrite: bool) -> dict[str, int]:
+        now = now_ts()
+        persona_ids = list(dict.fromkeys(persona_ids))
+        personas_json = dumps_json(persona_ids)
+        mkeys_json = dumps_json(sorted({item["key"] for item in items}))
+        key_filter = "user_id=? AND persona_id IN (SELECT value FROM json_each(?)) AND mkey IN (SELECT value FROM json_each(?))"
+        written: dict[str, int] = {}
+        rows: list[tuple] = []
+        with self._connect() as conn:
+            known = {
+                row["persona_id"]
+                for row in conn.execute("SELECT persona_id FROM personas WHERE user_id=? AND persona_id IN (SELECT value FROM json_each(?))", (user_id, personas_json))
+            }
+            conn.executemany(
+                "INSERT OR IGNORE INTO personas(user_id, persona_id, display_name, description, created_at, updated_at) VALUES(?, ?, NULL, NULL, ?, ?)",
+                [(user_id, persona_id, now, now) for persona_id in persona_ids if persona_id not in known],
+            )
+            existing: set[tuple[str, str, str]] = set()
+            if not allow_overwrite:
+                existing = {
+                    (row["persona_id"], row["type"], row["mkey"])
+                    for row in conn.execute(
+                        f"SELECT persona_id, type, mkey FROM memory_items WHERE {key_filter} AND {self._valid_memory_clause()}",
+                        (user_id, personas_json, mkeys_json, now, now),
+                    )
+                }
+            compressible = [self._compressible(item["content"], True) for item in items]
+            dict_ids: dict[str, int] = {}
+            if any(compressible):
+                # One dictionary lookup for the whole batch; each item is compressed once per distinct dictionary.
+                dict_ids = {
+                    row["persona_id"]: row["id"]
+                    for row in conn.execute(
+                        "SELECT persona_id, MAX(id) AS id FROM content_dicts WHERE user_id=? AND persona_id IN (SELECT value FROM json_each(?)) GROUP BY persona_id",
+                        (user_id, personas_json),
+                    )
+                }
+            encoded: dict[tuple[int | None, int], tuple[str | bytes, str | None]] = {}
+            for persona_id in persona_ids:
+                count = 0
+                for index, item in enumerate(items):
+                    if (persona_id, item["type"], item["key"]) in existing:
+                        continue
+                    key = (dict_ids.get(persona_id), index)
+                    if key not in encoded:
+                        encoded[key] = self._compress_with(conn, item["content"], key[0]) if compressible[index] else (item["content"], None)
+                    content, codec = encoded[key]
+                    rows.append((user_id, persona_id, item["type"], item["key"], content, codec, item.get("status") or "active", item.get("source_type") or "user_explicit", now, now))
+                    count += 1
+                written[persona_id] = count
+            conn.executemany(
+                "INSERT INTO memory_items(user_id, persona_id, type, mkey, content, content_codec, tags_json, status, scope, source_type, created_at, updated_at) VALUES(?, ?, ?, ?, ?, ?, '[]', ?, 'persona', ?, ?, ?) "
+                "ON CONFLICT(user_id, persona_id, type, mkey) DO UPDATE SET content=excluded.content, content_codec=excluded.content_codec, tags_json='[]', ttl_seconds=NULL, "
+                "status=excluded.status, scope='persona', source_type=excluded.source_type, source_ref=NULL, confidence=NULL, expires_at=NULL, supersedes_id=NULL, updated_at=excluded.updated_at",
+                rows,
+            )
+            for persona_id in persona_ids:
+                scopes = () if persona_id in known else ("persona",)
+                if written[persona_id]:
+                    scopes += ("memory",)
+                if scopes:
+                    self._bump(conn, user_id, persona_id, scopes)
+            if self._fts_enabled and rows:
+                contents = {(item["type"], item["key"]): item["content"] for item in items}
+                targets = {(row[1], row[2], row[3]) for row in rows}
+                fts_rows = [
+                    (row["id"], contents[(row["type"], row["mkey"])], user_id, row["persona_id"])
+                    for row in conn.execute(f"SELECT id, persona_id, type, mkey FROM memory_items WHERE {key_filter}", (user_id, personas_json, mkeys_json))
+                    if (row["persona_id"], row["type"], row["mkey"]) in targets
+                ]
+                conn.executemany("DELETE FROM fts_memory WHERE rowid=?", [(row[0],) for row in fts_rows])
+                conn.executemany("INSERT INTO fts_memory(rowid, content, user_id, persona_id) VALUES(?, ?, ?, ?)", fts_rows)
+        log_event("memory.write.batch", user_id=user_id, personas=len(persona_ids), rows=len(rows))
+        return written
+
     def _valid_memory_clause(self) -> str:
         return (
             "status='active' AND "
@@ -171,7 +448,7 @@ class SQLiteStorage:
                 f"SELECT * FROM memory_items WHERE user_id=? AND persona_id=? AND {self._valid_memory_clause()} ORDER BY updated_at DESC",
                 (user_id, persona_id, now, now),
             ).fetchall()
-            return [dict(row) for row in rows]
+            return [self._decode_row(conn, row) for row in rows]
 
     def recall_memory(self, user_id: str, persona_id: str, query: str, limit: int) -> list[dict]:
         with self._connect() as conn:
@@ -187,7 +464,7 @@ class SQLiteStorage:
                 like = f"%{query}%"
                 sql = "SELECT * FROM memory_items WHERE user_id=? AND persona_id=? AND content LIKE ? AND " + self._valid_memory_clause() + " LIMIT ?"
                 rows = conn.execute(sql, (user_id, persona_id, like, now, now, limit)).fetchall()
-            return [dict(row) for row in rows]
+            return [self._decode_row(conn, row) for row in rows]
 
     def forget_memory(self, user_id: str, persona_id: str, mtype: str, key: str) -> int:
         with self._connect() as conn:
@@ -198,6 +475,8 @@ class SQLiteStorage:
             if row and self._fts_enabled:
                 conn.execute("DELETE FROM fts_memory WHERE rowid=?", (row["id"],))
             cursor = conn.execute("DELETE FROM memory_items WHERE user_id=? AND persona_id=? AND type=? AND mkey=?", (user_id, persona_id, mtype, key))
+            if cursor.rowcount:
+                self._bump(conn, user_id, persona_id, ("memory",))
             return cursor.rowcount
 
     def confirm_memory(self, user_id: str, persona_id: str, memory_id: int, supersedes_id: int | None = None) -> dict | None:
@@ -236,6 +515,7 @@ class SQLiteStorage:
                 "UPDATE memory_items SET status='active', supersedes_id=?, updated_at=? WHERE id=?",
                 (requested_supersedes, now, memory_id),
             )
+            self._bump(conn, user_id, persona_id, ("memory",))
             return {"updated": True, "status": "active", "supersedes_id": requested_supersedes}
 
     def revoke_memory(self, user_id: str, persona_id: str, memory_id: int) -> dict | None:
@@ -254,6 +534,7 @@ class SQLiteStorage:
                 "UPDATE memory_items SET status='revoked', updated_at=? WHERE id=?",
                 (now, memory_id),
             )
+            self._bump(conn, user_id, persona_id, ("memory",))
             return {"updated": True, "status": "revoked"}
 
     def get_memory_by_id(self, user_id: str, persona_id: str, memory_id: int) -> dict | None:
@@ -262,7 +543,7 @@ class SQLiteStorage:
                 "SELECT * FROM memory_items WHERE id=? AND user_id=? AND persona_id=?",
                 (memory_id, user_id, persona_id),
             ).fetchone()
-            return dict(row) if row else None
+            return self._decode_row(conn, row) if row else None
 
     def get_slots(self, user_id: str, persona_id: str) -> list[dict]:
         with self._connect() as conn:
@@ -286,6 +567,7 @@ class SQLiteStorage:
                 """,
                 (user_id, persona_id, slot_name, value_json, provenance_json, now),
             )
+            self._bump(conn, user_id, persona_id, ("slots",))
 
     def create_goal(self, user_id: str, persona_id: str, title: str, details: str | None) -> int:
         now = now_ts()
@@ -294,6 +576,7 @@ class SQLiteStorage:
                 "INSERT INTO goals(user_id, persona_id, title, details, status, created_at, updated_at) VALUES(?, ?, ?, ?, 'active', ?, ?)",
                 (user_id, persona_id, title, details, now, now),
             )
+            self._bump(conn, user_id, persona_id, ("goals",))
             return int(cursor.lastrowid)
 
     def list_goals(self, user_id: str, persona_id: str) -> list[dict]:
@@ -311,6 +594,8 @@ class SQLiteStorage:
                 "UPDATE goals SET status=?, updated_at=? WHERE id=? AND user_id=? AND persona_id=?",
                 (status, now, goal_id, user_id, persona_id),
             )
+            if cursor.rowcount:
+                self._bump(conn, user_id, persona_id, ("goals",))
             return cursor.rowcount
 
     def link_goal(self, user_id: str, persona_id: str, goal_id: int, memory_id: int | None, note: str | None) -> int | None:
@@ -334,12 +619,14 @@ class SQLiteStorage:
         with self._connect() as conn:
             conn.execute("DELETE FROM fts_memory WHERE user_id=? AND persona_id=?", (user_id, persona_id))
             conn.execute("DELETE FROM fts_messages WHERE user_id=? AND persona_id=?", (user_id, persona_id))
-            rows = conn.execute("SELECT id, content FROM memory_items WHERE user_id=? AND persona_id=?", (user_id, persona_id)).fetchall()
+            rows = conn.execute("SELECT id, content, content_codec FROM memory_items WHERE user_id=? AND persona_id=?", (user_id, persona_id)).fetchall()
             for row in rows:
-                conn.execute("INSERT INTO fts_memory(rowid, content, user_id, persona_id) VALUES(?, ?, ?, ?)", (row["id"], row["content"], user_id, persona_id))
-            rows = conn.execute("SELECT id, content FROM messages WHERE user_id=? AND persona_id=?", (user_id, persona_id)).fetchall()
+                content = self._decode_content(conn, row["content"], row["content_codec"])
+                conn.execute("INSERT INTO fts_memory(rowid, content, user_id, persona_id) VALUES(?, ?, ?, ?)", (row["id"], content, user_id, persona_id))
+            rows = conn.execute("SELECT id, content, content_codec FROM messages WHERE user_id=? AND persona_id=?", (user_id, persona_id)).fetchall()
             for row in rows:
-                conn.execute("INSERT INTO fts_messages(rowid, content, user_id, persona_id) VALUES(?, ?, ?, ?)", (row["id"], row["content"], user_id, persona_id))
+                content = self._decode_content(conn, row["content"], row["content_codec"])
+                conn.execute("INSERT INTO fts_messages(rowid, content, user_id, persona_id) VALUES(?, ?, ?, ?)", (row["id"], content, user_id, persona_id))
 
     def metrics(self) -> dict:
         with self._connect() as conn:
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class EventRecord:
+    offset: int
+    ts: float
+    event: str
+    payload: dict
+
+    def to_dict(self, epoch: str) -> dict:
+        return {"event": self.event, "data": self.payload, "offset": self.offset, "epoch": epoch, "ts": int(self.ts)}
+
+
+class EventLog:
+    def __init__(self, retention: int = 10000, retention_s: float = 3600) -> None:
+        # Offsets restart with the process; the epoch tells resuming clients which sequence they hold.
+        self.epoch = secrets.token_hex(4)
+        self.retention = retention
+        self.retention_s = retention_s
+        self._records: deque[EventRecord] = deque()
+        self._next_offset = 1
+        self._lock = threading.Lock()
+
+    def append(self, event: str, payload: dict) -> EventRecord:
+        now = time.time()
+        with self._lock:
+            record = EventRecord(self._next_offset, now, event, payload)
+            self._next_offset += 1
+            records = self._records
+            records.append(record)
+            while records and (len(records) > self.retention or records[0].ts < now - self.retention_s):
+                records.popleft()
+        return record
+
+    @property
+    def last_offset(self) -> int:
+        return self._next_offset - 1
+
+    def read(self, since: int, match: Callable[[EventRecord], bool] | None = None, limit: int | None = None) -> tuple[list[EventRecord], bool, int]:
+        with self._lock:
+            first = self._records[0].offset if self._records else self._next_offset
+            last = self._next_offset - 1
+            pending = list(islice(self._records, max(since + 1 - first, 0), None))
+        complete = since + 1 >= first
+        records: list[EventRecord] = []
+        for record in pending:
+            if match is None or match(record):
+                records.append(record)
+                if limit is not None and len(records) >= limit:
+                    return records, complete, record.offset
+        return records, complete, max(last, since) if complete else last
@@ -1,16 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Iterable
+
 from ..interfaces import EventSink
+from .log import EventLog, EventRecord
+from ...config import get_settings
+from ...metrics import get_metrics_registry
+
+OVERFLOW_POLICIES = ("drop", "drop_oldest")
+
+
+def event_matches(record: EventRecord, user_id: str, persona_id: str | None = None, events: frozenset[str] | None = None) -> bool:
+    if record.payload.get("user_id") != user_id:
+        return False
+    if persona_id is not None and record.payload.get("persona_id") != persona_id:
+        return False
+    return events is None or record.event in events
+
+
+class Subscription:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        user_id: str,
+        persona_id: str | None = None,
+        events: Iterable[str] | None = None,
+        maxsize: int = 1000,
+        overflow: str = "drop_oldest",
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.loop = loop
+        self.user_id = user_id
+        self.persona_id = persona_id
+        self.events = frozenset(events) if events else None
+        self.overflow = overflow
+        self.queue: asyncio.Queue[EventRecord] = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def matches(self, record: EventRecord) -> bool:
+        return event_matches(record, self.user_id, self.persona_id, self.events)
+
+    def _put(self, record: EventRecord) -> None:
+        if self.queue.full():
+            self.dropped += 1
+            if self.overflow == "drop":
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(record)
+
+    async def get(self) -> EventRecord:
+        return await self.queue.get()
 
 
 class WebSocketEventSink:
     def __init__(self) -> None:
-        self._listeners = []
+        # Copy-on-write per-tenant lists: emit() reads them without taking the lock.
+        self._subscriptions: dict[str, tuple[Subscription, ...]] = {}
+        self._lock = threading.Lock()
+        settings = get_settings()
+        self.log = EventLog(settings.events_retention, settings.events_retention_s)
+        self._dropped = get_metrics_registry().counter("plastic_memories_events_dropped_total", "Events dropped by full subscriber queues")
+
+    def subscribe(
+        self,
+        user_id: str,
+        persona_id: str | None = None,
+        events: Iterable[str] | None = None,
+    ) -> Subscription:
+        settings = get_settings()
+        subscription = Subscription(
+            asyncio.get_running_loop(),
+            user_id,
+            persona_id=persona_id,
+            events=events,
+            maxsize=settings.events_queue_size,
+            overflow=settings.events_overflow,
+        )
+        with self._lock:
+            self._subscriptions[user_id] = self._subscriptions.get(user_id, ()) + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            remaining = tuple(item for item in self._subscriptions.get(subscription.user_id, ()) if item is not subscription)
+            if remaining:
+                self._subscriptions[subscription.user_id] = remaining
+            else:
+                self._subscriptions.pop(subscription.user_id, None)
 
     def emit(self, event: str, payload: dict) -> None:
-        for listener in list(self._listeners):
+        record = self.log.append(event, payload)
+        subscriptions = self._subscriptions.get(payload.get("user_id"))
+        if not subscriptions:
+            return
+        loops = {subscription.loop for subscription in subscriptions}
+        for loop in loops:
             try:
-                listener(event, payload)
-            except Exception:
-                continue
+                loop.call_soon_threadsafe(self._deliver, loop, subscriptions, record)
+            except RuntimeError:
+                for subscription in subscriptions:
+                    if subscription.loop is loop:
+                        self.unsubscribe(subscription)
+
+    def _deliver(self, loop: asyncio.AbstractEventLoop, subscriptions: tuple[Subscription, ...], record: EventRecord) -> None:
+        for subscription in subscriptions:
+            if subscription.loop is loop and subscription.matches(record):
+                dropped = subscription.dropped
+                subscription._put(record)
+                if subscription.dropped != dropped:
+                    self._dropped.inc()
+
+    def replay(
+        self,
+        user_id: str,
+        since: int,
+        persona_id: str | None = None,
+        events: Iterable[str] | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[EventRecord], bool, int]:
+        wanted = frozenset(events) if events else None
+        return self.log.read(since, lambda record: event_matches(record, user_id, persona_id, wanted), limit)
 
-    def register(self, fn) -> None:
-        self._listeners.append(fn)
+    def stats(self) -> dict:
+        subscriptions = [item for items in self._subscriptions.values() for item in items]
+        return {
+            "epoch": self.log.epoch,
+            "last_offset": self.log.last_offset,
+            "subscribers": len(subscriptions),
+            "queued": sum(item.queue.qsize() for item in subscriptions),
+            "dropped": sum(item.dropped for item in subscriptions),
+        }
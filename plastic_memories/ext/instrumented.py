@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from ..metrics import get_metrics_registry
+from ..tracing import trace_var
+
+
+class Instrumented:
+    def __init__(self, target: Any, component: str) -> None:
+        registry = get_metrics_registry()
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_component", component)
+        object.__setattr__(self, "_latency", registry.histogram(
+            "plastic_memories_call_seconds",
+            "Latency of storage/recall/judge/event calls",
+            ("component", "method"),
+        ))
+        object.__setattr__(self, "_errors", registry.counter(
+            "plastic_memories_call_errors_total",
+            "Exceptions raised by storage/recall/judge/event calls",
+            ("component", "method"),
+        ))
+
+    def _wrap(self, name: str, fn: Callable) -> Callable:
+        labels = (self._component, name)
+        span_name = f"{self._component}.{name}"
+        latency = self._latency
+        errors = self._errors
+
+        def call(*args, **kwargs):
+            trace = trace_var.get()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                errors.inc(labels)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                latency.observe(labels, elapsed)
+                if trace is not None:
+                    trace.add(span_name, elapsed)
+
+        call.__name__ = name
+        return call
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        wrapped = self._wrap(name, attr)
+        object.__setattr__(self, name, wrapped)
+        return wrapped
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+
+
+def instrument(target: Any, component: str) -> Any:
+    return Instrumented(target, component)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Protocol, Sequence
+from typing import Callable, Iterable, Protocol, Sequence
 
 
 class StorageBackend(Protocol):
@@ -8,9 +8,12 @@ class StorageBackend(Protocol):
     def create_persona(self, user_id: str, persona_id: str, display_name: str | None, description: str | None) -> None: ...
     def get_persona(self, user_id: str, persona_id: str) -> dict | None: ...
     def append_message(self, data: dict) -> int: ...
+    def append_messages(self, items: Sequence[dict]) -> list[int]: ...
     def recent_messages(self, user_id: str, persona_id: str, limit: int, days: int | None) -> list[dict]: ...
     def purge_messages(self, user_id: str, persona_id: str, before_ts: int | None) -> int: ...
     def write_memory(self, data: dict) -> tuple[bool, int]: ...
+    def existing_memory_keys(self, user_id: str, persona_id: str, keys: Iterable[tuple[str, str]]) -> set[tuple[str, str]]: ...
+    def apply_template_batch(self, user_id: str, persona_ids: Sequence[str], items: Sequence[dict], allow_overwrite: bool) -> dict[str, int]: ...
     def list_memory(self, user_id: str, persona_id: str) -> list[dict]: ...
     def recall_memory(self, user_id: str, persona_id: str, query: str, limit: int) -> list[dict]: ...
     def forget_memory(self, user_id: str, persona_id: str, mtype: str, key: str) -> int: ...
@@ -20,6 +23,9 @@ class StorageBackend(Protocol):
     def rebuild_fts(self, user_id: str, persona_id: str) -> None: ...
     def metrics(self) -> dict: ...
     def fts_enabled(self) -> bool: ...
+    def version_epoch(self) -> str: ...
+    def persona_versions(self, user_id: str, persona_id: str) -> dict[str, int]: ...
+    def add_change_listener(self, listener: Callable[[Iterable[tuple[str, str]]], None]) -> None: ...
     def get_slots(self, user_id: str, persona_id: str) -> list[dict]: ...
     def set_slot(self, user_id: str, persona_id: str, slot_name: str, value_json: str, provenance_json: str | None) -> None: ...
     def create_goal(self, user_id: str, persona_id: str, title: str, details: str | None) -> int: ...
@@ -35,12 +41,16 @@ class RecallEngine(Protocol):
 class JudgeEngine(Protocol):
     def judge(self, payload: dict) -> dict: ...
 
+    def judge_many(self, payloads: Sequence[dict]) -> list[dict]: ...
+
 
 class ProfileBuilder(Protocol):
     def build(self, persona: dict | None, memory_items: Sequence[dict]) -> str: ...
 
 
 class SensitivePolicy(Protocol):
+    version: str
+
     def check(self, text: str) -> tuple[bool, str | None]: ...
 
 
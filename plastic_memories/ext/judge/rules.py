@@ -1,20 +1,69 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Sequence
+
 from ..interfaces import SensitivePolicy
+from ...config import get_settings
 from ...logging import log_event
+from ...metrics import get_metrics_registry
 
 
 class RuleBasedJudge:
-    def __init__(self, sensitive: SensitivePolicy) -> None:
+    def __init__(self, sensitive: SensitivePolicy, cache_size: int | None = None) -> None:
         self._sensitive = sensitive
+        self._cache_size = get_settings().judge_cache_size if cache_size is None else cache_size
+        self._cache: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        registry = get_metrics_registry()
+        self._latency = registry.histogram("plastic_memories_judge_decision_seconds", "Judge decision latency by outcome", ("decision",))
+        self._cache_lookups = registry.counter("plastic_memories_judge_cache_total", "Judge decision cache lookups", ("result",))
 
-    def judge(self, payload: dict) -> dict:
+    def _cache_key(self, payload: dict) -> tuple:
         text = payload.get("content") or ""
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return getattr(self._sensitive, "version", ""), digest, payload.get("source_type")
+
+    def _evaluate(self, text: str, source_type: str | None) -> dict:
         if len(text) > 2000:
             return {"decision": "deny", "reason": "content_too_long"}
         hit, reason = self._sensitive.check(text)
         if hit:
-            log_event("sensitive.hit", user_id=payload.get("user_id"), persona_id=payload.get("persona_id"))
             return {"decision": "deny", "reason": reason or "sensitive"}
-        if payload.get("source_type") == "model_inferred":
+        if source_type == "model_inferred":
             return {"decision": "allow_candidate", "reason": None}
-        log_event("judge.run", user_id=payload.get("user_id"), persona_id=payload.get("persona_id"))
         return {"decision": "allow_active", "reason": None}
+
+    def _decide(self, payload: dict) -> dict:
+        start = time.perf_counter()
+        key = self._cache_key(payload) if self._cache_size > 0 else None
+        decision = None
+        if key is not None:
+            with self._lock:
+                decision = self._cache.get(key)
+                if decision is not None:
+                    self._cache.move_to_end(key)
+            self._cache_lookups.inc(("hit" if decision is not None else "miss",))
+        if decision is None:
+            decision = self._evaluate(payload.get("content") or "", payload.get("source_type"))
+            if key is not None:
+                with self._lock:
+                    self._cache[key] = decision
+                    if len(self._cache) > self._cache_size:
+                        self._cache.popitem(last=False)
+        self._latency.observe((decision["decision"],), time.perf_counter() - start)
+        if decision["reason"] not in (None, "content_too_long"):
+            log_event("sensitive.hit", user_id=payload.get("user_id"), persona_id=payload.get("persona_id"))
+        elif decision["decision"] == "allow_active":
+            log_event("judge.run", user_id=payload.get("user_id"), persona_id=payload.get("persona_id"))
+        return dict(decision)
+
+    def judge(self, payload: dict) -> dict:
+        return self._decide(payload)
+
+    def judge_many(self, payloads: Sequence[dict]) -> list[dict]:
+        return [self._decide(payload) for payload in payloads]
+
+    def cache_stats(self) -> dict:
+        return {"size": len(self._cache), "max_size": self._cache_size}
@@ -2,6 +2,7 @@ import json
 
 from ...config import get_settings
 from ...logging import log_event
+from ...tracing import span
 from ..interfaces import StorageBackend, ProfileBuilder
 
 
@@ -16,7 +17,8 @@ class KeywordRecallEngine:
         settings = get_settings()
         snippets = self._storage.recent_messages(user_id, persona_id, settings.max_snippets, settings.message_snippet_days)
         slots = self._storage.get_slots(user_id, persona_id)
-        profile = build_profile_from_slots(persona, slots, settings.profile_max_chars)
+        with span("profile.build"):
+            profile = build_profile_from_slots(persona, slots, settings.profile_max_chars)
         log_event("memory.recall", user_id=user_id, persona_id=persona_id)
         return {
             "PERSONA_PROFILE": profile,
@@ -4,9 +4,13 @@ from .recall.keyword import KeywordRecallEngine
 from .judge.rules import RuleBasedJudge
 from .profile.markdown import MarkdownProfileBuilder
 from .sensitive.strict import StrictDenyPolicy
+from .sensitive.terms import load_terms
 from .events.noop import NoopEventSink
 from .events.ws import WebSocketEventSink
-from ..config import get_settings
+from .instrumented import instrument
+from ..changes import get_change_notifier
+from ..config import Settings, get_settings, on_settings_reload
+from ..metrics import CachedGauges
 
 _storage: StorageBackend | None = None
 _recall: RecallEngine | None = None
@@ -14,6 +18,7 @@ _judge: JudgeEngine | None = None
 _profile: ProfileBuilder | None = None
 _sensitive: SensitivePolicy | None = None
 _events: EventSink | None = None
+_db_gauges: CachedGauges | None = None
 
 
 def get_storage() -> StorageBackend:
@@ -22,10 +27,11 @@ def get_storage() -> StorageBackend:
         return _storage
     settings = get_settings()
     if settings.backend == "sqlite":
-        _storage = SQLiteStorage()
+        _storage = instrument(SQLiteStorage(), "storage")
     else:
         raise ValueError(f"Unknown backend: {settings.backend}")
     _storage.init()
+    _storage.add_change_listener(get_change_notifier().notify)
     return _storage
 
 
@@ -47,7 +53,7 @@ def get_sensitive_policy() -> SensitivePolicy:
         return _sensitive
     settings = get_settings()
     if settings.sensitive == "strict":
-        _sensitive = StrictDenyPolicy()
+        _sensitive = StrictDenyPolicy(load_terms(settings.sensitive_terms_file))
     else:
         raise ValueError(f"Unknown sensitive policy: {settings.sensitive}")
     return _sensitive
@@ -59,7 +65,7 @@ def get_judge() -> JudgeEngine:
         return _judge
     settings = get_settings()
     if settings.judge == "rules":
-        _judge = RuleBasedJudge(get_sensitive_policy())
+        _judge = instrument(RuleBasedJudge(get_sensitive_policy()), "judge")
     else:
         raise ValueError(f"Unknown judge: {settings.judge}")
     return _judge
@@ -71,7 +77,7 @@ def get_recall_engine() -> RecallEngine:
         return _recall
     settings = get_settings()
     if settings.recall == "keyword":
-        _recall = KeywordRecallEngine(get_storage(), get_profile_builder())
+        _recall = instrument(KeywordRecallEngine(get_storage(), get_profile_builder()), "recall")
     else:
         raise ValueError(f"Unknown recall: {settings.recall}")
     return _recall
@@ -83,9 +89,36 @@ def get_event_sink() -> EventSink:
         return _events
     settings = get_settings()
     if settings.events == "none":
-        _events = NoopEventSink()
+        _events = instrument(NoopEventSink(), "events")
     elif settings.events == "ws":
-        _events = WebSocketEventSink()
+        _events = instrument(WebSocketEventSink(), "events")
     else:
         raise ValueError(f"Unknown events: {settings.events}")
     return _events
+
+
+def get_db_gauges() -> CachedGauges:
+    global _db_gauges
+    if _db_gauges:
+        return _db_gauges
+    _db_gauges = CachedGauges(get_storage().metrics, get_settings().metrics_refresh_s)
+    return _db_gauges
+
+
+@on_settings_reload
+def _on_settings_reload(old: Settings, new: Settings) -> None:
+    global _storage, _recall, _judge, _profile, _sensitive, _events, _db_gauges
+    if (old.backend, old.db_path) != (new.backend, new.db_path):
+        _storage = None
+        _recall = None
+        _db_gauges = None
+    if (old.recall, old.profile) != (new.recall, new.profile):
+        _recall = None
+        _profile = None
+    if (old.judge, old.sensitive, old.sensitive_terms_file, old.judge_cache_size) != (new.judge, new.sensitive, new.sensitive_terms_file, new.judge_cache_size):
+        _judge = None
+        _sensitive = None
+    if old.events != new.events:
+        _events = None
+    if _db_gauges is not None:
+        _db_gauges.interval_s = new.metrics_refresh_s
@@ -1,21 +1,44 @@
+import hashlib
 import re
+from typing import Iterable
 
 from ..interfaces import SensitivePolicy
+from .terms import TermMatcher
+
+DEFAULT_RULES = (
+    r"\bpassword\b",
+    r"\bssn\b",
+    r"\bcredit\s*card\b",
+    r"\bsecret\b",
+    r"\bapi[_-]?key\b",
+    r"\btoken\b",
+    r"\b[0-9]{16}\b",
+)
+
+
+def compile_rules(rules: Iterable[str]) -> re.Pattern:
+    rules = list(rules)
+    if rules and all(rule.startswith(r"\b") and rule.endswith(r"\b") for rule in rules):
+        # Hoisting the shared word boundaries lets the engine test them once per position.
+        body = "|".join(f"(?P<r{index}>{rule[2:-2]})" for index, rule in enumerate(rules))
+        return re.compile(rf"\b(?:{body})\b", re.I)
+    return re.compile("|".join(f"(?P<r{index}>{rule})" for index, rule in enumerate(rules)), re.I)
 
 
 class StrictDenyPolicy:
-    _patterns = [
-        re.compile(r"\bpassword\b", re.I),
-        re.compile(r"\bssn\b", re.I),
-        re.compile(r"\bcredit\s*card\b", re.I),
-        re.compile(r"\bsecret\b", re.I),
-        re.compile(r"\bapi[_-]?key\b", re.I),
-        re.compile(r"\btoken\b", re.I),
-        re.compile(r"\b[0-9]{16}\b"),
-    ]
+    def __init__(self, terms: Iterable[str] = (), rules: Iterable[str] = DEFAULT_RULES) -> None:
+        self._rules = tuple(rules)
+        self._regex = compile_rules(self._rules)
+        terms = sorted({term.strip() for term in terms if term.strip()})
+        self._terms = TermMatcher(terms)
+        digest = hashlib.sha256("\n".join(self._rules + ("",) + tuple(terms)).encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
 
     def check(self, text: str) -> tuple[bool, str | None]:
-        for pat in self._patterns:
-            if pat.search(text):
-                return True, f"sensitive:{pat.pattern}"
+        match = self._regex.search(text)
+        if match:
+            return True, f"sensitive:{self._rules[int(match.lastgroup[1:])]}"
+        term = self._terms.search(text)
+        if term:
+            return True, f"sensitive:term:{term}"
         return False, None
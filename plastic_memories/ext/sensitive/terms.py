@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+from typing import Iterable
+
+
+def load_terms(path: str | Path | None) -> list[str]:
+    if not path:
+        return []
+    terms: list[str] = []
+    for line in Path(path).expanduser().read_text(encoding="utf-8").splitlines():
+        term = line.strip()
+        if term and not term.startswith("#"):
+            terms.append(term)
+    return terms
+
+
+class TermMatcher:
+    # Aho-Corasick automaton over case-folded terms: one pass over the text regardless of how many terms.
+    def __init__(self, terms: Iterable[str] = ()) -> None:
+        goto: list[dict[str, int]] = [{}]
+        out: list[str | None] = [None]
+        self.term_count = 0
+        for term in terms:
+            term = term.strip()
+            node = 0
+            for ch in term.casefold():
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(None)
+                node = nxt
+            if node and out[node] is None:
+                out[node] = term
+                self.term_count += 1
+        fail = [0] * len(goto)
+        pending = deque(goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for ch, nxt in goto[node].items():
+                pending.append(nxt)
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[nxt] = goto[state].get(ch, 0)
+                if out[nxt] is None:
+                    out[nxt] = out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def search(self, text: str) -> str | None:
+        if len(self._goto) == 1:
+            return None
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text.casefold():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node] is not None:
+                return out[node]
+        return None
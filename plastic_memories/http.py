@@ -3,12 +3,14 @@ from __future__ import annotations
 from typing import Any
 
 from .context import get_request_id
+from .encoding import EnvelopeResponse
 from .utils import gen_request_id
 
 
-def ok(data: Any) -> dict:
+def ok(data: Any) -> EnvelopeResponse:
     request_id = get_request_id() or gen_request_id()
-    return {"ok": True, "request_id": request_id, "data": data}
+    # Returning a response skips FastAPI's jsonable_encoder pass over large row lists.
+    return EnvelopeResponse({"ok": True, "request_id": request_id, "data": data})
 
 
 def fail(code: str, message: str, detail: Any = None, request_id: str | None = None) -> dict:
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+Default = Callable[[Any], Any] | None
+
+
+class StdlibJson:
+    name = "stdlib"
+
+    def dumps(self, value: Any, default: Default = None) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=default)
+
+    def dumps_bytes(self, value: Any, default: Default = None) -> bytes:
+        return self.dumps(value, default).encode("utf-8")
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonJson:
+    name = "orjson"
+
+    def dumps(self, value: Any, default: Default = None) -> str:
+        return self.dumps_bytes(value, default).decode("utf-8")
+
+    def dumps_bytes(self, value: Any, default: Default = None) -> bytes:
+        try:
+            return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits; the stdlib encodes them exactly.
+            return _stdlib.dumps_bytes(value, default)
+
+    def loads(self, data: str | bytes) -> Any:
+        return orjson.loads(data)
+
+
+_stdlib = StdlibJson()
+
+
+def select_json_backend(name: str | None = None) -> StdlibJson | OrjsonJson:
+    name = (name or os.getenv("PLASTIC_MEMORIES_JSON", "auto")).lower()
+    if name in ("auto", "orjson") and orjson is not None:
+        return OrjsonJson()
+    return _stdlib
+
+
+_backend = select_json_backend()
+
+
+def get_json_backend() -> StdlibJson | OrjsonJson:
+    return _backend
+
+
+def set_json_backend(name: str | None = None) -> StdlibJson | OrjsonJson:
+    global _backend
+    _backend = select_json_backend(name)
+    return _backend
+
+
+def dumps(value: Any, default: Default = None) -> str:
+    return _backend.dumps(value, default)
+
+
+def dumps_bytes(value: Any, default: Default = None) -> bytes:
+    return _backend.dumps_bytes(value, default)
+
+
+def loads(data: str | bytes) -> Any:
+    return _backend.loads(data)
@@ -1,21 +1,79 @@
-import json
+import atexit
 import logging
 import os
+import queue
+import random
 from datetime import datetime, timezone
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
-from .config import get_settings
+from .config import Settings, get_settings, on_settings_reload
+from .jsonlib import select_json_backend
 from .context import get_request_id, get_user_id, get_persona_id
 from .utils import ensure_dir, now_ts
 
 
+def select_json_encoder(name: str | None = None) -> Callable[[dict], str]:
+    backend = select_json_backend(name or os.getenv("PLASTIC_MEMORIES_LOG_ENCODER") or os.getenv("PLASTIC_MEMORIES_JSON", "auto"))
+
+    def dumps(payload: dict) -> str:
+        return backend.dumps(payload, default=str)
+
+    return dumps
+
+
+def parse_event_map(env_str: str | None, cast: Callable[[str], Any]) -> dict[str, Any]:
+    if not env_str:
+        return {}
+    items: dict[str, Any] = {}
+    for part in env_str.split(","):
+        part = part.strip()
+        if ":" not in part:
+            continue
+        event, value = part.rsplit(":", 1)
+        event = event.strip()
+        if not event:
+            continue
+        try:
+            items[event] = cast(value.strip())
+        except ValueError:
+            continue
+    return items
+
+
+def _parse_level(value: str) -> int:
+    level = logging.getLevelName(value.upper())
+    if not isinstance(level, int):
+        raise ValueError(value)
+    return level
+
+
+def static_log_fields(settings: Settings | None = None) -> dict[str, Any]:
+    settings = settings or get_settings()
+    return {
+        "backend": settings.backend,
+        "recall": settings.recall,
+        "judge": settings.judge,
+        "profile": settings.profile,
+        "sensitive": settings.sensitive,
+        "events": settings.events,
+    }
+
+
+_RECORD_ATTRS = set(vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))) | {"message", "asctime", "event"}
+_CORE_FIELDS = ("request_id", "user_id", "persona_id", "duration_ms")
+
+
 class JsonFormatter(logging.Formatter):
+    def __init__(self, static_fields: dict[str, Any] | None = None, dumps: Callable[[dict], str] | None = None) -> None:
+        super().__init__()
+        self._static_fields = static_log_fields() if static_fields is None else dict(static_fields)
+        self._dumps = dumps or select_json_encoder()
+
     def format(self, record: logging.LogRecord) -> str:
-        settings = get_settings()
         payload: dict[str, Any] = {
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname.lower(),
             "event": getattr(record, "event", "log"),
             "logger": record.name,
@@ -24,33 +82,57 @@ class JsonFormatter(logging.Formatter):
             "user_id": getattr(record, "user_id", None) or get_user_id(),
             "persona_id": getattr(record, "persona_id", None) or get_persona_id(),
             "duration_ms": getattr(record, "duration_ms", None),
-            "backend": settings.backend,
-            "recall": settings.recall,
-            "judge": settings.judge,
-            "profile": settings.profile,
-            "sensitive": settings.sensitive,
-            "events": settings.events,
         }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in _CORE_FIELDS:
+                payload[key] = value
+        payload.update(self._static_fields)
         if record.exc_info:
             payload["err"] = self.formatException(record.exc_info)
-        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return self._dumps(payload)
+
+
+class ContextQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", block_timeout_s: float = 1.0) -> None:
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout_s = block_timeout_s
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Request context lives in contextvars, which the listener thread cannot see.
+        if getattr(record, "request_id", None) is None:
+            record.request_id = get_request_id()
+        if getattr(record, "user_id", None) is None:
+            record.user_id = get_user_id()
+        if getattr(record, "persona_id", None) is None:
+            record.persona_id = get_persona_id()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout_s)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 _logger = None
+_formatter: JsonFormatter | None = None
+_listener: QueueListener | None = None
+_queue_handler: ContextQueueHandler | None = None
+_atexit_registered = False
+_event_levels: dict[str, int] = {}
+_sample_rates: dict[str, float] = {}
+_slow_request_ms = 0
 
 
-def configure_logging() -> logging.Logger:
-    global _logger
-    if _logger:
-        return _logger
-    settings = get_settings()
-    logger = logging.getLogger("plastic_memories")
-    log_level = os.getenv("PLASTIC_MEMORIES_LOG_LEVEL", "INFO").upper()
-    logger.setLevel(getattr(logging, log_level, logging.INFO))
-    formatter = JsonFormatter()
+def _build_handlers(formatter: logging.Formatter) -> list[logging.Handler]:
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    handlers: list[logging.Handler] = [stream_handler]
     log_path = os.getenv("LOG_PATH")
     log_dir = os.getenv("PLASTIC_MEMORIES_LOG_DIR")
     if log_path or log_dir:
@@ -61,14 +143,87 @@ def configure_logging() -> logging.Logger:
         ensure_dir(file_path.parent)
         file_handler = RotatingFileHandler(file_path, maxBytes=2_000_000, backupCount=5)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    return handlers
+
+
+def _apply_settings(logger: logging.Logger, settings: Settings) -> None:
+    global _event_levels, _sample_rates, _slow_request_ms
+    _event_levels = parse_event_map(settings.log_event_levels, _parse_level)
+    _sample_rates = parse_event_map(settings.log_sampling, float)
+    _slow_request_ms = settings.slow_request_ms
+    logger.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
+    if _formatter is not None:
+        _formatter._static_fields = static_log_fields(settings)
+
+
+def configure_logging() -> logging.Logger:
+    global _logger, _formatter, _listener, _queue_handler, _atexit_registered
+    if _logger:
+        return _logger
+    logger = logging.getLogger("plastic_memories")
+    _formatter = JsonFormatter()
+    _apply_settings(logger, get_settings())
+    handlers = _build_handlers(_formatter)
+    if os.getenv("PLASTIC_MEMORIES_LOG_ASYNC", "1") != "0":
+        queue_size = int(os.getenv("PLASTIC_MEMORIES_LOG_QUEUE_SIZE", "10000"))
+        policy = os.getenv("PLASTIC_MEMORIES_LOG_QUEUE_POLICY", "drop").lower()
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        _queue_handler = ContextQueueHandler(log_queue, policy=policy)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        logger.addHandler(_queue_handler)
+        if not _atexit_registered:
+            atexit.register(shutdown_logging)
+            _atexit_registered = True
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     logger.propagate = False
     _logger = logger
     return logger
 
 
-def log_event(event: str, **fields) -> None:
-    logger = configure_logging()
+@on_settings_reload
+def _on_settings_reload(old: Settings, new: Settings) -> None:
+    if _logger:
+        _apply_settings(_logger, new)
+
+
+def shutdown_logging() -> None:
+    global _logger, _formatter, _listener, _queue_handler
+    if _listener:
+        _listener.stop()
+        _listener = None
+    _queue_handler = None
+    _formatter = None
+    logger = logging.getLogger("plastic_memories")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    _logger = None
+
+
+def dropped_log_records() -> int:
+    return _queue_handler.dropped if _queue_handler else 0
+
+
+def slow_request_ms() -> int:
+    if not _logger:
+        configure_logging()
+    return _slow_request_ms
+
+
+def log_event(event: str, *, level: int | None = None, **fields) -> None:
+    logger = _logger or configure_logging()
+    if level is None:
+        level = _event_levels.get(event, logging.INFO)
+    if not logger.isEnabledFor(level):
+        return
+    if level < logging.WARNING:
+        rate = _sample_rates.get(event)
+        if rate is not None and rate < 1 and random.random() >= rate:
+            return
     extra = {"event": event}
     extra.update(fields)
-    logger.info(event, extra=extra)
+    logger.log(level, event, extra=extra)
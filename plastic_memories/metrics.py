@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Sequence
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: tuple = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"/".join(labels) or "total": value for labels, value in self._values.items()}
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    def count(self, labels: tuple = ()) -> int:
+        series = self._series.get(labels)
+        return series.count if series else 0
+
+    def quantile(self, labels: tuple, q: float) -> float | None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None or series.count == 0:
+                return None
+            counts = list(series.counts)
+            total = series.count
+        rank = q * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index >= len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * ((rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(s.counts), s.total, s.count) for labels, s in self._series.items())
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            base = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {total:g}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            keys = list(self._series.keys())
+        result = {}
+        for labels in keys:
+            series = self._series[labels]
+            p50 = self.quantile(labels, 0.5)
+            p99 = self.quantile(labels, 0.99)
+            result["/".join(labels) or "total"] = {
+                "count": series.count,
+                "avg_ms": round(series.total / series.count * 1000, 3) if series.count else None,
+                "p50_ms": round(p50 * 1000, 3) if p50 is not None else None,
+                "p99_ms": round(p99 * 1000, 3) if p99 is not None else None,
+            }
+        return result
+
+
+class CachedGauges:
+    def __init__(self, fetch: Callable[[], dict], interval_s: float) -> None:
+        self._fetch = fetch
+        self.interval_s = interval_s
+        self._values: dict | None = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            values = self._fetch()
+            with self._lock:
+                self._values = values
+                self._fetched_at = time.monotonic()
+        finally:
+            self._refreshing = False
+
+    def get(self) -> dict:
+        if self._values is None:
+            self._refreshing = True
+            self._refresh()
+            return dict(self._values or {})
+        if time.monotonic() - self._fetched_at >= self.interval_s and not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, name="plastic-memories-gauges", daemon=True).start()
+        return dict(self._values)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Counter(name, help_text, labelnames)
+            return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help_text, labelnames, buckets)
+            return metric
+
+    def render_prometheus(self, gauges: dict[str, dict] | None = None) -> str:
+        lines: list[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, values in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            for label, value in sorted(values.items()):
+                lines.append(f"{name}{label} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.items())
+        return {name: metric.snapshot() for name, metric in metrics}
+
+
+_registry: MetricsRegistry | None = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import logging
+import time
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+from .context import begin_request_context
+from .encoding import ENCODERS, is_compressible, negotiate_encoding, negotiate_format, response_format_var
+from .logging import log_event, slow_request_ms
+from .metrics import get_metrics_registry
+from .tracing import start_trace
+from .utils import gen_request_id
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers") or ():
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _query_persona(scope: Scope) -> str | None:
+    query_string = scope.get("query_string") or b""
+    if b"persona_id=" not in query_string:
+        return None
+    values = parse_qs(query_string.decode("latin-1")).get("persona_id")
+    return values[0] if values else None
+
+
+def _route_path(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        registry = get_metrics_registry()
+        self._requests = registry.counter("plastic_memories_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+        self._latency = registry.histogram("plastic_memories_http_request_seconds", "HTTP request latency by route", ("method", "route"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = _header(scope, b"x-request-id") or gen_request_id()
+        log_context = begin_request_context(request_id, persona_id=_query_persona(scope))
+        path = scope["path"]
+        status = 500
+        trace = start_trace() if get_settings().tracing else None
+        start = time.perf_counter()
+        response_started = start
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status, response_started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_started = time.perf_counter()
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-Id"] = request_id
+                if trace is not None:
+                    headers.append("Server-Timing", trace.server_timing(response_started - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception:
+            elapsed = time.perf_counter() - start
+            self._observe(scope, 500, elapsed)
+            duration_ms = int(elapsed * 1000)
+            log_event("api.request", level=logging.ERROR, path=path, status=500, duration_ms=duration_ms, request_id=request_id, **log_context)
+            raise
+        end = time.perf_counter()
+        self._observe(scope, status, end - start)
+        duration_ms = int((end - start) * 1000)
+        fields = {"path": path, "status": status, "duration_ms": duration_ms, "request_id": request_id, **log_context}
+        spans = trace.breakdown() if trace is not None else None
+        if spans is not None:
+            log_event("api.trace", path=path, request_id=request_id, spans=spans, **log_context)
+        threshold = slow_request_ms()
+        if threshold and duration_ms >= threshold:
+            fields["slow"] = True
+            fields["timings"] = {
+                "handler_ms": round((response_started - start) * 1000, 3),
+                "send_ms": round((end - response_started) * 1000, 3),
+            }
+            if spans is not None:
+                fields["timings"]["spans"] = spans
+            log_event("api.request", level=logging.WARNING, **fields)
+        elif status >= 500:
+            log_event("api.request", level=logging.ERROR, **fields)
+        elif status >= 400:
+            log_event("api.request", level=logging.WARNING, **fields)
+        else:
+            log_event("api.request", **fields)
+
+    def _observe(self, scope: Scope, status: int, elapsed: float) -> None:
+        route = _route_path(scope)
+        self._requests.inc((scope["method"], route, str(status)))
+        self._latency.observe((scope["method"], route), elapsed)
+
+
+class ResponseEncodingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        response_format_var.set(negotiate_format(_header(scope, b"accept")))
+        settings = get_settings()
+        encoding = negotiate_encoding(_header(scope, b"accept-encoding")) if settings.http_compression else None
+        start_message: Message | None = None
+
+        async def send_encoded(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.add_vary_header("Accept")
+                if settings.http_compression:
+                    headers.add_vary_header("Accept-Encoding")
+                # Only hold the start for bodies that might be compressed; SSE must open immediately.
+                if encoding is None or "content-encoding" in headers or not is_compressible(headers.get("content-type")):
+                    await send(message)
+                    return
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            # Streaming bodies (long downloads) are passed through untouched.
+            if message.get("more_body") or len(body) < settings.http_compress_min_bytes:
+                await send(start)
+                await send(message)
+                return
+            body = ENCODERS[encoding](body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            # Encoded and identity bodies differ byte for byte, so they cannot share a strong validator.
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_encoded)
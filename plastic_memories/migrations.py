@@ -1,4 +1,4 @@
-SCHEMA_VERSION = "2"
+SCHEMA_VERSION = "4"
 
 PERSONAS_SQL = """
 CREATE TABLE IF NOT EXISTS personas (
@@ -22,6 +22,7 @@ CREATE TABLE IF NOT EXISTS messages (
     source_app TEXT,
     role TEXT NOT NULL,
     content TEXT NOT NULL,
+    content_codec TEXT,
     created_at INTEGER NOT NULL
 );
 CREATE INDEX IF NOT EXISTS idx_messages_user_persona ON messages(user_id, persona_id, created_at DESC);
@@ -44,6 +45,7 @@ CREATE TABLE IF NOT EXISTS memory_items (
     confidence REAL,
     expires_at INTEGER,
     supersedes_id INTEGER,
+    content_codec TEXT,
     created_at INTEGER NOT NULL,
     updated_at INTEGER NOT NULL,
     UNIQUE(user_id, persona_id, type, mkey)
@@ -100,6 +102,28 @@ CREATE TABLE IF NOT EXISTS goal_links (
 CREATE INDEX IF NOT EXISTS idx_goal_links_user_persona ON goal_links(user_id, persona_id, created_at DESC);
 """
 
+CONTENT_DICTS_SQL = """
+CREATE TABLE IF NOT EXISTS content_dicts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    persona_id TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_content_dicts_user_persona ON content_dicts(user_id, persona_id, id DESC);
+"""
+
+PERSONA_VERSIONS_SQL = """
+CREATE TABLE IF NOT EXISTS persona_versions (
+    user_id TEXT NOT NULL,
+    persona_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    expires_at INTEGER,
+    PRIMARY KEY(user_id, persona_id, scope)
+);
+"""
+
 
 def _add_column(conn, table: str, column_def: str) -> None:
     try:
@@ -116,6 +140,8 @@ def migrate(conn) -> None:
     conn.executescript(PERSONA_SLOTS_SQL)
     conn.executescript(GOALS_SQL)
     conn.executescript(GOAL_LINKS_SQL)
+    conn.executescript(CONTENT_DICTS_SQL)
+    conn.executescript(PERSONA_VERSIONS_SQL)
     _add_column(conn, "memory_items", "status TEXT NOT NULL DEFAULT 'active'")
     _add_column(conn, "memory_items", "scope TEXT NOT NULL DEFAULT 'persona'")
     _add_column(conn, "memory_items", "source_type TEXT NOT NULL DEFAULT 'user_explicit'")
@@ -123,6 +149,8 @@ def migrate(conn) -> None:
     _add_column(conn, "memory_items", "confidence REAL")
     _add_column(conn, "memory_items", "expires_at INTEGER")
     _add_column(conn, "memory_items", "supersedes_id INTEGER")
+    _add_column(conn, "memory_items", "content_codec TEXT")
+    _add_column(conn, "messages", "content_codec TEXT")
     conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", ("schema_version", SCHEMA_VERSION))
 
 FTS_MESSAGES_SQL = """
@@ -1,6 +1,6 @@
 from typing import Any, List, Optional, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PersonaCreateRequest(BaseModel):
@@ -15,6 +15,12 @@ class PersonaCreateFromTemplateRequest(BaseModel):
     allow_overwrite: bool = False
 
 
+class PersonaCreateFromTemplateBatchRequest(BaseModel):
+    persona_ids: List[str] = Field(min_length=1, max_length=10000)
+    template_path: str
+    allow_overwrite: bool = False
+
+
 class PersonaProfileResponse(BaseModel):
     user_id: str
     persona_id: str
@@ -41,6 +47,10 @@ class MessageAppendRequest(BaseModel):
     ts: Optional[int] = None
 
 
+class MessageAppendBatchRequest(BaseModel):
+    messages: List[MessageAppendRequest] = Field(min_length=1, max_length=1000)
+
+
 class MessageAppendResponse(BaseModel):
     status: str
     message_id: int
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-from .config import get_settings
+from .config import Settings, get_settings, on_settings_reload
+
+_TEMPLATE_FILES = ("persona.md", "rules.md", "preferences.json")
 
 
 @dataclass
@@ -53,3 +58,110 @@ def load_persona_template(path: Path) -> TemplateSeed:
         preferences_json = json.loads(content)
 
     return TemplateSeed(persona_md=persona_md, rules_md=rules_md, preferences_json=preferences_json)
+
+
+def _template_signature(path: Path) -> tuple:
+    signature = []
+    for name in _TEMPLATE_FILES:
+        try:
+            stat = (path / name).stat()
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+@dataclass
+class _CachedTemplate:
+    seed: TemplateSeed
+    signature: tuple
+    checked_at: float
+
+
+class TemplateCache:
+    def __init__(self, check_interval_s: float | None = None) -> None:
+        self.check_interval_s = check_interval_s if check_interval_s is not None else float(os.getenv("PLASTIC_MEMORIES_TEMPLATE_CHECK_S", "5"))
+        self._paths: dict[tuple[str, str], Path] = {}
+        self._entries: dict[Path, _CachedTemplate] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Path) -> TemplateSeed:
+        entry = self._entries.get(path)
+        now = time.monotonic()
+        if entry is not None:
+            if now - entry.checked_at < self.check_interval_s:
+                self.hits += 1
+                return entry.seed
+            signature = _template_signature(path)
+            if signature == entry.signature:
+                entry.checked_at = now
+                self.hits += 1
+                return entry.seed
+        else:
+            signature = _template_signature(path)
+        seed = load_persona_template(path)
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = _CachedTemplate(seed=seed, signature=signature, checked_at=now)
+        return seed
+
+    def get(self, template_path: str) -> tuple[Path, TemplateSeed]:
+        key = (str(get_settings().template_root), template_path)
+        path = self._paths.get(key)
+        if path is not None:
+            return path, self.load(path)
+        path = resolve_template_path(template_path)
+        seed = self.load(path)
+        self._paths[key] = path
+        return path, seed
+
+    def preload(self, root: Path | None = None) -> int:
+        root = root or get_settings().template_root
+        if not root.is_dir():
+            return 0
+        count = 0
+        for persona_file in sorted(root.rglob("persona.md")):
+            path = persona_file.parent.resolve()
+            try:
+                rel = path.relative_to(root.resolve()).as_posix()
+                self.load(path)
+            except (OSError, ValueError):
+                continue
+            self._paths[(str(root), rel)] = path
+            count += 1
+        return count
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._paths = {}
+            self._entries = {}
+
+    def stats(self) -> dict:
+        return {"templates": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_template_cache: TemplateCache | None = None
+
+
+def get_template_cache() -> TemplateCache:
+    global _template_cache
+    if _template_cache is None:
+        _template_cache = TemplateCache()
+    return _template_cache
+
+
+def get_persona_template(template_path: str) -> tuple[Path, TemplateSeed]:
+    return get_template_cache().get(template_path)
+
+
+def invalidate_templates() -> None:
+    if _template_cache is not None:
+        _template_cache.invalidate()
+
+
+@on_settings_reload
+def _on_settings_reload(old: Settings, new: Settings) -> None:
+    invalidate_templates()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+trace_var: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    __slots__ = ("spans",)
+
+    def __init__(self) -> None:
+        self.spans: list[tuple[str, float]] = []
+
+    def add(self, name: str, duration_s: float) -> None:
+        self.spans.append((name, duration_s))
+
+    def breakdown(self) -> dict[str, dict]:
+        result: dict[str, dict] = {}
+        for name, duration_s in list(self.spans):
+            entry = result.setdefault(name, {"count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] += duration_s * 1000
+        for entry in result.values():
+            entry["ms"] = round(entry["ms"], 3)
+        return result
+
+    def server_timing(self, total_s: float | None = None) -> str:
+        parts = []
+        for name, entry in self.breakdown().items():
+            parts.append(f'{name};dur={entry["ms"]:.3f};desc="x{entry["count"]}"')
+        if total_s is not None:
+            parts.append(f"app;dur={total_s * 1000:.3f}")
+        return ", ".join(parts)
+
+
+def start_trace() -> Trace:
+    trace = Trace()
+    trace_var.set(trace)
+    return trace
+
+
+def current_trace() -> Trace | None:
+    return trace_var.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = trace_var.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
@@ -1,8 +1,9 @@
-import json
 import time
 import uuid
 from pathlib import Path
 
+from . import jsonlib
+
 
 def now_ts() -> int:
     return int(time.time())
@@ -17,4 +18,4 @@ def ensure_dir(path: Path) -> None:
 
 
 def dumps_json(value) -> str:
-    return json.dumps(value, ensure_ascii=True, separators=(",", ":"))
+    return jsonlib.dumps(value)
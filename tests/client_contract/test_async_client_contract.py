@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CLIENT_ROOT = ROOT / "clients" / "python"
+if str(CLIENT_ROOT) not in sys.path:
+    sys.path.insert(0, str(CLIENT_ROOT))
+
+import httpx
+import pytest
+from httpx import ASGITransport
+
+from plastic_memories.api import app
+
+from plastic_memories_client import AsyncPlasticMemoriesClient, Message
+from plastic_memories_client.errors import PlasticMemoriesError
+
+
+def make_client(**kwargs) -> AsyncPlasticMemoriesClient:
+    return AsyncPlasticMemoriesClient(
+        base_url="http://test",
+        user_id="u1",
+        persona_id="default",
+        api_key="testkey-a",
+        transport=ASGITransport(app=app),
+        **kwargs,
+    )
+
+
+@pytest.mark.anyio
+async def test_async_flow_with_gather():
+    async with make_client(limits=httpx.Limits(max_connections=4)) as client:
+        assert "status" in await client.health()
+        await client.persona_create(meta={"display_name": "Ava"})
+        await client.write([Message(role="user", content="我喜欢简洁")])
+        result, appended = await asyncio.gather(
+            client.recall("简洁"),
+            client.append_messages([Message(role="user", content="你好")]),
+        )
+        assert "PERSONA_MEMORY" in result.injection_block
+        assert result.request_id is not None
+        assert len(appended["message_ids"]) == 1
+
+        other = client.for_persona("p2")
+        assert other._client is client._client
+        await other.persona_create()
+        assert (await other.list_memory())["items"] == []
+
+        listed = await client.list_memory()
+        for item in listed["items"]:
+            await client.forget_memory(match={"type": item["type"], "key": item["mkey"]})
+        await client.purge_messages(older_than_days=1)
+    assert client._client.is_closed
+
+
+@pytest.mark.anyio
+async def test_async_error_mapping():
+    async with make_client() as client:
+        with pytest.raises(PlasticMemoriesError) as exc:
+            await client.write([Message(role="user", content="my password is 123")])
+        assert exc.value.code == "judge_deny"
+        with pytest.raises(ValueError):
+            await client.forget_memory()
+
+
+@pytest.mark.anyio
+async def test_async_conditional_get():
+    async with make_client() as base:
+        client = base.for_persona("etag-async")
+        await client.persona_create()
+        first = await client.list_goals()
+        assert await client.list_goals() == first
+        assert await client.get_slots() == await client.get_slots()
+        assert client.stats()["not_modified"] == 2
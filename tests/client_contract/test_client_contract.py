@@ -1,4 +1,5 @@
-﻿import sys
+﻿import json
+import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -115,3 +116,53 @@ def test_index_page():
             return res.text
     html = anyio.run(_fetch)
     assert "Plastic Memories API" in html
+
+
+def test_compact_encoding_is_negotiated():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("Accept"))
+        body = {"ok": True, "request_id": "r", "data": {"items": {"$columns": ["type", "mkey"], "$rows": [["persona", "a"], ["rule", "b"]]}}}
+        return httpx.Response(200, content=json.dumps(body), headers={"Content-Type": "application/vnd.plastic-memories.columnar+json"})
+
+    sdk = PlasticMemoriesClient(base_url="http://test", transport=httpx.MockTransport(handler))
+    assert sdk.list_memory()["items"] == [{"type": "persona", "mkey": "a"}, {"type": "rule", "mkey": "b"}]
+    assert "application/vnd.plastic-memories.columnar+json" in seen[0]
+    plain = PlasticMemoriesClient(base_url="http://test", transport=httpx.MockTransport(handler), compact=False)
+    plain.list_memory()
+    assert seen[1] != seen[0]
+
+
+def test_sync_conditional_get_sends_if_none_match():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        body = {"ok": True, "request_id": "r", "data": {"items": [{"goal_id": 1, "title": "ship"}]}}
+        return httpx.Response(200, json=body, headers={"ETag": '"v1"'})
+
+    sdk = PlasticMemoriesClient(base_url="http://test", transport=httpx.MockTransport(handler))
+    first = sdk.list_goals()
+    assert sdk.list_goals() == first == {"items": [{"goal_id": 1, "title": "ship"}]}
+    assert seen == [None, '"v1"']
+    assert sdk.stats()["not_modified"] == 1
+
+
+def test_conditional_get_reuses_cached_payload():
+    sdk = PlasticMemoriesClient(base_url="http://test", persona_id="etag", api_key="testkey-a", transport=ASGITransport(app=app))
+    sdk.persona_create()
+    sdk._request("POST", "/persona/slots/set", json_body={"persona_id": "etag", "slot_name": "tone", "value_json": {"text": "calm"}})
+    sdk._request("POST", "/goals/create", json_body={"persona_id": "etag", "title": "ship"})
+    first = (sdk.persona_profile(), sdk.get_slots(), sdk.list_goals(), sdk.list_memory())
+    assert sdk.stats()["not_modified"] == 0
+    assert (sdk.persona_profile(), sdk.get_slots(), sdk.list_goals(), sdk.list_memory()) == first
+    assert sdk.stats()["not_modified"] == 4
+
+    first[2]["items"].clear()
+    assert sdk.list_goals()["items"][0]["title"] == "ship"
+    sdk._request("POST", "/goals/create", json_body={"persona_id": "etag", "title": "test"})
+    assert len(sdk.list_goals()["items"]) == 2
+    assert sdk.stats()["not_modified"] == 5
@@ -0,0 +1,89 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CLIENT_ROOT = ROOT / "clients" / "python"
+if str(CLIENT_ROOT) not in sys.path:
+    sys.path.insert(0, str(CLIENT_ROOT))
+
+import httpx
+import pytest
+from httpx import ASGITransport
+
+from plastic_memories.api import app
+from plastic_memories.ext.registry import get_storage
+
+from plastic_memories_client import Message, PlasticMemoriesClient
+from plastic_memories_client.buffer import MessageBuffer
+from plastic_memories_client.retry import NO_RETRY
+
+
+def gated_client(status: int = 200):
+    gate = threading.Event()
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        gate.wait(5)
+        messages = json.loads(request.content)["messages"]
+        received.extend(item["content"] for item in messages)
+        body = {"ok": True, "data": {"message_ids": list(range(len(messages)))}, "error": None, "request_id": "r"}
+        if status != 200:
+            body = {"ok": False, "data": None, "error": {"code": "internal_error", "message": "boom"}, "request_id": "r"}
+        return httpx.Response(status, json=body)
+
+    client = PlasticMemoriesClient("http://test", transport=httpx.MockTransport(handler), retry_policy=NO_RETRY)
+    return client, gate, received
+
+
+def wait_inflight(buffer: MessageBuffer) -> None:
+    deadline = time.monotonic() + 5
+    while buffer._inflight == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_buffer_batches_in_order_against_server():
+    client = PlasticMemoriesClient("http://test", user_id="u1", persona_id="default", api_key="testkey-a", transport=ASGITransport(app=app))
+    with MessageBuffer(client, max_batch=3, flush_interval_s=60) as buffer:
+        for i in range(7):
+            buffer.add(Message(role="user", content=f"m{i}"), session_id="s1" if i % 2 else "s2")
+        assert buffer.flush(timeout=5)
+        assert buffer.stats() == {"pending": 0, "enqueued": 7, "flushed": 7, "dropped": 0, "failed": 0, "batches": 3}
+    rows = sorted(get_storage().recent_messages("userA", "default", 20, None), key=lambda row: row["id"])
+    assert [row["content"] for row in rows] == [f"m{i}" for i in range(7)]
+    assert [row["session_id"] for row in rows if row["content"] in ("m1", "m3")] == ["s1", "s1"]
+    with pytest.raises(RuntimeError):
+        buffer.add(Message(role="user", content="late"))
+
+
+@pytest.mark.parametrize("overflow, expected", [("drop_oldest", ["m0", "m2", "m3"]), ("drop", ["m0", "m1", "m2"])])
+def test_buffer_overflow_policies(overflow, expected):
+    client, gate, received = gated_client()
+    buffer = MessageBuffer(client, max_batch=1, flush_interval_s=60, max_pending=2, overflow=overflow)
+    buffer.add(Message(role="user", content="m0"))
+    wait_inflight(buffer)
+    assert buffer.add([Message(role="user", content=f"m{i}") for i in range(1, 4)]) == (3 if overflow == "drop_oldest" else 2)
+    assert buffer.stats()["dropped"] == 1
+    gate.set()
+    assert buffer.close()
+    assert received == expected
+
+
+def test_buffer_block_policy_and_failures():
+    client, gate, received = gated_client(status=500)
+    buffer = MessageBuffer(client, max_batch=1, flush_interval_s=60, max_pending=1, overflow="block")
+    buffer.add(Message(role="user", content="m0"))
+    wait_inflight(buffer)
+    buffer.add(Message(role="user", content="m1"))
+    threading.Timer(0.05, gate.set).start()
+    buffer.add(Message(role="user", content="m2"))
+    assert buffer.flush(timeout=5)
+    assert received == ["m0", "m1", "m2"]
+    stats = buffer.stats()
+    assert stats["failed"] == 3 and stats["flushed"] == 0
+    assert buffer.last_error is not None
+    buffer.close()
+    with pytest.raises(ValueError):
+        MessageBuffer(client, overflow="nope")
@@ -0,0 +1,88 @@
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CLIENT_ROOT = ROOT / "clients" / "python"
+if str(CLIENT_ROOT) not in sys.path:
+    sys.path.insert(0, str(CLIENT_ROOT))
+
+import httpx
+import pytest
+
+from plastic_memories_client import AsyncPlasticMemoriesClient, Message, PlasticMemoriesClient
+from plastic_memories_client.cache import RecallCache
+
+
+def counting_transport():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        data = {"PERSONA_PROFILE": f"v{len(calls)}", "PERSONA_MEMORY": [], "CHAT_SNIPPETS": []}
+        if request.url.path != "/memory/recall":
+            data = {"message_id": "m1"}
+        return httpx.Response(200, json={"ok": True, "data": data, "error": None, "request_id": "r"})
+
+    return calls, httpx.MockTransport(handler)
+
+
+def test_cache_ttl_lru_and_generation():
+    cache = RecallCache(ttl_s=10, max_entries=2, stale_ttl_s=0)
+    generation = cache.generation("p1")
+    cache.put(("p1", "a", None), "A", generation)
+    cache.put(("p1", "b", None), "B", generation)
+    assert cache.lookup(("p1", "a", None)) == ("A", "fresh")
+    cache.put(("p2", "c", None), "C", cache.generation("p2"))
+    assert cache.lookup(("p1", "b", None)) == (None, None)
+
+    cache._entries[("p1", "a", None)] = ("A", 0.0)
+    assert cache.lookup(("p1", "a", None)) == (None, None)
+    assert ("p1", "a", None) not in cache._entries
+
+    cache.invalidate("p1")
+    cache.put(("p1", "a", None), "late", generation)
+    assert cache.lookup(("p1", "a", None)) == (None, None)
+    cache.invalidate()
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["hit_ratio"] == pytest.approx(1 / 4)
+
+
+def test_sync_client_caches_and_invalidates_on_writes():
+    calls, transport = counting_transport()
+    client = PlasticMemoriesClient("http://test", transport=transport, recall_cache=RecallCache())
+    assert client.recall("q").persona_profile == "v1"
+    assert client.recall("q").persona_profile == "v1"
+    assert calls.count("/memory/recall") == 1
+    client.recall("q", top_k=3)
+    client.recall("q", use_cache=False)
+    assert calls.count("/memory/recall") == 3
+
+    client.append_messages([Message(role="user", content="hi")])
+    client.recall("q")
+    assert calls.count("/memory/recall") == 4
+    client.write([Message(role="user", content="hi")])
+    client.forget_memory(match={"type": "preferences", "key": "k"})
+    client.recall("q")
+    assert calls.count("/memory/recall") == 5
+
+    stats = client.stats()["recall_cache"]
+    assert stats["hits"] == 1 and stats["misses"] == 4
+    assert stats["hit_ratio"] == pytest.approx(0.2)
+
+
+@pytest.mark.anyio
+async def test_async_stale_while_revalidate():
+    calls, transport = counting_transport()
+    cache = RecallCache(ttl_s=0, stale_ttl_s=60)
+    async with AsyncPlasticMemoriesClient("http://test", transport=transport, recall_cache=cache) as client:
+        assert (await client.recall("q")).persona_profile == "v1"
+        assert (await client.recall("q")).persona_profile == "v1"
+        assert (await client.recall("q")).persona_profile == "v1"
+        while client._refreshing:
+            await asyncio.sleep(0.01)
+        assert calls.count("/memory/recall") == 2
+        assert (await client.recall("q")).persona_profile == "v2"
+        assert cache.stats()["stale_hits"] == 3
+        await client.purge_messages(older_than_days=1)
+        assert cache.stats()["size"] == 0
@@ -0,0 +1,117 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CLIENT_ROOT = ROOT / "clients" / "python"
+if str(CLIENT_ROOT) not in sys.path:
+    sys.path.insert(0, str(CLIENT_ROOT))
+
+import httpx
+import pytest
+
+from plastic_memories_client import AsyncPlasticMemoriesClient, PlasticMemoriesClient
+from plastic_memories_client.errors import PlasticMemoriesCircuitOpenError, PlasticMemoriesError
+from plastic_memories_client.resilience import CircuitBreaker, HedgePolicy
+from plastic_memories_client.retry import NO_RETRY
+
+RECALL = {"ok": True, "data": {"PERSONA_PROFILE": "p", "PERSONA_MEMORY": [], "CHAT_SNIPPETS": []}, "error": None, "request_id": "r1"}
+FAILED = {"ok": False, "data": None, "error": {"code": "unavailable", "message": "busy"}, "request_id": "r1"}
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    status = {"code": 503}
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(status["code"], json=RECALL if status["code"] == 200 else FAILED)
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=30)
+    client = PlasticMemoriesClient("http://test", transport=httpx.MockTransport(handler), retry_policy=NO_RETRY, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(PlasticMemoriesError):
+            client.recall("q")
+    assert breaker.state == "open"
+
+    result = client.recall("q")
+    assert result.degraded is True
+    assert "[PERSONA_MEMORY]" in result.injection_block
+    with pytest.raises(PlasticMemoriesCircuitOpenError):
+        client.health()
+    assert len(calls) == 2
+
+    status["code"] = 200
+    breaker._opened_at -= 60
+    assert breaker.state == "half_open"
+    assert client.recall("q").degraded is False
+    assert client.stats()["breaker"] == {"state": "closed", "failures": 0, "opened": 1, "rejected": 2}
+
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=30, half_open_max_calls=1)
+    breaker.record(httpx.Response(502))
+    breaker._opened_at -= 60
+    breaker.before_call()
+    with pytest.raises(PlasticMemoriesCircuitOpenError):
+        breaker.before_call()
+    breaker.record(httpx.ConnectError("down"))
+    assert breaker.state == "open"
+    breaker.record(httpx.Response(404))
+    assert breaker.state == "closed"
+
+
+def test_hedge_delay_tracks_p95():
+    hedge = HedgePolicy(initial_delay_s=0.5, min_samples=20)
+    assert hedge.delay() == 0.5
+    for i in range(100):
+        hedge.observe((i + 1) / 1000)
+    assert hedge.delay() == pytest.approx(0.095)
+
+
+def test_sync_hedged_recall_uses_faster_response():
+    slow = threading.Event()
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            slow.wait(2)
+        return httpx.Response(200, json=RECALL)
+
+    client = PlasticMemoriesClient("http://test", transport=httpx.MockTransport(handler), hedge=HedgePolicy(initial_delay_s=0.05))
+    started = time.perf_counter()
+    result = client.recall("q")
+    elapsed = time.perf_counter() - started
+    slow.set()
+    assert result.persona_profile == "p"
+    assert elapsed < 1.5
+    assert len(calls) == 2
+    stats = client.stats()["hedge"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1 and stats["hedge_rate"] == 1.0
+
+    client.recall("q")
+    assert client.stats()["hedge"]["hedged"] == 1
+    client.close()
+
+
+@pytest.mark.anyio
+async def test_async_hedged_recall_and_fallback():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            await asyncio.sleep(2)
+        return httpx.Response(200, json=RECALL)
+
+    breaker = CircuitBreaker(failure_threshold=1)
+    async with AsyncPlasticMemoriesClient("http://test", transport=httpx.MockTransport(handler), hedge=HedgePolicy(initial_delay_s=0.05), breaker=breaker) as client:
+        result = await client.recall("q")
+        assert result.persona_profile == "p"
+        assert client.stats()["hedge"]["hedge_wins"] == 1
+
+        breaker.record(httpx.Response(503))
+        assert (await client.recall("q")).degraded is True
@@ -0,0 +1,134 @@
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+CLIENT_ROOT = ROOT / "clients" / "python"
+if str(CLIENT_ROOT) not in sys.path:
+    sys.path.insert(0, str(CLIENT_ROOT))
+
+import httpx
+import pytest
+
+import plastic_memories_client.retry as retry
+from plastic_memories_client import AsyncPlasticMemoriesClient, PlasticMemoriesClient
+from plastic_memories_client.errors import PlasticMemoriesError, PlasticMemoriesTransportError
+from plastic_memories_client.retry import RetryBudget, RetryPolicy, retry_after_seconds
+
+OK = {"ok": True, "data": {"status": "ok"}, "error": None, "request_id": "r1"}
+UNAVAILABLE = {"ok": False, "data": None, "error": {"code": "unavailable", "message": "busy"}, "request_id": "r1"}
+
+
+def scripted(*steps):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        step = steps[min(len(calls), len(steps) - 1)]
+        calls.append(request.method)
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step
+        return httpx.Response(status, json=OK if status == 200 else UNAVAILABLE, headers=headers)
+
+    return calls, httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(retry.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_backoff_is_full_jitter_and_capped():
+    policy = RetryPolicy(base_delay_s=0.5, max_delay_s=2.0, rng=random.Random(7))
+    for attempt in range(8):
+        assert 0 <= policy.backoff(attempt) <= min(2.0, 0.5 * 2 ** attempt)
+
+
+def test_retry_after_is_honoured(sleeps):
+    calls, transport = scripted((503, {"Retry-After": "3"}), (200, {}))
+    client = PlasticMemoriesClient("http://test", transport=transport, retry_policy=RetryPolicy(base_delay_s=0.01))
+    assert client.health()["status"] == "ok"
+    assert len(calls) == 2
+    assert sleeps == [3.0]
+    assert retry_after_seconds(httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+
+
+def test_only_retryable_statuses_and_idempotent_calls(sleeps):
+    calls, transport = scripted((500, {}), (200, {}))
+    client = PlasticMemoriesClient("http://test", transport=transport)
+    with pytest.raises(PlasticMemoriesError):
+        client.health()
+    assert len(calls) == 1
+
+    calls, transport = scripted(httpx.ReadTimeout("slow"), (200, {}))
+    client = PlasticMemoriesClient("http://test", transport=transport)
+    with pytest.raises(PlasticMemoriesTransportError):
+        client.persona_create()
+    assert len(calls) == 1
+
+    calls, transport = scripted(httpx.ConnectError("refused"), (200, {}))
+    client = PlasticMemoriesClient("http://test", transport=transport)
+    client.persona_create()
+    assert len(calls) == 2
+
+
+def test_max_elapsed_and_budget_cap_retries(sleeps):
+    calls, transport = scripted((503, {"Retry-After": "60"}))
+    client = PlasticMemoriesClient("http://test", transport=transport, retry_policy=RetryPolicy(max_elapsed_s=5))
+    with pytest.raises(PlasticMemoriesError) as exc:
+        client.health()
+    assert exc.value.status_code == 503
+    assert len(calls) == 1
+
+    budget = RetryBudget(capacity=2, deposit=0.5)
+    calls, transport = scripted((503, {}))
+    client = PlasticMemoriesClient("http://test", transport=transport, retry_policy=RetryPolicy(max_attempts=5), retry_budget=budget)
+    for _ in range(3):
+        with pytest.raises(PlasticMemoriesError):
+            client.health()
+    assert len(calls) == 3 + 1 + 1
+    assert budget.tokens < 1
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+
+
+@pytest.mark.anyio
+async def test_async_client_retries(monkeypatch):
+    async def no_sleep(delay):
+        return None
+
+    monkeypatch.setattr(retry.asyncio, "sleep", no_sleep)
+    calls, transport = scripted((502, {}), (429, {"Retry-After": "1"}), (200, {}))
+    async with AsyncPlasticMemoriesClient("http://test", transport=transport) as client:
+        assert (await client.health())["status"] == "ok"
+        assert len(calls) == 3
+
+    calls, transport = scripted((502, {}), (200, {}))
+    async with AsyncPlasticMemoriesClient("http://test", transport=transport) as client:
+        with pytest.raises(PlasticMemoriesError):
+            await client.persona_create()
+        assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_legacy_retry_helpers_still_work():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise RuntimeError("boom")
+        return "ok"
+
+    async def aflaky():
+        return flaky()
+
+    assert retry.retry_call(flaky, delays=(0, 0)) == "ok"
+    attempts.clear()
+    assert await retry.aretry_call(aflaky, delays=(0, 0)) == "ok"
+    attempts.clear()
+    with pytest.raises(RuntimeError):
+        await retry.aretry_call(aflaky, retries=0)
@@ -20,6 +20,10 @@ def temp_db(monkeypatch, tmp_path):
     monkeypatch.setenv("PLASTIC_MEMORIES_API_KEYS", "testkey-a:userA,testkey-b:userB")
     import plastic_memories.config as config
     config._settings = None
+    import plastic_memories.auth as auth
+    auth._key_store = None
+    import plastic_memories.templates as templates
+    templates._template_cache = None
     import plastic_memories.ext.registry as registry
     registry._storage = None
     registry._recall = None
@@ -27,6 +31,7 @@ def temp_db(monkeypatch, tmp_path):
     registry._profile = None
     registry._sensitive = None
     registry._events = None
+    registry._db_gauges = None
     yield
 
 
@@ -134,3 +134,21 @@ async def test_request_id_header_and_error_envelope():
         body = res.json()
         assert body["ok"] is False
         assert body["request_id"] == "rid-456"
+
+
+@pytest.mark.anyio
+async def test_messages_append_batch():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/messages/append_batch", json={"messages": []}, headers=AUTH_HEADERS)
+        assert res.status_code == 422
+        res = await client.post("/messages/append_batch", json={"messages": [
+            {"persona_id": "p", "session_id": "s", "role": "user", "content": "第一条", "ts": 100},
+            {"persona_id": "p", "session_id": "s", "role": "assistant", "content": "second reply"},
+        ]}, headers=AUTH_HEADERS)
+        ids = res.json()["data"]["message_ids"]
+        assert len(ids) == 2 and ids[0] < ids[1]
+        res = await client.post("/memory/recall", json={"persona_id": "p", "query": "second", "limit": 5}, headers=AUTH_HEADERS)
+        assert [item["content"] for item in res.json()["data"]["CHAT_SNIPPETS"]] == ["second reply"]
+        res = await client.get("/messages/recent", params={"persona_id": "p"}, headers=AUTH_HEADERS)
+        assert {item["created_at"] for item in res.json()["data"]["messages"]} >= {100}
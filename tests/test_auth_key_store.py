@@ -0,0 +1,58 @@
+import hashlib
+import os
+
+from plastic_memories.auth import ApiKeyStore, get_key_store
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def test_env_keys_loaded_once(monkeypatch):
+    store = ApiKeyStore()
+    assert store.lookup("testkey-a") == "userA"
+    monkeypatch.setenv("PLASTIC_MEMORIES_API_KEYS", "other:userC")
+    assert store.lookup("testkey-a") == "userA"
+    assert store.reload_count == 1
+    store.request_reload()
+    assert store.lookup("testkey-a") is None
+    assert store.lookup("other") == "userC"
+    assert store.stats()["reload_count"] == 2
+    assert store.stats()["reloaded_at"] is not None
+
+
+def test_key_file_reloaded_on_mtime_change(monkeypatch, tmp_path):
+    key_file = tmp_path / "keys.txt"
+    digest = hashlib.sha256(b"hashed-key").hexdigest()
+    key_file.write_text(f"# tenants\nfilekey:userF\nsha256:{digest}:userH, bad\nsha256:zz:userX\n", encoding="utf-8")
+    monkeypatch.setenv("PLASTIC_MEMORIES_API_KEYS_FILE", str(key_file))
+    store = ApiKeyStore(check_interval_s=0)
+    assert store.lookup("filekey") == "userF"
+    assert store.lookup("hashed-key") == "userH"
+    assert store.lookup("testkey-a") == "userA"
+    assert store.stats()["keys"] == 4
+
+    key_file.write_text("filekey:userG\n", encoding="utf-8")
+    stat = key_file.stat()
+    os.utime(key_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.lookup("filekey") == "userG"
+    assert store.reload_count == 2
+    assert store.lookup("filekey") == "userG"
+    assert store.reload_count == 2
+
+
+def test_large_key_table(monkeypatch, tmp_path):
+    key_file = tmp_path / "keys.txt"
+    key_file.write_text("\n".join(f"key-{i}:user-{i}" for i in range(20000)), encoding="utf-8")
+    monkeypatch.setenv("PLASTIC_MEMORIES_API_KEYS_FILE", str(key_file))
+    store = ApiKeyStore()
+    assert store.lookup("key-19999") == "user-19999"
+    assert store.lookup("key-20000") is None
+
+
+def test_metrics_expose_auth_reloads(client):
+    assert client.get("/memory/list", params={"persona_id": "p"}, headers=auth_headers("testkey-b")).status_code == 200
+    assert client.get("/memory/list", params={"persona_id": "p"}, headers=auth_headers("nope")).status_code == 401
+    auth = client.get("/metrics").json()["data"]["auth"]
+    assert auth["keys"] == 2
+    assert auth["reload_count"] == get_key_store().reload_count >= 1
@@ -0,0 +1,31 @@
+from benchmarks.common import percentile, summarize
+from benchmarks.compare import compare
+from benchmarks.datagen import DataGen, Scale, seed_storage
+from plastic_memories.ext.registry import get_storage
+
+
+def test_datagen_is_deterministic_and_respects_language_mix():
+    scale = Scale(personas=2, messages=5, memories=4, zh_ratio=1.0, seed=3)
+    assert DataGen(scale).memories("p") == DataGen(scale).memories("p")
+    assert all(not text.isascii() for text in (item["content"] for item in DataGen(scale).memories("p")))
+    english = DataGen(Scale(zh_ratio=0.0)).messages("p", 5)
+    assert all(item["content"].isascii() for item in english)
+
+
+def test_seed_storage_and_summaries():
+    storage = get_storage()
+    gen = DataGen(Scale(personas=2, messages=5, memories=4, seed=3))
+    seeded = seed_storage(storage, gen, "bench")
+    assert (seeded["personas"], seeded["messages"], seeded["memories"]) == (2, 10, 8)
+    assert len(storage.list_memory("bench", "bench_1")) == 4
+
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([], 99) == 0.0
+    summary = summarize("case", [0.001, 0.002, 0.003, 0.004], 0.01)
+    assert summary["ops_per_s"] == 400.0 and summary["p99_ms"] == 4.0
+
+    baseline = {"results": [summary, {**summary, "name": "other"}]}
+    current = {"results": [{**summary, "p95_ms": summary["p95_ms"] * 2}, {**summary, "name": "new"}]}
+    rows, regressions = compare(baseline, current, "p95_ms", 10)
+    assert regressions == ["case"] and len(rows) == 1
+    assert compare(baseline, current, "ops_per_s", 10)[1] == []
@@ -0,0 +1,119 @@
+import sqlite3
+
+from plastic_memories.compression import compress_text, decompress_text, train_dictionary
+from plastic_memories.config import get_settings
+from plastic_memories.ext.backends.sqlite import SQLiteStorage
+from plastic_memories.utils import now_ts
+
+
+def _enable_compression(monkeypatch, min_bytes: int = 64):
+    monkeypatch.setenv("PLASTIC_MEMORIES_COMPRESSION", "zlib")
+    monkeypatch.setenv("PLASTIC_MEMORIES_COMPRESS_MIN_BYTES", str(min_bytes))
+    import plastic_memories.config as config
+    config._settings = None
+
+
+def _raw_rows(table: str):
+    with sqlite3.connect(get_settings().db_path) as conn:
+        return conn.execute(f"SELECT content, content_codec FROM {table} ORDER BY id").fetchall()
+
+
+def test_dictionary_roundtrip():
+    samples = ["用户喜欢简洁的工程化回答，并且默认使用中文。" * 4, "prefers concise engineering answers in Chinese"] * 20
+    zdict = train_dictionary(samples)
+    assert zdict
+    text = "用户喜欢简洁的工程化回答 prefers concise engineering answers"
+    assert decompress_text(compress_text(text, zdict), zdict) == text
+    assert train_dictionary(["tiny"]) is None
+
+
+def test_large_memory_is_compressed_and_read_back(monkeypatch):
+    _enable_compression(monkeypatch)
+    storage = SQLiteStorage()
+    storage.init()
+    content = "glossary entry: plastic memories keeps long term persona memory. " * 20
+    storage.write_memory({"user_id": "u", "persona_id": "p", "type": "glossary", "key": "g", "content": content, "tags": [], "ttl_seconds": None})
+    storage.write_memory({"user_id": "u", "persona_id": "p", "type": "glossary", "key": "short", "content": "short", "tags": [], "ttl_seconds": None})
+
+    raw = _raw_rows("memory_items")
+    assert isinstance(raw[0][0], bytes)
+    assert raw[0][1].startswith("zlib")
+    assert raw[1] == ("short", None)
+
+    items = {item["mkey"]: item for item in storage.list_memory("u", "p")}
+    assert items["g"]["content"] == content
+    assert "content_codec" not in items["g"]
+    recalled = storage.recall_memory("u", "p", "persona", 5)
+    assert recalled[0]["content"] == content
+
+
+def test_memory_stays_searchable_without_fts(monkeypatch):
+    _enable_compression(monkeypatch)
+    storage = SQLiteStorage()
+    storage.init()
+    storage._fts_enabled = False
+    content = "glossary entry: plastic memories keeps long term persona memory. " * 20
+    storage.write_memory({"user_id": "u", "persona_id": "p", "type": "glossary", "key": "g", "content": content, "tags": [], "ttl_seconds": None})
+    storage.append_message({"user_id": "u", "persona_id": "p", "session_id": "s", "source_app": "cli", "role": "user", "content": content, "created_at": now_ts()})
+
+    assert _raw_rows("memory_items")[0] == (content, None)
+    assert _raw_rows("messages")[0][1].startswith("zlib")
+    assert [item["mkey"] for item in storage.recall_memory("u", "p", "persona", 5)] == ["g"]
+
+
+def test_dictionary_caches_are_bounded(monkeypatch):
+    _enable_compression(monkeypatch, min_bytes=200)
+    monkeypatch.setenv("PLASTIC_MEMORIES_COMPRESS_DICT_CACHE_SIZE", "1")
+    storage = SQLiteStorage()
+    storage.init()
+    long_text = "今天继续讨论记忆系统的召回策略，以及人格画像如何注入系统提示。" * 10
+    for persona_id in ("p1", "p2", "p3"):
+        for idx in range(40):
+            storage.append_message({"user_id": "u", "persona_id": persona_id, "session_id": "s", "source_app": "cli", "role": "user", "content": f"今天继续讨论记忆系统的召回策略 {idx}", "created_at": now_ts()})
+        storage.append_message({"user_id": "u", "persona_id": persona_id, "session_id": "s", "source_app": "cli", "role": "user", "content": long_text, "created_at": now_ts() + 1})
+
+    assert len(storage._zdicts) == 1 and len(storage._persona_dicts) == 1
+    for persona_id in ("p1", "p2", "p3"):
+        assert storage.recent_messages("u", persona_id, 1, None)[0]["content"] == long_text
+
+
+def test_messages_use_trained_persona_dictionary(monkeypatch):
+    _enable_compression(monkeypatch, min_bytes=200)
+    storage = SQLiteStorage()
+    storage.init()
+    for idx in range(40):
+        storage.append_message({"user_id": "u", "persona_id": "p", "session_id": "s", "source_app": "cli", "role": "user", "content": f"今天继续讨论记忆系统的召回策略 {idx}", "created_at": now_ts()})
+    long_text = "今天继续讨论记忆系统的召回策略，以及人格画像如何注入系统提示。" * 10
+    storage.append_message({"user_id": "u", "persona_id": "p", "session_id": "s", "source_app": "cli", "role": "user", "content": long_text, "created_at": now_ts() + 1})
+
+    codec = _raw_rows("messages")[-1][1]
+    assert codec and codec.startswith("zlib:")
+    recent = storage.recent_messages("u", "p", 1, None)
+    assert recent[0]["content"] == long_text
+
+    storage.rebuild_fts("u", "p")
+    assert storage.recall_memory("u", "p", "anything", 5) == []
+
+
+def test_template_batch_resolves_dictionaries_once(monkeypatch):
+    _enable_compression(monkeypatch)
+    storage = SQLiteStorage()
+    storage.init()
+    statements = []
+    connect = storage._connect
+
+    def traced():
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(storage, "_connect", traced)
+    content = "persona template: keeps answers concise and engineering focused. " * 10
+    items = [{"type": "persona", "key": "persona_md", "content": content}, {"type": "rule", "key": "rules_md", "content": "short"}]
+    persona_ids = [f"p{i}" for i in range(50)]
+    assert set(storage.apply_template_batch("u", persona_ids, items, False).values()) == {2}
+
+    assert sum("content_dicts" in sql for sql in statements) == 1
+    raw = {row[1] for row in _raw_rows("memory_items")}
+    assert raw == {None, "zlib"}
+    assert {item["content"] for item in storage.list_memory("u", "p42")} == {content, "short"}
@@ -0,0 +1,85 @@
+import sqlite3
+
+from plastic_memories.config import get_settings
+from plastic_memories.conditional import etag_matches
+from plastic_memories.ext.registry import get_storage
+from plastic_memories.utils import now_ts
+
+
+def auth_headers(key: str, etag: str | None = None) -> dict:
+    headers = {"X-API-Key": key}
+    if etag:
+        headers["If-None-Match"] = etag
+    return headers
+
+
+def _get(client, path: str, etag: str | None = None, key: str = "testkey-a"):
+    return client.get(path, params={"persona_id": "p1"}, headers=auth_headers(key, etag))
+
+
+def test_etag_matching_rules():
+    assert etag_matches('"a-1"', '"a-1"')
+    assert etag_matches('W/"a-1", "b-2"', '"a-1"')
+    assert etag_matches("*", '"a-1"')
+    assert not etag_matches(None, '"a-1"')
+    assert not etag_matches('"a-2"', '"a-1"')
+
+
+def test_conditional_get_returns_304_until_a_write(client):
+    client.post("/persona/create", json={"persona_id": "p1"}, headers=auth_headers("testkey-a"))
+    writes = {
+        "/memory/list": lambda: client.post("/memory/write", json={"persona_id": "p1", "type": "persona", "key": "k", "content": "hi"}, headers=auth_headers("testkey-a")),
+        "/goals/list": lambda: client.post("/goals/create", json={"persona_id": "p1", "title": "t"}, headers=auth_headers("testkey-a")),
+        "/persona/slots/get": lambda: client.post("/persona/slots/set", json={"persona_id": "p1", "slot_name": "tone", "value_json": {"text": "calm"}}, headers=auth_headers("testkey-a")),
+        "/persona/profile": lambda: client.post("/persona/slots/set", json={"persona_id": "p1", "slot_name": "tone", "value_json": {"text": "warm"}}, headers=auth_headers("testkey-a")),
+    }
+    for path, write in writes.items():
+        first = _get(client, path)
+        etag = first.headers["ETag"]
+        assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+
+        cached = _get(client, path, etag)
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+
+        assert write().status_code == 200
+        changed = _get(client, path, etag)
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+
+def test_etags_are_per_user_and_per_representation(client):
+    client.post("/goals/create", json={"persona_id": "p1", "title": "t"}, headers=auth_headers("testkey-a"))
+    etag = _get(client, "/goals/list").headers["ETag"]
+    assert _get(client, "/goals/list", etag, key="testkey-b").status_code == 200
+
+    columnar = client.get("/goals/list", params={"persona_id": "p1"}, headers={**auth_headers("testkey-a"), "Accept": "application/vnd.plastic-memories.columnar+json"})
+    assert columnar.headers["ETag"] != etag
+
+
+def test_post_slots_get_still_works(client):
+    resp = client.post("/persona/slots/get", json={"persona_id": "p1"}, headers=auth_headers("testkey-a", "*"))
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == _get(client, "/persona/slots/get").headers["ETag"]
+
+
+def test_memory_version_bumps_when_items_expire(client):
+    storage = get_storage()
+    client.post("/memory/write", json={"persona_id": "p1", "type": "persona", "key": "k", "content": "hi", "ttl_seconds": 60}, headers=auth_headers("testkey-a"))
+    resp = _get(client, "/memory/list")
+    assert len(resp.json()["data"]["items"]) == 1
+    etag = resp.headers["ETag"]
+    assert _get(client, "/memory/list", etag).status_code == 304
+
+    with sqlite3.connect(get_settings().db_path) as conn:
+        conn.execute("UPDATE memory_items SET created_at=? WHERE mkey='k'", (now_ts() - 120,))
+        conn.execute("UPDATE persona_versions SET expires_at=? WHERE scope='memory'", (now_ts() - 60,))
+    resp = _get(client, "/memory/list", etag)
+    assert resp.status_code == 200
+    assert resp.json()["data"]["items"] == []
+    versions = storage.persona_versions("userA", "p1")
+    with sqlite3.connect(get_settings().db_path) as conn:
+        assert conn.execute("SELECT expires_at FROM persona_versions WHERE scope='memory'").fetchone()[0] is None
+    assert _get(client, "/memory/list", resp.headers["ETag"]).status_code == 304
+    assert storage.persona_versions("userA", "p1") == versions
@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from plastic_memories.ext.events.log import EventLog, EventRecord
+from plastic_memories.ext.events.ws import Subscription, WebSocketEventSink
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def _write(client, key: str, persona_id: str, content: str) -> None:
+    res = client.post("/memory/write", json={
+        "persona_id": persona_id, "type": "preferences", "key": content, "content": content,
+    }, headers=auth_headers(key))
+    assert res.status_code == 200
+
+
+def test_subscription_overflow_policies():
+    async def run() -> tuple[list, list, int]:
+        loop = asyncio.get_running_loop()
+        newest = Subscription(loop, "u", maxsize=2, overflow="drop")
+        oldest = Subscription(loop, "u", maxsize=2, overflow="drop_oldest")
+        for index in range(4):
+            record = EventRecord(index + 1, 0.0, "e", {"i": index})
+            newest._put(record)
+            oldest._put(record)
+        kept_newest = [(await newest.get()).payload["i"] for _ in range(2)]
+        kept_oldest = [(await oldest.get()).payload["i"] for _ in range(2)]
+        return kept_newest, kept_oldest, newest.dropped
+
+    assert asyncio.run(run()) == ([0, 1], [2, 3], 2)
+    with pytest.raises(ValueError):
+        Subscription(None, "u", overflow="block")
+
+
+def test_emit_is_tenant_scoped_and_filtered():
+    async def run() -> list:
+        sink = WebSocketEventSink()
+        sub = sink.subscribe("userA", persona_id="p", events=["memory.write"])
+        sink.emit("memory.write", {"user_id": "userB", "persona_id": "p"})
+        sink.emit("memory.write", {"user_id": "userA", "persona_id": "q"})
+        sink.emit("memory.forget", {"user_id": "userA", "persona_id": "p"})
+        sink.emit("memory.write", {"user_id": "userA", "persona_id": "p", "n": 1})
+        await asyncio.sleep(0)
+        stats = sink.stats()
+        sink.unsubscribe(sub)
+        sink.emit("memory.write", {"user_id": "userA", "persona_id": "p", "n": 2})
+        await asyncio.sleep(0)
+        return [sub.queue.qsize(), await sub.get(), stats, sink.stats()["subscribers"]]
+
+    size, item, stats, remaining = asyncio.run(run())
+    assert size == 1
+    assert (item.offset, item.event, item.payload["n"]) == (4, "memory.write", 1)
+    assert stats["last_offset"] == 4
+    assert (stats["subscribers"], stats["queued"], stats["dropped"]) == (1, 1, 0)
+    assert remaining == 0
+
+
+def test_ws_events_endpoint(client, monkeypatch):
+    monkeypatch.setenv("PLASTIC_MEMORIES_EVENTS", "ws")
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/ws/events") as ws:
+            ws.receive_json()
+
+    with client.websocket_connect("/ws/events?persona_id=p&events=memory.write", headers=auth_headers("testkey-a")) as ws:
+        _write(client, "testkey-b", "p", "other-tenant")
+        _write(client, "testkey-a", "q", "other-persona")
+        _write(client, "testkey-a", "p", "wanted")
+        message = ws.receive_json()
+        assert message["event"] == "memory.write"
+        assert message["data"]["content"] == "wanted"
+        assert message["data"]["user_id"] == "userA"
+        assert client.get("/metrics").json()["data"]["events"]["subscribers"] == 1
+
+
+def test_ws_events_disabled(client):
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/ws/events?api_key=testkey-a") as ws:
+            ws.receive_json()
+
+
+def test_event_log_retention_and_resume():
+    log = EventLog(retention=3, retention_s=3600)
+    for index in range(5):
+        log.append("e", {"user_id": "u", "i": index})
+    assert log.last_offset == 5
+    records, complete, upto = log.read(2)
+    assert [record.offset for record in records] == [3, 4, 5] and complete and upto == 5
+    records, complete, upto = log.read(3, limit=1)
+    assert [record.offset for record in records] == [4] and upto == 4
+    records, complete, _ = log.read(4, match=lambda record: record.payload["i"] == 0)
+    assert records == [] and complete
+    assert log.read(1)[1] is False
+
+    aged = EventLog(retention=10, retention_s=-1)
+    aged.append("e", {})
+    assert aged.read(0) == ([], False, 1)
+    assert aged.read(1) == ([], True, 1)
+
+
+def test_events_pull_and_ws_resume(client, monkeypatch):
+    monkeypatch.setenv("PLASTIC_MEMORIES_EVENTS", "ws")
+    headers = auth_headers("testkey-a")
+    res = client.post("/messages/append", json={"persona_id": "p", "role": "user", "content": "你好"}, headers=headers)
+    assert res.status_code == 200
+    _write(client, "testkey-a", "p", "likes-tea")
+    _write(client, "testkey-b", "p", "hidden")
+    client.post("/persona/slots/set", json={"persona_id": "p", "slot_name": "preferences", "value_json": {"text": "tea"}}, headers=headers)
+    client.post("/memory/forget", json={"persona_id": "p", "type": "preferences", "key": "likes-tea"}, headers=headers)
+
+    data = client.get("/events", params={"since": "0", "persona_id": "p"}, headers=headers).json()["data"]
+    assert [item["event"] for item in data["items"]] == ["messages.append", "memory.write", "slots.set", "memory.forget"]
+    assert data["resync"] is False
+    epoch = data["epoch"]
+    checkpoint = f"{epoch}:{data['items'][1]['offset']}"
+
+    data = client.get("/events", params={"since": checkpoint, "events": "memory.forget"}, headers=headers).json()["data"]
+    assert [item["data"]["key"] for item in data["items"]] == ["likes-tea"]
+    assert client.get("/events", params={"since": "other:3"}, headers=headers).json()["data"]["resync"] is True
+    assert client.get("/events", params={"since": "x:y"}, headers=headers).status_code == 422
+
+    with client.websocket_connect(f"/ws/events?since={checkpoint}", headers=headers) as ws:
+        assert ws.receive_json()["event"] == "slots.set"
+        assert ws.receive_json()["event"] == "memory.forget"
+        _write(client, "testkey-a", "p", "live")
+        live = ws.receive_json()
+        assert live["event"] == "memory.write" and live["epoch"] == epoch
+
+    with client.websocket_connect("/ws/events?since=stale:1", headers=headers) as ws:
+        assert ws.receive_json()["data"] == {"reason": "epoch_changed"}
+
+
+def test_events_pull_disabled(client):
+    assert client.get("/events", headers=auth_headers("testkey-a")).status_code == 404
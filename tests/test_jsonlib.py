@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+import plastic_memories.jsonlib as jsonlib
+from plastic_memories.encoding import EnvelopeResponse
+from plastic_memories.ext.registry import get_storage
+from plastic_memories.logging import select_json_encoder
+from plastic_memories.utils import dumps_json
+
+
+class Point(BaseModel):
+    x: int
+
+
+@pytest.fixture
+def restore_backend():
+    backend = jsonlib.get_json_backend()
+    yield
+    jsonlib._backend = backend
+
+
+@pytest.mark.parametrize("name", ["stdlib", "orjson"])
+def test_backends_produce_equivalent_json(name, restore_backend):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    backend = jsonlib.set_json_backend(name)
+    assert backend.name == name
+    value = {"content": "叫我 tcmiku", "tags": ["a"], "n": 1.5, "none": None}
+    text = jsonlib.dumps(value)
+    assert text == '{"content":"叫我 tcmiku","tags":["a"],"n":1.5,"none":null}'
+    assert jsonlib.loads(text) == value == json.loads(jsonlib.dumps_bytes(value))
+    assert dumps_json(value) == text
+
+    body = EnvelopeResponse({"data": {"point": Point(x=1), "ids": {3}}}).body
+    assert json.loads(body) == {"data": {"point": {"x": 1}, "ids": [3]}}
+
+
+def test_unknown_backend_falls_back_to_stdlib(monkeypatch):
+    assert jsonlib.select_json_backend("nope").name == "stdlib"
+    monkeypatch.setenv("PLASTIC_MEMORIES_LOG_ENCODER", "stdlib")
+    assert select_json_encoder()({"ts": object}).startswith('{"ts":"<class')
+
+
+@pytest.mark.parametrize("name", ["stdlib", "orjson"])
+def test_wide_integers_round_trip(name, restore_backend, client):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    jsonlib.set_json_backend(name)
+    big = 2**70
+    headers = {"X-API-Key": "testkey-a"}
+    res = client.post("/persona/slots/set", json={"persona_id": "p", "slot_name": "n", "value_json": {"n": big, "t": "中"}}, headers=headers)
+    assert res.status_code == 200
+    assert get_storage().get_slots("userA", "p")[0]["value_json"] == '{"n":%d,"t":"中"}' % big
+    assert dumps_json([big]) == "[%d]" % big
+    assert json.loads(EnvelopeResponse({"n": big}).body) == {"n": big}
@@ -0,0 +1,64 @@
+from plastic_memories.ext.judge.rules import RuleBasedJudge
+from plastic_memories.ext.sensitive.strict import StrictDenyPolicy
+from plastic_memories.metrics import get_metrics_registry
+
+
+class _CountingPolicy(StrictDenyPolicy):
+    def __init__(self, terms=()) -> None:
+        super().__init__(terms)
+        self.calls = 0
+
+    def check(self, text: str):
+        self.calls += 1
+        return super().check(text)
+
+
+def _payload(content: str, source_type: str = "user_explicit") -> dict:
+    return {"user_id": "u", "persona_id": "p", "content": content, "source_type": source_type}
+
+
+def test_judge_many_uses_content_cache():
+    policy = _CountingPolicy()
+    judge = RuleBasedJudge(policy, cache_size=2)
+    hits = get_metrics_registry().counter("plastic_memories_judge_cache_total", "", ("result",))
+    before = hits.value(("hit",))
+
+    decisions = judge.judge_many([_payload("喜欢喝茶"), _payload("喜欢喝茶"), _payload("my password")])
+    assert [item["decision"] for item in decisions] == ["allow_active", "allow_active", "deny"]
+    assert decisions[2]["reason"] == r"sensitive:\bpassword\b"
+    assert policy.calls == 2
+    assert hits.value(("hit",)) - before == 1
+
+    assert judge.judge(_payload("喜欢喝茶", "model_inferred"))["decision"] == "allow_candidate"
+    assert policy.calls == 3
+    assert judge.cache_stats() == {"size": 2, "max_size": 2}
+
+    decisions[0]["decision"] = "tampered"
+    assert judge.judge(_payload("喜欢喝茶", "model_inferred"))["decision"] == "allow_candidate"
+    assert judge.judge(_payload("x" * 2001))["reason"] == "content_too_long"
+
+
+def test_cache_scoped_by_policy_version_and_can_be_disabled():
+    judge = RuleBasedJudge(StrictDenyPolicy(), cache_size=8)
+    assert judge.judge(_payload("蓝鲸计划"))["decision"] == "allow_active"
+    judge._sensitive = StrictDenyPolicy(["蓝鲸计划"])
+    assert judge.judge(_payload("蓝鲸计划"))["decision"] == "deny"
+
+    policy = _CountingPolicy()
+    uncached = RuleBasedJudge(policy, cache_size=0)
+    uncached.judge_many([_payload("a"), _payload("a")])
+    assert policy.calls == 2
+    assert uncached.cache_stats()["size"] == 0
+
+
+def test_template_denied_before_any_write(client, tmp_path, monkeypatch):
+    template = tmp_path / "tpl"
+    template.mkdir()
+    (template / "persona.md").write_text("温柔的助手", encoding="utf-8")
+    (template / "rules.md").write_text("never share the password", encoding="utf-8")
+    monkeypatch.setenv("PLASTIC_MEMORIES_TEMPLATE_ROOT", str(tmp_path))
+    headers = {"X-API-Key": "testkey-a"}
+    res = client.post("/persona/create_from_template", json={"persona_id": "p1", "template_path": "tpl"}, headers=headers)
+    assert res.status_code == 400
+    res = client.get("/memory/list", params={"persona_id": "p1"}, headers=headers)
+    assert res.json()["data"]["items"] == []
@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+
+import plastic_memories.logging as pm_logging
+
+
+class _Capture(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    monkeypatch.setenv("PLASTIC_MEMORIES_LOG_ASYNC", "0")
+    monkeypatch.setenv("PLASTIC_MEMORIES_LOG_SAMPLING", "api.request:0,memory.recall:1,bad")
+    monkeypatch.setenv("PLASTIC_MEMORIES_LOG_EVENT_LEVELS", "judge.run:DEBUG,db.init:warning,x:NOPE")
+    monkeypatch.setenv("PLASTIC_MEMORIES_SLOW_REQUEST_MS", "0")
+    pm_logging.shutdown_logging()
+    capture = _Capture()
+    pm_logging.configure_logging().addHandler(capture)
+    yield capture
+    pm_logging.shutdown_logging()
+
+
+def _events(capture: _Capture) -> list[tuple[str, str]]:
+    return [(record.event, record.levelname) for record in capture.records]
+
+
+def test_parse_event_map():
+    assert pm_logging.parse_event_map("a:0.5, b:1,:2,c", float) == {"a": 0.5, "b": 1.0}
+    assert pm_logging.parse_event_map(None, float) == {}
+
+
+def test_sampling_and_level_overrides(captured):
+    pm_logging.log_event("api.request", status=200)
+    pm_logging.log_event("memory.recall")
+    pm_logging.log_event("judge.run")
+    pm_logging.log_event("db.init")
+    pm_logging.log_event("api.request", level=logging.WARNING, status=404)
+    assert _events(captured) == [
+        ("memory.recall", "INFO"),
+        ("db.init", "WARNING"),
+        ("api.request", "WARNING"),
+    ]
+
+
+def test_errors_bypass_sampling(client, captured):
+    client.get("/health")
+    client.post("/memory/write", json={"persona_id": "p1"})
+    levels = [(record.status, record.levelname) for record in captured.records if record.event == "api.request"]
+    assert levels == [(401, "WARNING")]
+
+
+def test_slow_requests_always_logged_with_timings(client, captured, monkeypatch):
+    monkeypatch.setattr(pm_logging, "_slow_request_ms", 1)
+    monkeypatch.setattr("plastic_memories.middleware.time.perf_counter", iter(range(0, 100)).__next__)
+    client.get("/health")
+    record = next(record for record in captured.records if record.event == "api.request")
+    assert record.levelname == "WARNING"
+    assert record.slow is True
+    assert set(record.timings) == {"handler_ms", "send_ms"}
+
+
+def test_message_batches_log_each_persona(captured):
+    from plastic_memories.ext.registry import get_storage
+
+    base = {"session_id": "s", "source_app": "cli", "role": "user", "content": "hi", "created_at": 1}
+    items = [{**base, "user_id": "u1", "persona_id": "a"}, {**base, "user_id": "u2", "persona_id": "b"}, {**base, "user_id": "u1", "persona_id": "a"}]
+    get_storage().append_messages(items)
+    batches = [(record.user_id, record.persona_id, record.messages) for record in captured.records if record.event == "messages.append.batch"]
+    assert batches == [("u1", "a", 2), ("u2", "b", 1)]
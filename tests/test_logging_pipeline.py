@@ -0,0 +1,60 @@
+import json
+import logging
+import queue
+
+import plastic_memories.logging as pm_logging
+from plastic_memories.context import set_request_context
+
+
+def _read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_async_pipeline_snapshots_request_context(monkeypatch, tmp_path):
+    log_path = tmp_path / "async.log"
+    monkeypatch.setenv("LOG_PATH", str(log_path))
+    monkeypatch.setenv("PLASTIC_MEMORIES_LOG_ASYNC", "1")
+    pm_logging.shutdown_logging()
+    try:
+        set_request_context("rid-async", user_id="u1", persona_id="p1")
+        pm_logging.log_event("memory.write", duration_ms=3)
+        set_request_context(None)
+        pm_logging.log_event("memory.recall", user_id="u2", persona_id="p2")
+    finally:
+        pm_logging.shutdown_logging()
+
+    lines = _read_lines(log_path)
+    assert [line["event"] for line in lines] == ["memory.write", "memory.recall"]
+    assert lines[0]["request_id"] == "rid-async"
+    assert lines[0]["user_id"] == "u1"
+    assert lines[0]["duration_ms"] == 3
+    assert lines[0]["backend"] == "sqlite"
+    assert lines[1]["request_id"] is None
+    assert lines[1]["persona_id"] == "p2"
+
+
+def test_sync_pipeline_with_stdlib_encoder(monkeypatch, tmp_path):
+    log_path = tmp_path / "sync.log"
+    monkeypatch.setenv("LOG_PATH", str(log_path))
+    monkeypatch.setenv("PLASTIC_MEMORIES_LOG_ASYNC", "0")
+    monkeypatch.setenv("PLASTIC_MEMORIES_LOG_ENCODER", "stdlib")
+    pm_logging.shutdown_logging()
+    try:
+        pm_logging.log_event("db.init", note="中文")
+        assert pm_logging.dropped_log_records() == 0
+    finally:
+        pm_logging.shutdown_logging()
+    assert _read_lines(log_path)[0]["event"] == "db.init"
+
+
+def test_drop_policy_counts_overflow():
+    handler = pm_logging.ContextQueueHandler(queue.Queue(maxsize=1), policy="drop")
+    record = logging.LogRecord("plastic_memories", logging.INFO, __file__, 1, "x", None, None)
+    for _ in range(3):
+        handler.handle(record)
+    assert handler.dropped == 2
+
+    blocking = pm_logging.ContextQueueHandler(queue.Queue(maxsize=1), policy="block", block_timeout_s=0.01)
+    blocking.handle(record)
+    blocking.handle(record)
+    assert blocking.dropped == 1
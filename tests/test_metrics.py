@@ -0,0 +1,56 @@
+from plastic_memories.metrics import CachedGauges, MetricsRegistry
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def test_histogram_quantiles_and_exposition():
+    registry = MetricsRegistry()
+    hist = registry.histogram("demo_seconds", "demo", ("route",), buckets=(0.01, 0.1, 1.0))
+    for _ in range(98):
+        hist.observe(("/a",), 0.005)
+    hist.observe(("/a",), 0.5)
+    hist.observe(("/a",), 5.0)
+    registry.counter("demo_total", "demo", ("route",)).inc(("/a",), 2)
+    assert hist.quantile(("/a",), 0.5) < 0.01
+    assert 0.1 <= hist.quantile(("/a",), 0.99) <= 1.0
+    assert hist.quantile(("/missing",), 0.5) is None
+    text = registry.render_prometheus({"demo_rows": {'{table="t"}': 3}})
+    assert 'demo_seconds_bucket{route="/a",le="0.01"} 98' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 100' in text
+    assert 'demo_total{route="/a"} 2' in text
+    assert 'demo_rows{table="t"} 3' in text
+    snap = registry.snapshot()["demo_seconds"]["/a"]
+    assert snap["count"] == 100
+
+
+def test_cached_gauges_do_not_query_on_every_scrape():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"rows": len(calls)}
+
+    gauges = CachedGauges(fetch, interval_s=3600)
+    assert gauges.get() == {"rows": 1}
+    assert gauges.get() == {"rows": 1}
+    assert len(calls) == 1
+
+
+def test_metrics_endpoints_report_latency(client):
+    client.post("/memory/write", json={"persona_id": "p1", "type": "rule", "key": "k", "content": "hello"}, headers=auth_headers("testkey-a"))
+    client.get("/memory/list", params={"persona_id": "p1"}, headers=auth_headers("testkey-a"))
+    body = client.get("/metrics").json()["data"]
+    assert body["memory_items"] == 1
+    assert body["metrics"]["plastic_memories_http_request_seconds"]["POST//memory/write"]["count"] >= 1
+    assert body["metrics"]["plastic_memories_call_seconds"]["storage/list_memory"]["p99_ms"] is not None
+
+    client.post("/memory/write", json={"persona_id": "p1", "type": "rule", "key": "k2", "content": "again"}, headers=auth_headers("testkey-a"))
+    assert client.get("/metrics").json()["data"]["memory_items"] == 1
+
+    res = client.get("/metrics/prometheus")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'plastic_memories_http_requests_total{method="POST",route="/memory/write",status="200"}' in res.text
+    assert 'plastic_memories_db_rows{table="memory_items"} 1' in res.text
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import anyio
+import pytest
+
+from plastic_memories.api import app
+from plastic_memories.changes import ChangeNotifier, stream_changes
+from plastic_memories.ext.registry import get_storage
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def _changes(client, **params):
+    return client.get("/persona/changes", params={"persona_id": "p1", **params}, headers=auth_headers("testkey-a"))
+
+
+def _create_goal(client, title: str = "t"):
+    return client.post("/goals/create", json={"persona_id": "p1", "title": title}, headers=auth_headers("testkey-a"))
+
+
+def test_changes_returns_immediately_when_behind(client):
+    _create_goal(client)
+    data = _changes(client, since="0", timeout=5).json()["data"]
+    assert data["changed"] is True
+    assert data["versions"] == {"goals": 1}
+    epoch, _, total = data["version"].rpartition(":")
+    assert epoch == get_storage().version_epoch() and total == "1"
+
+    idle = _changes(client, since=data["version"], timeout=0).json()["data"]
+    assert idle == {**data, "changed": False}
+    assert _changes(client, since="other:1", timeout=5).json()["data"]["changed"] is True
+    assert _changes(client, since="x:y").status_code == 422
+
+
+def test_long_poll_wakes_on_write(client):
+    version = _changes(client, timeout=0).json()["data"]["version"]
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        result["data"] = _changes(client, since=version, timeout=10).json()["data"]
+        result["elapsed"] = time.monotonic() - started
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+    time.sleep(0.3)
+    _create_goal(client)
+    thread.join(10)
+    assert result["data"]["changed"] is True
+    assert result["data"]["versions"]["goals"] == 1
+    assert result["elapsed"] < 5
+
+
+@pytest.mark.anyio
+async def test_watchers_share_one_versions_read():
+    notifier = ChangeNotifier()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return {"memory": len(loads)}
+
+    with notifier.watch("u", "p") as first, notifier.watch("u", "p"):
+        assert notifier.stats()["watchers"] == 2
+        for _ in range(5):
+            assert await notifier.versions("u", "p", load) == {"memory": 1}
+        notifier.notify([("u", "p"), ("u", "other")])
+        assert await first.wait(1) is True
+        assert await notifier.versions("u", "p", load) == {"memory": 2}
+        assert await notifier.versions("u", "p", load) == {"memory": 2}
+        assert await first.wait(0.01) is False
+    assert notifier.stats() == {"personas": 0, "watchers": 0, "notifications": 1, "loads": 2}
+    assert await notifier.versions("u", "p", load) == {"memory": 3}
+
+
+@pytest.mark.anyio
+async def test_stream_changes_emits_events_and_heartbeats(monkeypatch):
+    monkeypatch.setenv("PLASTIC_MEMORIES_CHANGES_HEARTBEAT_S", "0.05")
+    notifier = ChangeNotifier()
+    versions = {"slots": 1}
+    stream = stream_changes(notifier, "u", "p", "e", None, lambda: dict(versions))
+
+    first = await stream.__anext__()
+    assert first.startswith("id: e:1\nevent: change\n")
+    assert '"changed":true' in first.replace(" ", "")
+    assert await stream.__anext__() == ": ping\n\n"
+
+    versions["slots"] = 2
+    notifier.notify([("u", "p")])
+    assert (await stream.__anext__()).startswith("id: e:2\n")
+    await stream.aclose()
+    assert notifier.stats()["personas"] == 0
+
+
+def test_storage_notifies_after_commit():
+    storage = get_storage()
+    seen = []
+    storage.add_change_listener(lambda keys: seen.append((sorted(keys), storage.persona_versions("userA", "p1"))))
+    storage.set_slot("userA", "p1", "tone", "{}", None)
+    assert seen == [([("userA", "p1")], {"slots": 1})]
+    storage.update_goal_status("userA", "p1", 999, "done")
+    assert len(seen) == 1
+
+
+@pytest.mark.anyio
+async def test_sse_headers_are_sent_before_the_first_event():
+    since = f"{get_storage().version_epoch()}:0"
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/persona/changes", "raw_path": b"/persona/changes", "root_path": "",
+        "query_string": f"persona_id=p1&since={since}".encode(), "server": ("test", 80), "client": ("test", 1),
+        "headers": [(b"host", b"test"), (b"x-api-key", b"testkey-a"), (b"accept", b"text/event-stream"), (b"accept-encoding", b"gzip")],
+    }
+    sent = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    started = anyio.Event()
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await anyio.sleep_forever()
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.start":
+            started.set()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(app, scope, receive, send)
+        with anyio.fail_after(5):
+            await started.wait()
+        tg.cancel_scope.cancel()
+    headers = dict(sent[0]["headers"])
+    assert sent[0]["status"] == 200
+    assert headers[b"content-type"].startswith(b"text/event-stream")
+    assert b"content-encoding" not in headers
+    assert not [message for message in sent if message.get("body")]
@@ -5,6 +5,7 @@ import pytest
 from httpx import AsyncClient, ASGITransport
 
 from plastic_memories.api import app
+from plastic_memories.ext.registry import get_storage
 
 AUTH_HEADERS = {"X-API-Key": "testkey-a"}
 
@@ -125,3 +126,116 @@ async def test_create_from_template_invalid_preferences(tmp_path, monkeypatch):
         body = res.json()
         assert body["ok"] is False
         assert body["error"]["code"] == "validation_error"
+
+
+@pytest.mark.anyio
+async def test_create_from_template_batch(tmp_path, monkeypatch):
+    root = tmp_path / "personas"
+    _write_template(root, "persona_x")
+    monkeypatch.setenv("PLASTIC_MEMORIES_TEMPLATE_ROOT", str(root))
+    import plastic_memories.config as config
+    config._settings = None
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/persona/create_from_template", json={
+            "persona_id": "p0", "template_path": "personas/persona_x",
+        }, headers=AUTH_HEADERS)
+        assert res.json()["data"]["applied"] is True
+        res = await client.get("/persona/profile", params={"persona_id": "p0"}, headers=AUTH_HEADERS)
+        p0_etag = res.headers["etag"]
+
+        persona_ids = ["p0"] + [f"p{i}" for i in range(1, 200)] + ["p1"]
+        res = await client.post("/persona/create_from_template_batch", json={
+            "persona_ids": persona_ids, "template_path": "personas/persona_x",
+        }, headers=AUTH_HEADERS)
+        data = res.json()["data"]
+        assert data["skipped"] == ["p0"]
+        assert len(data["applied"]) == 199
+        assert data["memories_written"] == 199 * 3
+        assert data["overwritten"] is False
+        res = await client.get("/persona/profile", params={"persona_id": "p0"}, headers={**AUTH_HEADERS, "If-None-Match": p0_etag})
+        assert res.status_code == 304
+        assert get_storage().persona_versions("userA", "p42") == {"persona": 1, "memory": 1}
+
+        res = await client.get("/memory/list", params={"persona_id": "p42"}, headers=AUTH_HEADERS)
+        keys = sorted(item["mkey"] for item in res.json()["data"]["items"])
+        assert keys == ["persona_md", "preferences_json", "rules_md"]
+        res = await client.get("/persona/profile", params={"persona_id": "p42"}, headers=AUTH_HEADERS)
+        assert res.status_code == 200
+        res = await client.post("/memory/recall", json={"persona_id": "p42", "query": "你好", "limit": 5}, headers=AUTH_HEADERS)
+        assert any("你好" in item["content"] for item in res.json()["data"]["PERSONA_MEMORY"])
+
+        (root / "persona_x" / "persona.md").write_text("# Persona\n新版本", encoding="utf-8")
+        import plastic_memories.templates as templates
+        templates.invalidate_templates()
+        res = await client.post("/persona/create_from_template_batch", json={
+            "persona_ids": ["p0", "p1"], "template_path": "personas/persona_x", "allow_overwrite": True,
+        }, headers=AUTH_HEADERS)
+        data = res.json()["data"]
+        assert data["applied"] == ["p0", "p1"] and data["overwritten"] is True
+        res = await client.get("/memory/list", params={"persona_id": "p0"}, headers=AUTH_HEADERS)
+        items = {item["mkey"]: item["content"] for item in res.json()["data"]["items"]}
+        assert items["persona_md"].endswith("新版本")
+        assert len(items) == 3
+
+        res = await client.post("/persona/create_from_template_batch", json={
+            "persona_ids": [], "template_path": "personas/persona_x",
+        }, headers=AUTH_HEADERS)
+        assert res.status_code == 422
+        res = await client.post("/persona/create_from_template_batch", json={
+            "persona_ids": ["p9"], "template_path": "personas/missing",
+        }, headers=AUTH_HEADERS)
+        assert res.status_code == 400
+
+
+def test_existing_memory_keys_uses_unique_index():
+    from plastic_memories.ext.registry import get_storage
+
+    storage = get_storage()
+    base = {"user_id": "u1", "persona_id": "p", "tags": [], "ttl_seconds": None, "source_type": "user_explicit"}
+    storage.write_memory({**base, "type": "persona", "key": "persona_md", "content": "a"})
+    _, mem_id = storage.write_memory({**base, "type": "rule", "key": "rules_md", "content": "b"})
+    storage.revoke_memory("u1", "p", mem_id)
+    storage.write_memory({**base, "type": "preferences", "key": "preferences_json", "content": "c", "expires_at": 1})
+    keys = [("persona", "persona_md"), ("rule", "rules_md"), ("preferences", "preferences_json"), ("persona", "persona_md")]
+    assert storage.existing_memory_keys("u1", "p", keys) == {("persona", "persona_md")}
+    assert storage.existing_memory_keys("u2", "p", keys) == set()
+    assert storage.existing_memory_keys("u1", "p", []) == set()
+    with storage._connect() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT m.type, m.mkey FROM (VALUES (?, ?)) AS k JOIN memory_items AS m "
+            f"ON m.user_id=? AND m.persona_id=? AND m.type=k.column1 AND m.mkey=k.column2 WHERE {storage._valid_memory_clause()}",
+            ("a", "b", "u1", "p", 0, 0),
+        ).fetchall()
+    assert any("type=? AND mkey=?" in row[-1] for row in plan)
+
+
+@pytest.mark.anyio
+async def test_revoked_or_expired_template_rows_are_reseeded(tmp_path, monkeypatch):
+    root = tmp_path / "personas"
+    _write_template(root, "persona_x")
+    monkeypatch.setenv("PLASTIC_MEMORIES_TEMPLATE_ROOT", str(root))
+    import plastic_memories.config as config
+    config._settings = None
+
+    storage = get_storage()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        body = {"persona_ids": ["p1", "p2"], "template_path": "personas/persona_x"}
+        await client.post("/persona/create_from_template_batch", json=body, headers=AUTH_HEADERS)
+        for persona_id in ("p1", "p2"):
+            items = {item["mkey"]: item["id"] for item in storage.list_memory("userA", persona_id)}
+            storage.revoke_memory("userA", persona_id, items["persona_md"])
+        with storage._connect() as conn:
+            conn.execute("UPDATE memory_items SET expires_at=1 WHERE user_id='userA' AND persona_id='p2' AND mkey='rules_md'")
+
+        res = await client.post("/persona/create_from_template", json={"persona_id": "p1", "template_path": "personas/persona_x"}, headers=AUTH_HEADERS)
+        assert res.json()["data"]["applied"] is True
+        res = await client.post("/persona/create_from_template_batch", json=body, headers=AUTH_HEADERS)
+        data = res.json()["data"]
+        assert data["applied"] == ["p2"] and data["skipped"] == ["p1"]
+        assert data["memories_written"] == 2
+        for persona_id in ("p1", "p2"):
+            keys = sorted(item["mkey"] for item in storage.list_memory("userA", persona_id))
+            assert keys == ["persona_md", "preferences_json", "rules_md"]
@@ -0,0 +1,41 @@
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def _capture_access_log(monkeypatch) -> list[dict]:
+    events: list[dict] = []
+
+    def fake_log_event(event: str, **fields):
+        if event == "api.request":
+            events.append(fields)
+
+    monkeypatch.setattr("plastic_memories.middleware.log_event", fake_log_event)
+    return events
+
+
+def test_persona_bound_from_validated_body(client, monkeypatch):
+    events = _capture_access_log(monkeypatch)
+    res = client.post(
+        "/messages/append",
+        json={"persona_id": "p-body", "role": "user", "content": "x" * 50_000},
+        headers={"X-Request-Id": "rid-body", **auth_headers("testkey-a")},
+    )
+    assert res.status_code == 200
+    assert res.headers["X-Request-Id"] == "rid-body"
+    assert res.json()["request_id"] == "rid-body"
+    assert events[-1]["persona_id"] == "p-body"
+    assert events[-1]["user_id"] == "userA"
+    assert events[-1]["status"] == 200
+
+
+def test_persona_bound_from_query_and_errors(client, monkeypatch):
+    events = _capture_access_log(monkeypatch)
+    res = client.get("/memory/list", params={"persona_id": "p-query"}, headers=auth_headers("testkey-a"))
+    assert res.status_code == 200
+    assert events[-1]["persona_id"] == "p-query"
+
+    res = client.post("/memory/write", content=b"{not json", headers={"Content-Type": "application/json", **auth_headers("testkey-a")})
+    assert res.status_code == 422
+    assert res.headers.get("X-Request-Id")
+    assert events[-1]["status"] == 422
+    assert events[-1]["persona_id"] is None
@@ -0,0 +1,97 @@
+import gzip
+import json
+
+import pytest
+
+import plastic_memories.encoding as encoding
+from plastic_memories.encoding import MEDIA_COLUMNAR, negotiate_encoding, negotiate_format, to_columnar
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def _seed(client, count: int) -> None:
+    for i in range(count):
+        client.post("/memory/write", json={"persona_id": "p", "type": "persona", "key": f"k{i}", "content": f"偏好内容 {i} " * 8}, headers=auth_headers("testkey-a"))
+
+
+def test_negotiation_rules(monkeypatch):
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding(None) is None
+    assert negotiate_format(None) == "application/json"
+    assert negotiate_format(f"application/json;q=0.5, {MEDIA_COLUMNAR}") == MEDIA_COLUMNAR
+    assert negotiate_format(f"{MEDIA_COLUMNAR};q=0.1, application/json") == "application/json"
+    assert negotiate_format("text/html;q=bad") == "application/json"
+    monkeypatch.setattr(encoding, "ENCODERS", {"zstd": bytes, "gzip": bytes})
+    assert negotiate_encoding("gzip, zstd") == "zstd"
+    assert negotiate_encoding("gzip, zstd;q=0.5") == "gzip"
+
+
+def test_to_columnar_only_packs_uniform_rows():
+    rows = [{"a": 1, "b": [{"x": 1}]}, {"a": 2, "b": []}]
+    assert to_columnar({"items": rows}) == {"items": {"$columns": ["a", "b"], "$rows": [[1, {"$columns": ["x"], "$rows": [[1]]}], [2, []]]}}
+    assert to_columnar([{"a": 1}, {"b": 2}]) == [{"a": 1}, {"b": 2}]
+
+
+def test_large_responses_are_gzipped(client):
+    _seed(client, 20)
+    res = client.get("/memory/list", params={"persona_id": "p"}, headers={**auth_headers("testkey-a"), "Accept-Encoding": "gzip"})
+    assert res.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["vary"]
+    assert len(res.json()["data"]["items"]) == 20
+
+    res = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+
+
+def test_negotiated_responses_vary_and_weaken_etags(client):
+    _seed(client, 20)
+    headers = {**auth_headers("testkey-a"), "Accept": MEDIA_COLUMNAR, "Accept-Encoding": "identity"}
+    res = client.get("/memory/list", params={"persona_id": "p"}, headers=headers)
+    assert {part.strip() for part in res.headers["vary"].split(",")} >= {"Accept", "Accept-Encoding"}
+    identity_etag = res.headers["etag"]
+    assert identity_etag.startswith('"')
+
+    headers["Accept-Encoding"] = "gzip"
+    res = client.get("/memory/list", params={"persona_id": "p"}, headers=headers)
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["etag"] == f"W/{identity_etag}"
+    res = client.get("/memory/list", params={"persona_id": "p"}, headers={**headers, "If-None-Match": res.headers["etag"]})
+    assert res.status_code == 304
+    assert "Accept" in res.headers["vary"]
+
+    res = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+    small = client.get("/persona/profile", params={"persona_id": "empty"}, headers={**auth_headers("testkey-a"), "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers and small.headers["etag"].startswith('"')
+
+
+def test_compression_can_be_disabled(client, monkeypatch):
+    monkeypatch.setenv("PLASTIC_MEMORIES_HTTP_COMPRESSION", "0")
+    _seed(client, 20)
+    res = client.get("/memory/list", params={"persona_id": "p"}, headers={**auth_headers("testkey-a"), "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in res.headers
+
+
+def test_columnar_encoding_by_accept(client):
+    _seed(client, 3)
+    headers = {**auth_headers("testkey-a"), "Accept": MEDIA_COLUMNAR, "Accept-Encoding": "identity"}
+    res = client.get("/memory/list", params={"persona_id": "p"}, headers=headers)
+    assert res.headers["content-type"] == MEDIA_COLUMNAR
+    body = json.loads(res.content)
+    items = body["data"]["items"]
+    assert "mkey" in items["$columns"] and len(items["$rows"]) == 3
+    plain = client.get("/memory/list", params={"persona_id": "p"}, headers={**auth_headers("testkey-a"), "Accept-Encoding": "identity"})
+    assert len(res.content) < len(plain.content)
+
+    res = client.post("/memory/recall", json={"persona_id": "p", "query": None}, headers=headers)
+    assert res.status_code == 422
+    assert res.headers["content-type"] == "application/json"
+
+
+def test_msgpack_encoding(client):
+    msgpack = pytest.importorskip("msgpack")
+    res = client.get("/health", headers={"Accept": "application/msgpack"})
+    assert msgpack.unpackb(res.content)["ok"] is True
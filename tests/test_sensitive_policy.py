@@ -0,0 +1,47 @@
+from plastic_memories.ext.sensitive.strict import DEFAULT_RULES, StrictDenyPolicy, compile_rules
+from plastic_memories.ext.sensitive.terms import TermMatcher, load_terms
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def test_combined_rules_report_matching_rule():
+    policy = StrictDenyPolicy()
+    assert policy.check("my PASSWORD is hunter2") == (True, r"sensitive:\bpassword\b")
+    assert policy.check("credit  card on file") == (True, r"sensitive:\bcredit\s*card\b")
+    assert policy.check("use api-key abc") == (True, r"sensitive:\bapi[_-]?key\b")
+    assert policy.check("card 1234567812345678 ok") == (True, r"sensitive:\b[0-9]{16}\b")
+    assert policy.check("passwords and tokens are fine") == (False, None)
+    assert compile_rules([r"foo", r"\bbar\b"]).search("xfoo").lastgroup == "r0"
+    assert len(DEFAULT_RULES) == 7
+
+
+def test_term_matcher_overlapping_terms():
+    matcher = TermMatcher(["he", "she", "hers", "内部代号", "  ", "Project X"])
+    assert matcher.term_count == 5
+    assert matcher.search("USHERS") == "she"
+    assert matcher.search("a hers") == "he"
+    assert matcher.search("这是内部代号甲") == "内部代号"
+    assert matcher.search("big PROJECT X launch") == "Project X"
+    assert matcher.search("nothing to see") is None
+    assert TermMatcher().search("anything") is None
+
+
+def test_terms_file_loaded_by_registry(client, tmp_path, monkeypatch):
+    terms_file = tmp_path / "terms.txt"
+    terms_file.write_text("# deny list\n蓝鲸计划\n\nOpenSesame\n", encoding="utf-8")
+    assert load_terms(terms_file) == ["蓝鲸计划", "OpenSesame"]
+    assert StrictDenyPolicy(["a", "b"]).version == StrictDenyPolicy(["b", "a", " "]).version
+    assert StrictDenyPolicy(["a"]).version != StrictDenyPolicy().version
+
+    monkeypatch.setenv("PLASTIC_MEMORIES_SENSITIVE_TERMS_FILE", str(terms_file))
+    res = client.post("/memory/write", json={
+        "persona_id": "p", "type": "rule", "key": "plan", "content": "参与了蓝鲸计划的讨论",
+    }, headers=auth_headers("testkey-a"))
+    assert res.status_code == 400
+    assert res.json()["error"]["detail"] == "sensitive:term:蓝鲸计划"
+    res = client.post("/memory/write", json={
+        "persona_id": "p", "type": "rule", "key": "door", "content": "say opensesame",
+    }, headers=auth_headers("testkey-a"))
+    assert res.status_code == 400
@@ -0,0 +1,78 @@
+import json
+import logging
+
+import pytest
+
+import plastic_memories.config as config
+import plastic_memories.logging as pm_logging
+import plastic_memories.ext.registry as registry
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def _write_config(tmp_path, monkeypatch, data) -> None:
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    monkeypatch.setenv("PLASTIC_MEMORIES_CONFIG_FILE", str(path))
+
+
+def test_config_file_overrides_are_coerced(tmp_path, monkeypatch):
+    _write_config(tmp_path, monkeypatch, {"max_snippets": "50", "tracing": "true", "db_path": "~/x.db"})
+    settings = config.load_settings()
+    assert settings.max_snippets == 50
+    assert settings.tracing is True
+    assert settings.db_path.name == "x.db" and not str(settings.db_path).startswith("~")
+
+    _write_config(tmp_path, monkeypatch, {"nope": 1})
+    with pytest.raises(ValueError):
+        config.load_settings()
+
+
+def test_reload_swaps_settings_and_updates_components(tmp_path, monkeypatch):
+    storage = registry.get_storage()
+    before = config.get_settings()
+    with storage._connect() as conn:
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == before.busy_timeout_ms
+
+    _write_config(tmp_path, monkeypatch, {"busy_timeout_ms": 1234, "log_level": "warning"})
+    pm_logging.configure_logging()
+    after = config.reload_settings()
+    assert config.get_settings() is after
+    assert config.changed_settings(before, after) == ["busy_timeout_ms", "log_level"]
+    assert registry.get_storage() is storage
+    with storage._connect() as conn:
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    assert logging.getLogger("plastic_memories").level == logging.WARNING
+
+    monkeypatch.setenv("PLASTIC_MEMORIES_DB_PATH", str(tmp_path / "other.db"))
+    config.reload_settings()
+    assert registry.get_storage() is not storage
+    pm_logging.shutdown_logging()
+
+
+def test_admin_reload_endpoint(client, tmp_path, monkeypatch):
+    resp = client.post("/admin/reload", headers={"X-Admin-Key": "secret"})
+    assert resp.status_code == 403
+
+    monkeypatch.setenv("PLASTIC_MEMORIES_ADMIN_KEY", "secret")
+    resp = client.post("/admin/reload", headers={"X-Admin-Key": "wrong"})
+    assert resp.status_code == 401
+
+    config.get_settings()
+    monkeypatch.setenv("PLASTIC_MEMORIES_SNIPPET_LIMIT", "3")
+    resp = client.post("/admin/reload", headers={"X-Admin-Key": "secret"})
+    assert resp.status_code == 200
+    assert resp.json()["data"]["changed"] == ["max_snippets"]
+    assert config.get_settings().max_snippets == 3
+
+    (tmp_path / "bad.json").write_text("{", encoding="utf-8")
+    monkeypatch.setenv("PLASTIC_MEMORIES_CONFIG_FILE", str(tmp_path / "bad.json"))
+    resp = client.post("/admin/reload", headers={"X-Admin-Key": "secret"})
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "config_error"
+    assert config.get_settings().max_snippets == 3
+
+    resp = client.get("/health", headers=auth_headers("testkey-a"))
+    assert resp.status_code == 200
@@ -57,3 +57,36 @@ def test_load_persona_template_invalid_json(tmp_path):
     (tdir / "preferences.json").write_text("{bad json}", encoding="utf-8")
     with pytest.raises(json.JSONDecodeError):
         load_persona_template(tdir)
+
+
+def test_template_cache_skips_filesystem_until_check(tmp_path, monkeypatch):
+    root = tmp_path / "personas"
+    tdir = root / "demo"
+    tdir.mkdir(parents=True)
+    (tdir / "persona.md").write_text("# v1", encoding="utf-8")
+    (root / "broken").mkdir()
+    (root / "broken" / "persona.md").write_text("# b", encoding="utf-8")
+    (root / "broken" / "preferences.json").write_text("{bad", encoding="utf-8")
+    monkeypatch.setenv("PLASTIC_MEMORIES_TEMPLATE_ROOT", str(root))
+    import plastic_memories.config as config
+    from plastic_memories.templates import TemplateCache
+    config._settings = None
+
+    cache = TemplateCache(check_interval_s=3600)
+    assert cache.preload() == 1
+    path, seed = cache.get("personas/demo")
+    assert seed.persona_md == "# v1"
+    assert cache.stats() == {"templates": 1, "hits": 1, "misses": 1}
+
+    (tdir / "persona.md").write_text("# v2 changed", encoding="utf-8")
+    with monkeypatch.context() as patched:
+        patched.setattr(Path, "stat", lambda self, **kw: pytest.fail("stat on cache hit"))
+        assert cache.get("demo")[1].persona_md == "# v1"
+
+    cache.check_interval_s = 0
+    assert cache.get("demo")[1].persona_md == "# v2 changed"
+    with pytest.raises(json.JSONDecodeError):
+        cache.get("broken")
+
+    cache.invalidate()
+    assert cache.stats()["templates"] == 0
@@ -0,0 +1,55 @@
+from plastic_memories.tracing import Trace, span, start_trace, trace_var
+
+
+def auth_headers(key: str) -> dict:
+    return {"X-API-Key": key}
+
+
+def _enable_tracing(monkeypatch):
+    monkeypatch.setenv("PLASTIC_MEMORIES_TRACING", "1")
+    import plastic_memories.config as config
+    config._settings = None
+
+
+def test_trace_breakdown_and_header():
+    trace = Trace()
+    trace.add("storage.get_slots", 0.002)
+    trace.add("storage.get_slots", 0.001)
+    trace.add("profile.build", 0.0005)
+    assert trace.breakdown()["storage.get_slots"] == {"count": 2, "ms": 3.0}
+    header = trace.server_timing(0.01)
+    assert 'storage.get_slots;dur=3.000;desc="x2"' in header
+    assert header.endswith("app;dur=10.000")
+
+
+def test_span_is_noop_without_trace():
+    trace_var.set(None)
+    with span("noop"):
+        pass
+    trace = start_trace()
+    with span("work"):
+        pass
+    assert [name for name, _ in trace.spans] == ["work"]
+    trace_var.set(None)
+
+
+def test_recall_emits_server_timing_and_log_breakdown(client, monkeypatch):
+    _enable_tracing(monkeypatch)
+    logged = []
+    monkeypatch.setattr("plastic_memories.middleware.log_event", lambda event, **fields: logged.append((event, fields)))
+    client.post("/memory/write", json={"persona_id": "p1", "type": "rule", "key": "k", "content": "hello tracing"}, headers=auth_headers("testkey-a"))
+    res = client.post("/memory/recall", json={"persona_id": "p1", "query": "tracing", "limit": 5}, headers=auth_headers("testkey-a"))
+    header = res.headers["Server-Timing"]
+    for name in ("recall.recall", "storage.recall_memory", "storage.recent_messages", "profile.build", "app"):
+        assert name + ";dur=" in header
+    trace_logs = [fields for event, fields in logged if event == "api.trace"]
+    assert trace_logs[-1]["request_id"] == res.headers["X-Request-Id"]
+    assert trace_logs[-1]["persona_id"] == "p1"
+    assert "storage.get_slots" in trace_logs[-1]["spans"]
+    write_spans = trace_logs[0]["spans"]
+    assert "judge.judge" in write_spans and "events.emit" in write_spans
+
+
+def test_tracing_disabled_by_default(client):
+    res = client.get("/memory/list", params={"persona_id": "p1"}, headers=auth_headers("testkey-a"))
+    assert "Server-Timing" not in res.headers